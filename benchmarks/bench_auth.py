@@ -0,0 +1,53 @@
+"""Per-request bearer token verification cost, with and without the cache.
+
+Usage:
+    python -m benchmarks.bench_auth [--iterations N]
+"""
+
+import argparse
+import os
+import timeit
+
+os.environ.setdefault('DATABASE_URL', 'sqlite+aiosqlite:///:memory:')
+os.environ.setdefault(
+    'JWT_SECRET_KEY', 'benchmark-secret-key-0123456789abcdef'
+)
+
+from car_api.core.security import (  # noqa: E402
+    create_access_token,
+    make_token_cache,
+    verify_token,
+)
+from car_api.core.settings import get_settings  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--iterations', type=int, default=50_000)
+    args = parser.parse_args()
+
+    settings = get_settings()
+    token_cache = make_token_cache(settings)
+    token = create_access_token({'sub': '1'}, settings)
+
+    def uncached():
+        token_cache.clear()
+        verify_token(token, settings, token_cache)
+
+    def cached():
+        verify_token(token, settings, token_cache)
+
+    results = {}
+    for name, func in (('uncached', uncached), ('cached', cached)):
+        token_cache.clear()
+        func()
+        seconds = min(timeit.repeat(func, number=args.iterations, repeat=5))
+        results[name] = seconds / args.iterations * 1_000_000
+
+    for name, micros in results.items():
+        print(f'{name:>10}: {micros:8.2f} us/request')
+    print(f'{"speedup":>10}: {results["uncached"] / results["cached"]:8.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""list_cars response time with the default and the FAST_JSON serialization.
+
+Usage:
+    python -m benchmarks.bench_serialization [--limit N] [--iterations N]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import timeit
+
+# Always a throwaway database: the benchmark creates tables and rows.
+os.environ['DATABASE_URL'] = (
+    f'sqlite+aiosqlite:///{tempfile.mkdtemp()}/benchmark.db'
+)
+os.environ.setdefault(
+    'JWT_SECRET_KEY', 'benchmark-secret-key-0123456789abcdef'
+)
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession  # noqa: E402
+
+from car_api.app import app  # noqa: E402
+from car_api.core.database import Engines  # noqa: E402
+from car_api.core.security import (  # noqa: E402
+    create_access_token,
+    get_password_hash,
+)
+from car_api.core.settings import get_settings  # noqa: E402
+
+settings = get_settings()
+from car_api.models import Base  # noqa: E402
+from car_api.models.cars import Brand, Car  # noqa: E402
+from car_api.models.users import User  # noqa: E402
+
+
+async def seed(cars: int) -> int:
+    engines = Engines(settings)
+    engine = engines.connect()
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        user = User(
+            username='benchmark',
+            email='benchmark@example.com',
+            password=get_password_hash('benchmark'),
+        )
+        brands = [Brand(name=f'Brand {i}') for i in range(10)]
+        session.add_all([user, *brands])
+        await session.flush()
+
+        session.add_all(
+            Car(
+                model=f'Model {i}',
+                factory_year=2020,
+                model_year=2021,
+                color='Silver',
+                plate=f'BEN{i:05d}',
+                fuel_type='flex',
+                transmission='manual',
+                price=50_000 + i,
+                description='Benchmark car',
+                brand_id=brands[i % len(brands)].id,
+                owner_id=user.id,
+            )
+            for i in range(cars)
+        )
+        await session.commit()
+
+    # The app runs in another event loop.
+    await engines.dispose()
+    return user.id
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--limit', type=int, default=100)
+    parser.add_argument('--iterations', type=int, default=200)
+    args = parser.parse_args()
+
+    user_id = asyncio.run(seed(args.limit))
+    token = create_access_token({'sub': str(user_id)}, settings)
+    headers = {'Authorization': f'Bearer {token}'}
+    url = f'/api/v1/cars/?limit={args.limit}'
+
+    results = {}
+    bodies = {}
+    with TestClient(app) as client:
+        for name, fast in (('default', False), ('fast_json', True)):
+            settings.FAST_JSON = fast
+            bodies[name] = client.get(url, headers=headers).json()
+
+            def request():
+                client.get(url, headers=headers)
+
+            seconds = min(
+                timeit.repeat(request, number=args.iterations, repeat=5)
+            )
+            results[name] = seconds / args.iterations * 1000
+
+    assert bodies['default'] == bodies['fast_json'], 'bodies differ'
+
+    print(f'list_cars, {args.limit} cars per page')
+    for name, millis in results.items():
+        print(f'{name:>10}: {millis:8.2f} ms/request')
+    speedup = results['default'] / results['fast_json']
+    print(f'{"speedup":>10}: {speedup:8.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""Startup time, throughput and shutdown time of the ways to run the app.
+
+    fastapi-dev  `fastapi dev`: auto-reload, one process
+    uvicorn      plain uvicorn, one process, asyncio loop and h11
+    production   `python -m car_api.server`: the production entry point,
+                 with uvloop, httptools and --workers processes
+
+Seeds a temporary SQLite database once (see benchmarks.load), then for
+each server measures the time from spawning it to its first answered
+request, the RPS and latency of the read-only load-test scenarios, and
+the time it takes to exit after SIGTERM.
+
+Usage:
+    python -m benchmarks.bench_server [--workers N] [--requests N]
+        [--concurrency N] [--server NAME]
+"""
+
+import argparse
+import asyncio
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks import load
+from car_api.core import fleet
+
+SCENARIOS = ('list_cars', 'get_car')
+
+
+def server_commands(port: int, workers: int):
+    return {
+        'fastapi-dev': [
+            sys.executable,
+            '-m',
+            'fastapi',
+            'dev',
+            'car_api/app.py',
+            '--port',
+            str(port),
+        ],
+        'uvicorn': [
+            sys.executable,
+            '-m',
+            'uvicorn',
+            'car_api.app:app',
+            '--port',
+            str(port),
+            '--loop',
+            'asyncio',
+            '--http',
+            'h11',
+            '--no-access-log',
+        ],
+        'production': [
+            sys.executable,
+            '-m',
+            'car_api.server',
+            '--host',
+            '127.0.0.1',
+            '--port',
+            str(port),
+            '--workers',
+            str(workers),
+        ],
+    }
+
+
+def measure(name: str, database_url: str, args) -> dict:
+    port = load.free_port()
+    base_url = f'http://127.0.0.1:{port}'
+
+    started_at = time.perf_counter()
+    server = load.start_server(
+        database_url,
+        port,
+        server_commands(port, args.workers)[name],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        asyncio.run(load.wait_until_up(base_url, interval=0.01))
+        startup = time.perf_counter() - started_at
+        results = asyncio.run(load.run(base_url, args))
+    finally:
+        stopping_at = time.perf_counter()
+        server.terminate()
+        server.wait(timeout=60)
+        shutdown = time.perf_counter() - stopping_at
+
+    return {'startup_s': startup, 'shutdown_s': shutdown, **results}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--brands', type=int, default=50)
+    parser.add_argument('--cars', type=int, default=20_000)
+    parser.add_argument('--seed', type=int, default=fleet.SEED)
+    parser.add_argument('--requests', type=int, default=1_000)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument(
+        '--server',
+        dest='servers',
+        action='append',
+        choices=('fastapi-dev', 'uvicorn', 'production'),
+        help='may be repeated; all by default',
+    )
+    args = parser.parse_args()
+    args.scenarios = SCENARIOS
+    servers = args.servers or ['fastapi-dev', 'uvicorn', 'production']
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_url = f'sqlite+aiosqlite:///{directory}/server.db'
+        asyncio.run(load.seed(database_url, args))
+        results = {name: measure(name, database_url, args) for name in servers}
+
+    print(
+        f'{"server":<13}{"startup s":>10}{"shutdown s":>11}'
+        + ''.join(f'{name + " rps":>15}{"p95 ms":>9}' for name in SCENARIOS)
+    )
+    for server, result in results.items():
+        print(
+            f'{server:<13}{result["startup_s"]:>10.2f}'
+            f'{result["shutdown_s"]:>11.2f}'
+            + ''.join(
+                f'{result[name]["rps"]:>15.1f}{result[name]["p95_ms"]:>9.2f}'
+                for name in SCENARIOS
+            )
+        )
+
+
+if __name__ == '__main__':
+    main()
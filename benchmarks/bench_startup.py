@@ -0,0 +1,89 @@
+"""Cold start of the app: import time and lifespan startup time.
+
+Each run is a fresh interpreter that imports car_api.app and then runs
+the lifespan startup (engines, brand catalog). Reports the median of the
+runs, and the car_api modules that cost the most to import according to
+`python -X importtime`.
+
+Usage:
+    python -m benchmarks.bench_startup [--runs N] [--modules N]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+RUN = """
+import time
+from fastapi.testclient import TestClient
+started_at = time.perf_counter()
+from car_api.app import app
+imported_at = time.perf_counter()
+with TestClient(app):
+    ready_at = time.perf_counter()
+print(imported_at - started_at, ready_at - imported_at)
+"""
+
+
+def run_once(env: dict) -> tuple:
+    output = subprocess.run(
+        [sys.executable, '-c', RUN],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    imported, ready = output.split()
+    return float(imported), float(ready)
+
+
+def import_times(env: dict) -> list:
+    # -X importtime lines: "import time: self [us] | cumulative | name".
+    stderr = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import car_api.app'],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stderr
+
+    times = []
+    for line in stderr.splitlines()[1:]:
+        own, cumulative, name = line.removeprefix('import time:').split('|')
+        if name.strip().startswith('car_api'):
+            times.append((int(own) / 1000, int(cumulative) / 1000, name))
+    return sorted(times, reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--modules', type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        env = {
+            **os.environ,
+            'DATABASE_URL': f'sqlite+aiosqlite:///{directory}/startup.db',
+            'JWT_SECRET_KEY': 'benchmark-secret-key-0123456789abcdef',
+        }
+        runs = [run_once(env) for _ in range(args.runs)]
+        modules = import_times(env)
+
+    imported = statistics.median(run[0] for run in runs)
+    ready = statistics.median(run[1] for run in runs)
+    print(f'median of {args.runs} runs')
+    print(f'{"import":>10}: {imported * 1000:8.1f} ms')
+    print(f'{"startup":>10}: {ready * 1000:8.1f} ms')
+    print(f'{"total":>10}: {(imported + ready) * 1000:8.1f} ms')
+
+    print(f'\n{"self ms":>8}{"cumul. ms":>10}  module')
+    for own, cumulative, name in modules[: args.modules]:
+        print(f'{own:>8.1f}{cumulative:>10.1f}  {name.strip()}')
+
+
+if __name__ == '__main__':
+    main()
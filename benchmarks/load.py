@@ -0,0 +1,399 @@
+"""Load test of the main endpoints against a locally started server.
+
+Seeds a fresh SQLite database with the deterministic data of
+car_api.core.fleet, starts the app with uvicorn in a subprocess and runs one
+scenario per endpoint, each with a fixed number of requests sent by
+concurrent clients:
+
+    auth_token  POST /api/v1/auth/token
+    list_cars   GET  /api/v1/cars/ with filters drawn from the data
+    get_car     GET  /api/v1/cars/{car_id}
+    create_car  POST /api/v1/cars/
+
+Prints RPS and p50/p95/p99 latencies per endpoint. The results can be
+written as JSON and compared with a stored baseline: the run fails (exit
+code 1) when an endpoint's p95 grows or its RPS drops by more than the
+tolerance.
+
+With --url the scenarios run against a server that is already up, whose
+database must hold the data generated with the same --users, --brands,
+--cars and --seed. The create_car scenario adds cars to it, so it has to
+be seeded again before the next run.
+
+Usage:
+    python -m benchmarks.load [--cars N] [--requests N] [--concurrency N]
+        [--url URL] [--output FILE] [--baseline FILE] [--save-baseline]
+        [--tolerance 0.15]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+import httpx
+from sqlalchemy.ext.asyncio import create_async_engine
+
+# Only for this process, which seeds the database; the server gets the
+# temporary database's URL.
+os.environ.setdefault('DATABASE_URL', 'sqlite+aiosqlite:///:memory:')
+os.environ.setdefault(
+    'JWT_SECRET_KEY', 'benchmark-secret-key-0123456789abcdef'
+)
+
+from car_api.core import fleet  # noqa: E402
+from car_api.models import Base  # noqa: E402
+
+SCENARIOS = ('auth_token', 'list_cars', 'get_car', 'create_car')
+
+# The owners of most cars, given the skew of the fleet data.
+LOGGED_IN_USERS = 10
+
+
+async def seed(url: str, args) -> None:
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await fleet.seed_fleet(
+            conn,
+            fleet.FleetSize(args.users, args.brands, args.cars),
+            seed=args.seed,
+        )
+    await engine.dispose()
+
+
+def fleet_cars(args, count: int, seed: int, first_index: int = 0):
+    # The cars seed_fleet generates in an empty database, where ids follow
+    # the order of insertion.
+    return fleet.cars(
+        count,
+        range(1, args.users + 1),
+        [(index + 1, fleet.brand_name(index)) for index in range(args.brands)],
+        seed=seed,
+        first_index=first_index,
+    )
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(
+    database_url: str,
+    port: int,
+    command: Optional[List[str]] = None,
+    **options,
+) -> subprocess.Popen:
+    env = dict(os.environ, DATABASE_URL=database_url)
+    env.setdefault('JWT_SECRET_KEY', 'benchmark-secret-key-0123456789abcdef')
+    env.setdefault('SLOW_QUERY_MS', '0')
+    if command is None:
+        command = [
+            sys.executable,
+            '-m',
+            'uvicorn',
+            'car_api.app:app',
+            '--port',
+            str(port),
+            '--log-level',
+            'warning',
+            '--no-access-log',
+        ]
+    return subprocess.Popen(command, env=env, **options)
+
+
+async def wait_until_up(
+    base_url: str, timeout: float = 30, interval: float = 0.1
+) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while True:
+            try:
+                response = await client.get('/health/ready')
+                if response.status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError(f'server at {base_url} did not start')
+            await asyncio.sleep(interval)
+
+
+async def login(client: httpx.AsyncClient, user_id: int) -> Dict:
+    response = await client.post(
+        '/api/v1/auth/token',
+        json={
+            'email': fleet.user_email(user_id - 1),
+            'password': fleet.PASSWORD,
+        },
+    )
+    response.raise_for_status()
+    return {'Authorization': f'Bearer {response.json()["access_token"]}'}
+
+
+def scenario_requests(name: str, args, headers: Dict[int, Dict]) -> List:
+    # Every request of a scenario is drawn up front from a seeded
+    # generator, so two runs send exactly the same requests. Cars are only
+    # visible to their owners: each request goes with the token of one of
+    # the logged in users, and get_car asks for cars they own.
+    rng = random.Random(f'{args.seed}-{name}')
+    user_ids = list(headers)
+    requests = []
+
+    if name == 'auth_token':
+        weights = fleet.zipf_weights(args.users, 1.0)
+        for user_id in rng.choices(
+            range(1, args.users + 1), weights=weights, k=args.requests
+        ):
+            body = {
+                'email': fleet.user_email(user_id - 1),
+                'password': fleet.PASSWORD,
+            }
+            requests.append(('POST', '/api/v1/auth/token', None, body, None))
+
+    elif name == 'list_cars':
+        for _ in range(args.requests):
+            params = {'limit': rng.choice((10, 20, 50, 100))}
+            kind = rng.random()
+            if kind < 0.3:
+                params['brand_id'] = rng.randint(1, args.brands)
+            elif kind < 0.45:
+                params['fuel_type'] = rng.choice(
+                    list(fleet.FUEL_WEIGHTS)
+                ).value
+            elif kind < 0.6:
+                params['is_available'] = 'true'
+                params['max_price'] = rng.choice((50_000, 100_000))
+            if rng.random() < 0.2:
+                params['offset'] = rng.randint(0, 10) * params['limit']
+            auth = headers[rng.choice(user_ids)]
+            requests.append(('GET', '/api/v1/cars/', params, None, auth))
+
+    elif name == 'get_car':
+        owned = [
+            (car_id, car['owner_id'])
+            for car_id, car in enumerate(
+                fleet_cars(args, args.cars, args.seed), start=1
+            )
+            if car['owner_id'] in headers
+        ]
+        for car_id, owner_id in rng.choices(owned, k=args.requests):
+            path = f'/api/v1/cars/{car_id}'
+            requests.append(('GET', path, None, None, headers[owner_id]))
+
+    else:
+        # Plates continue after the seeded cars, so none is taken.
+        for car in fleet_cars(
+            args, args.requests, args.seed + 1, first_index=args.cars
+        ):
+            body = dict(car, price=str(car['price']))
+            auth = headers[rng.choice(user_ids)]
+            requests.append(('POST', '/api/v1/cars/', None, body, auth))
+
+    return requests
+
+
+async def run_scenario(
+    client: httpx.AsyncClient, requests: List, concurrency: int
+) -> Dict:
+    queue = iter(requests)
+    latencies: List[float] = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        for method, path, params, body, headers in queue:
+            started_at = time.perf_counter()
+            try:
+                response = await client.request(
+                    method, path, params=params, json=body, headers=headers
+                )
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            latencies.append(time.perf_counter() - started_at)
+            errors += failed
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started_at
+
+    percentiles = statistics.quantiles(latencies, n=100, method='inclusive')
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': round(len(latencies) / elapsed, 1),
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 2),
+        'p50_ms': round(percentiles[49] * 1000, 2),
+        'p95_ms': round(percentiles[94] * 1000, 2),
+        'p99_ms': round(percentiles[98] * 1000, 2),
+    }
+
+
+async def run(base_url: str, args) -> Dict:
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=60
+    ) as client:
+        headers = {
+            user_id: await login(client, user_id)
+            for user_id in range(1, min(args.users, LOGGED_IN_USERS) + 1)
+        }
+        results = {}
+        for name in args.scenarios:
+            requests = scenario_requests(name, args, headers)
+            # A short warmup, so connections and caches are ready.
+            await run_scenario(client, requests[:20], args.concurrency)
+            if name == 'create_car':
+                requests = requests[20:]
+            results[name] = await run_scenario(
+                client, requests, args.concurrency
+            )
+    return results
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    regressions = []
+    for name, base in baseline['endpoints'].items():
+        current = results.get(name)
+        if current is None:
+            continue
+        if current['p95_ms'] > base['p95_ms'] * (1 + tolerance):
+            regressions.append(
+                f'{name}: p95 {base["p95_ms"]} -> {current["p95_ms"]} ms'
+            )
+        if current['rps'] < base['rps'] * (1 - tolerance):
+            regressions.append(
+                f'{name}: RPS {base["rps"]} -> {current["rps"]}'
+            )
+    return regressions
+
+
+def print_table(results: Dict, baseline: Optional[Dict]) -> None:
+    print(
+        f'{"endpoint":<12}{"requests":>9}{"errors":>8}{"rps":>9}'
+        f'{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}'
+    )
+    for name, result in results.items():
+        print(
+            f'{name:<12}{result["requests"]:>9}{result["errors"]:>8}'
+            f'{result["rps"]:>9.1f}{result["p50_ms"]:>9.2f}'
+            f'{result["p95_ms"]:>9.2f}{result["p99_ms"]:>9.2f}'
+        )
+        base = (baseline or {}).get('endpoints', {}).get(name)
+        if base:
+            print(
+                f'{"  baseline":<12}{base["requests"]:>9}{base["errors"]:>8}'
+                f'{base["rps"]:>9.1f}{base["p50_ms"]:>9.2f}'
+                f'{base["p95_ms"]:>9.2f}{base["p99_ms"]:>9.2f}'
+            )
+
+
+def report(results: Dict, args) -> None:
+    summary = {
+        'config': {
+            'users': args.users,
+            'brands': args.brands,
+            'cars': args.cars,
+            'seed': args.seed,
+            'requests': args.requests,
+            'concurrency': args.concurrency,
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+        },
+        'endpoints': results,
+    }
+
+    baseline = None
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as file:
+            baseline = json.load(file)
+
+    print_table(results, baseline)
+
+    for path in filter(
+        None, (args.output, args.save_baseline and args.baseline)
+    ):
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(summary, file, indent=2)
+            file.write('\n')
+
+    if baseline is not None:
+        if baseline['config'] != summary['config']:
+            print('warning: baseline was recorded with another configuration')
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f'regression: {regression}')
+        if regressions:
+            sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--brands', type=int, default=50)
+    parser.add_argument('--cars', type=int, default=20_000)
+    parser.add_argument('--seed', type=int, default=fleet.SEED)
+    parser.add_argument(
+        '--requests', type=int, default=1_000, help='per scenario'
+    )
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument(
+        '--scenario',
+        dest='scenarios',
+        action='append',
+        choices=SCENARIOS,
+        help='may be repeated; all by default',
+    )
+    parser.add_argument('--url', help='use a running server')
+    parser.add_argument('--output', help='write the results as JSON')
+    parser.add_argument('--baseline', default='benchmarks/baseline.json')
+    parser.add_argument(
+        '--save-baseline',
+        action='store_true',
+        help='store the results as the new baseline',
+    )
+    parser.add_argument('--tolerance', type=float, default=0.15)
+    args = parser.parse_args()
+    args.scenarios = args.scenarios or list(SCENARIOS)
+
+    server = None
+    with tempfile.TemporaryDirectory() as directory:
+        try:
+            if args.url:
+                base_url = args.url.rstrip('/')
+            else:
+                database_url = f'sqlite+aiosqlite:///{directory}/load.db'
+                started_at = time.perf_counter()
+                asyncio.run(seed(database_url, args))
+                print(
+                    f'seeded {args.users} users, {args.brands} brands and '
+                    f'{args.cars} cars in '
+                    f'{time.perf_counter() - started_at:.1f}s'
+                )
+                port = free_port()
+                server = start_server(database_url, port)
+                base_url = f'http://127.0.0.1:{port}'
+                asyncio.run(wait_until_up(base_url))
+            results = asyncio.run(run(base_url, args))
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait(timeout=30)
+
+    report(results, args)
+
+
+if __name__ == '__main__':
+    main()
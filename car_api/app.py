@@ -1,35 +1,169 @@
-from fastapi import FastAPI, status
+from contextlib import asynccontextmanager
+from typing import Callable, List, Optional
 
+from fastapi import APIRouter, FastAPI, Request, status
+from fastapi.responses import JSONResponse, PlainTextResponse
+from starlette.datastructures import State
+
+from car_api.core.catalog import make_brand_catalog, warm_brand_catalog
+from car_api.core.database import Engines, database_stats, make_recent_writers
+from car_api.core.facets import make_count_cache
+from car_api.core.hashing import pwd_context
+from car_api.core.lifecycle import Lifecycle
+from car_api.core.metrics import MetricsMiddleware, TimedRoute, request_metrics
+from car_api.core.security import (
+    make_password_hasher,
+    make_token_cache,
+    make_user_cache,
+)
+from car_api.core.serialization import FastJSONResponse
+from car_api.core.settings import Settings, get_settings
+from car_api.core.slow_queries import make_slow_query_log
 from car_api.routers import auth, brands, cars, users
 
-app = FastAPI()
+operations = APIRouter(route_class=TimedRoute)
 
-app.include_router(
-    router=auth.router,
-    prefix='/api/v1/auth',
-    tags=['authentication'],
-)
 
-app.include_router(
-    router=users.router,
-    prefix='/api/v1/users',
-    tags=['users'],
-)
+# Liveness: the process answers. /health_check is kept for the probes
+# that already use it.
+@operations.get('/health/live', status_code=status.HTTP_200_OK)
+@operations.get('/health_check', status_code=status.HTTP_200_OK)
+def health_check():
+    return {'status': 'ok'}
 
-app.include_router(
-    router=brands.router,
-    prefix='/api/v1/brands',
-    tags=['brands'],
-)
 
+# Readiness: warmed up and not shutting down.
+@operations.get('/health/ready', status_code=status.HTTP_200_OK)
+def readiness(request: Request):
+    lifecycle = request.app.state.lifecycle
+    return JSONResponse(
+        {'status': lifecycle.status},
+        status_code=(
+            status.HTTP_200_OK
+            if lifecycle.ready
+            else status.HTTP_503_SERVICE_UNAVAILABLE
+        ),
+    )
 
-app.include_router(
-    router=cars.router,
-    prefix='/api/v1/cars',
-    tags=['cars'],
+
+@operations.get('/pool_stats', status_code=status.HTTP_200_OK)
+def database_pool_stats(request: Request):
+    return database_stats(request.app.state.engines)
+
+
+@operations.get(
+    '/metrics',
+    status_code=status.HTTP_200_OK,
+    response_class=PlainTextResponse,
 )
+def metrics():
+    return PlainTextResponse(
+        request_metrics.render(),
+        media_type='text/plain; version=0.0.4',
+    )
 
 
-@app.get('/health_check', status_code=status.HTTP_200_OK)
-def health_check():
-    return {'status': 'ok'}
+def build_state(state: State, settings: Settings) -> None:
+    # Everything the handlers share, built from the app's own settings
+    # rather than at import: two apps never share a pool, cache or hasher.
+    state.slow_query_log = make_slow_query_log(settings)
+    state.engines = Engines(settings, state.slow_query_log)
+    state.recent_writers = make_recent_writers(settings)
+    state.password_hasher = make_password_hasher(settings)
+    state.user_cache = make_user_cache(settings)
+    state.token_cache = make_token_cache(settings)
+    state.count_cache = make_count_cache(settings)
+    state.brand_catalog = make_brand_catalog(settings)
+
+
+def metric_collectors(state: State) -> List[Callable]:
+    return [
+        source.metric_families
+        for source in (
+            state.password_hasher,
+            state.user_cache,
+            state.token_cache,
+            state.recent_writers,
+            state.count_cache,
+        )
+    ]
+
+
+def create_app(settings: Optional[Settings] = None) -> FastAPI:
+    settings = settings or get_settings()
+    lifecycle = Lifecycle()
+
+    # Runs once per worker process: the engines, caches and hasher are
+    # built here, not at import. The worker reports ready only once the
+    # pool, the brand catalog and the password hasher are warm. The server
+    # has already let the in-flight requests finish when the shutdown half
+    # runs.
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        state = app.state
+        build_state(state, settings)
+        collectors = metric_collectors(state)
+        for collector in collectors:
+            request_metrics.register(collector)
+
+        try:
+            state.engines.connect()
+            await state.engines.warm_up(
+                settings.DATABASE_POOL_WARMUP_CONNECTIONS
+            )
+            await warm_brand_catalog(state.brand_catalog, state.engines)
+            pwd_context()
+            lifecycle.mark_ready()
+            lifecycle.delay_shutdown(settings.SERVER_SHUTDOWN_DELAY_SECONDS)
+
+            yield
+        finally:
+            lifecycle.start_draining()
+            await state.slow_query_log.drain()
+            await state.engines.dispose()
+            # Process workers would otherwise outlive the server.
+            state.password_hasher.shutdown()
+            for collector in collectors:
+                request_metrics.unregister(collector)
+
+    app = FastAPI(
+        lifespan=lifespan,
+        default_response_class=(
+            FastJSONResponse if settings.FAST_JSON else JSONResponse
+        ),
+    )
+    app.state.settings = settings
+    app.state.lifecycle = lifecycle
+    app.router.route_class = TimedRoute
+    app.add_middleware(MetricsMiddleware, server_timing=settings.SERVER_TIMING)
+
+    app.include_router(
+        router=auth.router,
+        prefix='/api/v1/auth',
+        tags=['authentication'],
+    )
+
+    app.include_router(
+        router=users.router,
+        prefix='/api/v1/users',
+        tags=['users'],
+    )
+
+    app.include_router(
+        router=brands.router,
+        prefix='/api/v1/brands',
+        tags=['brands'],
+    )
+
+    app.include_router(
+        router=cars.router,
+        prefix='/api/v1/cars',
+        tags=['cars'],
+    )
+
+    app.include_router(router=operations)
+
+    return app
+
+
+app = create_app()
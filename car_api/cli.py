@@ -0,0 +1,182 @@
+import argparse
+import asyncio
+import itertools
+import sys
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy import select, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from car_api.core.database import Engines
+from car_api.core.explain import explain, sequential_scans
+from car_api.core.fleet import BATCH_SIZE, SEED, FleetSize, seed_fleet
+from car_api.core.settings import get_settings
+from car_api.core.slow_queries import SKIP_OPTION, make_slow_query_log
+from car_api.models.cars import Car, FuelType, TransmissionType
+from car_api.routers.cars import CAR_ORDERINGS, filter_cars
+from car_api.schemas.cars import CarFilterSchema
+
+# One representative value per list_cars filter; the advisor explains
+# every combination of them under every supported ordering.
+SAMPLE_FILTERS: Dict[str, Dict] = {
+    'search': {'search': 'corolla'},
+    'brand_id': {'brand_id': 1},
+    'fuel_type': {'fuel_type': FuelType.FLEX},
+    'transmission': {'transmission': TransmissionType.AUTOMATIC},
+    'is_available': {'is_available': True},
+    'price': {'min_price': 50_000, 'max_price': 150_000},
+}
+
+
+async def explain_cars(conn: AsyncConnection, owner_id: int) -> List[Dict]:
+    dialect = conn.dialect.name
+    if dialect == 'postgresql':
+        # Only report filters that no index can serve, not the ones the
+        # planner skips because the table is small.
+        await conn.execute(text('SET enable_seqscan = off'))
+
+    reports = []
+    for size in range(len(SAMPLE_FILTERS) + 1):
+        for names in itertools.combinations(SAMPLE_FILTERS, size):
+            values = {}
+            for name in names:
+                values.update(SAMPLE_FILTERS[name])
+            filters = CarFilterSchema(**values)
+
+            for order_by, ordering in CAR_ORDERINGS.items():
+                query = select(Car).where(Car.owner_id == owner_id)
+                query, ranked = filter_cars(query, filters, dialect)
+                query = query.order_by(*ordering).limit(100)
+
+                plan = await explain(conn, query)
+                reports.append({
+                    'filters': list(names),
+                    'order_by': order_by.value,
+                    'ranked': ranked,
+                    'sequential_scans': sequential_scans(
+                        plan, dialect, Car.__tablename__
+                    ),
+                })
+
+    return reports
+
+
+def make_engines() -> Engines:
+    # Commands run outside the app, with the settings of the environment.
+    settings = get_settings()
+    return Engines(settings, make_slow_query_log(settings))
+
+
+async def _explain_cars(owner_id: int) -> List[Dict]:
+    engines = make_engines()
+    async with engines.connect().connect() as conn:
+        reports = await explain_cars(conn, owner_id)
+    await engines.dispose()
+    return reports
+
+
+def explain_cars_command(args: argparse.Namespace) -> int:
+    reports = asyncio.run(_explain_cars(args.owner_id))
+
+    failures = 0
+    for report in reports:
+        filters = '+'.join(report['filters']) or '(no filters)'
+        scans = report['sequential_scans']
+        failures += bool(scans)
+        status = 'SEQ' if scans else 'OK '
+        detail = f'  <- {", ".join(scans)}' if scans else ''
+        print(f'{status} order_by={report["order_by"]:<6} {filters}{detail}')
+
+    print(
+        f'\n{len(reports)} queries explained, '
+        f'{failures} fall back to sequential scans'
+    )
+    return 1 if failures else 0
+
+
+async def _seed(args: argparse.Namespace) -> FleetSize:
+    # Every batch is slow by design; keep them out of the slow query log.
+    engines = make_engines()
+    seeding = engines.connect().execution_options(**{SKIP_OPTION: False})
+    async with seeding.begin() as conn:
+        totals = await seed_fleet(
+            conn,
+            FleetSize(args.users, args.brands, args.cars),
+            seed=args.seed,
+            owner_skew=args.owner_skew,
+            brand_skew=args.brand_skew,
+            batch_size=args.batch_size,
+        )
+    await engines.dispose()
+    return totals
+
+
+def seed_command(args: argparse.Namespace) -> int:
+    started_at = time.perf_counter()
+    try:
+        totals = asyncio.run(_seed(args))
+    except ValueError as error:
+        print(f'error: {error}', file=sys.stderr)
+        return 2
+    except IntegrityError as error:
+        print(
+            'error: the synthetic rows collide with existing ones, nothing '
+            f'was added ({error.orig})',
+            file=sys.stderr,
+        )
+        return 2
+    elapsed = time.perf_counter() - started_at
+
+    print(
+        f'Added {args.users} users, {args.brands} brands and {args.cars} '
+        f'cars in {elapsed:.1f}s ({args.cars / elapsed:,.0f} cars/s)'
+    )
+    print(
+        f'Database now holds {totals.users} users, {totals.brands} brands '
+        f'and {totals.cars} cars'
+    )
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='car-api')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    explain_parser = commands.add_parser(
+        'explain-cars',
+        help='Run EXPLAIN on list_cars for every filter combination',
+    )
+    explain_parser.add_argument('--owner-id', type=int, default=1)
+    explain_parser.set_defaults(handler=explain_cars_command)
+
+    seed_parser = commands.add_parser(
+        'seed',
+        help='Bulk load synthetic users, brands and cars',
+    )
+    seed_parser.add_argument('--users', type=int, default=1_000)
+    seed_parser.add_argument('--brands', type=int, default=100)
+    seed_parser.add_argument('--cars', type=int, default=100_000)
+    seed_parser.add_argument('--seed', type=int, default=SEED)
+    seed_parser.add_argument(
+        '--owner-skew',
+        type=float,
+        default=1.0,
+        help='Zipf exponent of cars per owner; 0 spreads them evenly',
+    )
+    seed_parser.add_argument(
+        '--brand-skew',
+        type=float,
+        default=1.1,
+        help='Zipf exponent of cars per brand; 0 spreads them evenly',
+    )
+    seed_parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    seed_parser.set_defaults(handler=seed_command)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
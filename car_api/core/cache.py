@@ -0,0 +1,266 @@
+import abc
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+
+class CacheBackend(abc.ABC):
+    def __init__(self, namespace: str, ttl: Optional[float] = None):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        value = self._get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.time() + ttl if ttl is not None else None
+        self._set(key, value, expires_at)
+
+    def stats(self) -> Dict:
+        return {
+            'namespace': self.namespace,
+            'backend': type(self).__name__,
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self),
+        }
+
+    def metric_families(self) -> List[Tuple]:
+        # For MetricsRegistry.register: stats() in the Prometheus exposition
+        # format. Every cache uses the same family names, told apart by
+        # their labels.
+        labels = (
+            f'namespace="{self.namespace}",backend="{type(self).__name__}"'
+        )
+        return [
+            (
+                'car_api_cache_hits_total',
+                'counter',
+                'Cache lookups that found a value.',
+                [f'car_api_cache_hits_total{{{labels}}} {self.hits}'],
+            ),
+            (
+                'car_api_cache_misses_total',
+                'counter',
+                'Cache lookups that found nothing or an expired value.',
+                [f'car_api_cache_misses_total{{{labels}}} {self.misses}'],
+            ),
+            (
+                'car_api_cache_entries',
+                'gauge',
+                'Entries held in the cache.',
+                [f'car_api_cache_entries{{{labels}}} {len(self)}'],
+            ),
+        ]
+
+    @abc.abstractmethod
+    def _get(self, key: Hashable) -> Optional[Any]:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def _set(self, key: Hashable, value: Any, expires_at: Optional[float]):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def incr(self, key: Hashable) -> int:
+        # Atomic counter, starting at 1. Counters never expire.
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def delete(self, key: Hashable) -> None:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+
+class MemoryCache(CacheBackend):
+    def __init__(
+        self,
+        namespace: str,
+        ttl: Optional[float] = None,
+        max_size: int = 1024,
+    ):
+        super().__init__(namespace, ttl)
+        self.max_size = max_size
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._data[key]
+                return None
+
+            self._data.move_to_end(key)
+            return value
+
+    def _set(self, key, value, expires_at):
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def incr(self, key):
+        with self._lock:
+            value, _ = self._data.get(key, (0, None))
+            self._data[key] = (value + 1, None)
+            self._data.move_to_end(key)
+            return value + 1
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SharedCache(CacheBackend):
+    # Stand-in for a networked cache (Redis, Memcached) that every worker
+    # process on the host can see. Values must be JSON serializable.
+
+    def __init__(
+        self,
+        namespace: str,
+        path: str,
+        ttl: Optional[float] = None,
+        max_size: int = 1024,
+    ):
+        super().__init__(namespace, ttl)
+        self.path = path
+        self.max_size = max_size
+        self._local = threading.local()
+
+        with self._connection() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS cache_entries ('
+                ' namespace TEXT NOT NULL,'
+                ' key TEXT NOT NULL,'
+                ' value TEXT NOT NULL,'
+                ' expires_at REAL,'
+                ' accessed_at REAL NOT NULL,'
+                ' PRIMARY KEY (namespace, key))'
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def _get(self, key):
+        conn = self._connection()
+        row = conn.execute(
+            'SELECT value, expires_at FROM cache_entries'
+            ' WHERE namespace = ? AND key = ?',
+            (self.namespace, str(key)),
+        ).fetchone()
+        if row is None:
+            return None
+
+        value, expires_at = row
+        if expires_at is not None and expires_at <= time.time():
+            self.delete(key)
+            return None
+
+        conn.execute(
+            'UPDATE cache_entries SET accessed_at = ?'
+            ' WHERE namespace = ? AND key = ?',
+            (time.time(), self.namespace, str(key)),
+        )
+        return json.loads(value)
+
+    def _set(self, key, value, expires_at):
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO cache_entries'
+                ' (namespace, key, value, expires_at, accessed_at)'
+                ' VALUES (?, ?, ?, ?, ?)',
+                (
+                    self.namespace,
+                    str(key),
+                    json.dumps(value),
+                    expires_at,
+                    time.time(),
+                ),
+            )
+            conn.execute(
+                'DELETE FROM cache_entries WHERE namespace = ? AND key IN ('
+                ' SELECT key FROM cache_entries WHERE namespace = ?'
+                ' ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)',
+                (self.namespace, self.namespace, self.max_size),
+            )
+
+    def incr(self, key):
+        row = self._connection().execute(
+            'INSERT INTO cache_entries'
+            ' (namespace, key, value, expires_at, accessed_at)'
+            " VALUES (?, ?, '1', NULL, ?)"
+            ' ON CONFLICT (namespace, key) DO UPDATE'
+            ' SET value = CAST(value AS INTEGER) + 1,'
+            ' expires_at = NULL, accessed_at = excluded.accessed_at'
+            ' RETURNING value',
+            (self.namespace, str(key), time.time()),
+        )
+        return int(row.fetchone()[0])
+
+    def delete(self, key):
+        self._connection().execute(
+            'DELETE FROM cache_entries WHERE namespace = ? AND key = ?',
+            (self.namespace, str(key)),
+        )
+
+    def clear(self):
+        self._connection().execute(
+            'DELETE FROM cache_entries WHERE namespace = ?',
+            (self.namespace,),
+        )
+
+    def __len__(self):
+        row = self._connection().execute(
+            'SELECT count(*) FROM cache_entries WHERE namespace = ?',
+            (self.namespace,),
+        )
+        return row.fetchone()[0]
+
+
+def make_cache(
+    backend: str,
+    namespace: str,
+    ttl: Optional[float] = None,
+    max_size: int = 1024,
+    shared_path: Optional[str] = None,
+) -> CacheBackend:
+    if backend == 'shared':
+        return SharedCache(namespace, shared_path, ttl=ttl, max_size=max_size)
+    return MemoryCache(namespace, ttl=ttl, max_size=max_size)
@@ -0,0 +1,220 @@
+import bisect
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from fastapi import Depends, Request
+from sqlalchemy import exists, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+
+from car_api.core.cache import CacheBackend, make_cache
+from car_api.core.database import Engines, get_session, is_replica
+from car_api.core.settings import Settings
+from car_api.models.cars import Brand, Car
+from car_api.schemas.brands import BrandPublicSchema
+
+VERSION_KEY = 'brands'
+
+
+class BrandCatalog:
+    # Every brand kept in memory, so brand reads and brand existence checks
+    # need no SQL. The version counter lives in the signal cache: a worker
+    # that changes a brand bumps it, and every other worker reloads on its
+    # next access (CACHE_BACKEND=shared makes the counter cross-process).
+
+    def __init__(self, signal: CacheBackend, max_age: float):
+        self.signal = signal
+        self.max_age = max_age
+        self.version: Optional[int] = None
+        self.loaded_at = 0.0
+        self._brands: Dict[int, BrandPublicSchema] = {}
+        self._row_versions: Dict[int, int] = {}
+        self._ids_by_name: Dict[str, int] = {}
+        self._ids: List[int] = []
+        self._instances: Dict[int, Brand] = {}
+        self._mappings: Dict[int, Dict] = {}
+
+    def current_version(self) -> int:
+        return self.signal.get(VERSION_KEY) or 0
+
+    def is_stale(self) -> bool:
+        return (
+            self.version is None
+            or self.version != self.current_version()
+            or time.monotonic() - self.loaded_at > self.max_age
+        )
+
+    async def ensure(self, db: AsyncSession) -> None:
+        if self.is_stale():
+            await self.load(db)
+
+    async def load(self, db: AsyncSession) -> None:
+        # The version is read first: a change committed during the load
+        # bumps it again and triggers one more reload. A lagging replica
+        # may not have that change yet, so a load from one leaves the
+        # catalog stale, for the next ensure() to reload from the primary.
+        version = self.current_version()
+        result = await db.execute(select(*Brand.__table__.c))
+
+        self._reset(
+            (BrandPublicSchema.model_validate(row._asdict()), row.version)
+            for row in result
+        )
+        self.version = None if is_replica(db) else version
+        self.loaded_at = time.monotonic()
+
+    def get(self, brand_id: int) -> Optional[BrandPublicSchema]:
+        return self._brands.get(brand_id)
+
+    def row_version(self, brand_id: int) -> Optional[int]:
+        return self._row_versions.get(brand_id)
+
+    def id_for(self, name: str) -> Optional[int]:
+        return self._ids_by_name.get(name)
+
+    def __contains__(self, brand_id: int) -> bool:
+        return brand_id in self._brands
+
+    def __len__(self) -> int:
+        return len(self._brands)
+
+    def page(
+        self,
+        after: Optional[int],
+        offset: int,
+        limit: int,
+        is_active: Optional[bool] = None,
+    ) -> List[BrandPublicSchema]:
+        # Same rows, in the same order, as the keyset query on brands.id.
+        start = 0 if after is None else bisect.bisect_right(self._ids, after)
+        brands = (self._brands[i] for i in self._ids[start:])
+        if is_active is not None:
+            brands = (b for b in brands if b.is_active == is_active)
+
+        page = []
+        for index, brand in enumerate(brands):
+            if index >= offset + limit:
+                break
+            if index >= offset:
+                page.append(brand)
+        return page
+
+    async def cover(self, db: AsyncSession, brand_ids: Iterable[int]) -> None:
+        # A brand created by another worker, or inserted directly, may not
+        # be here yet. The whole catalog is reloaded only when one of the
+        # missing brands exists: an unknown id costs one indexed lookup.
+        missing = {brand_id for brand_id in brand_ids if brand_id not in self}
+        if missing and await db.scalar(
+            select(exists().where(Brand.id.in_(missing)))
+        ):
+            await self.load(db)
+
+    async def attach(self, db: AsyncSession, cars: Iterable[Car]) -> None:
+        # Fills car.brand from the catalog instead of a selectinload. The
+        # instances are transient and set without events, so they are
+        # never added to a session: only call this once the cars will not
+        # be flushed again.
+        cars = list(cars)
+        await self.cover(db, (car.brand_id for car in cars))
+
+        for car in cars:
+            set_committed_value(car, 'brand', self._instance(car.brand_id))
+
+    def mapping(self, brand_id: int) -> Dict:
+        # The brand as a plain dict, for the fast serialization path.
+        mapping = self._mappings.get(brand_id)
+        if mapping is None:
+            mapping = self._brands[brand_id].model_dump()
+            self._mappings[brand_id] = mapping
+        return mapping
+
+    def write_through(self, brand: Brand) -> None:
+        schema = BrandPublicSchema.model_validate(brand)
+        self._publish(lambda: self._put(schema, brand.version))
+
+    def discard(self, brand_id: int) -> None:
+        self._publish(lambda: self._remove(brand_id))
+
+    def clear(self) -> None:
+        self._reset([])
+        self.version = None
+        self.signal.clear()
+
+    def _publish(self, change) -> None:
+        # Applies the change locally only when no other worker bumped the
+        # version since the last load, otherwise reloads on next access.
+        version = self.signal.incr(VERSION_KEY)
+        if self.version is not None and version == self.version + 1:
+            change()
+            self.version = version
+        else:
+            self.version = None
+
+    def _reset(self, entries: Iterable[Tuple[BrandPublicSchema, int]]) -> None:
+        self._brands = {}
+        self._row_versions = {}
+        for brand, row_version in entries:
+            self._brands[brand.id] = brand
+            self._row_versions[brand.id] = row_version
+        self._ids_by_name = {b.name: b.id for b in self._brands.values()}
+        self._ids = sorted(self._brands)
+        self._instances = {}
+        self._mappings = {}
+
+    def _put(self, brand: BrandPublicSchema, row_version: int) -> None:
+        previous = self._brands.get(brand.id)
+        if previous is None:
+            bisect.insort(self._ids, brand.id)
+        else:
+            self._ids_by_name.pop(previous.name, None)
+
+        self._brands[brand.id] = brand
+        self._row_versions[brand.id] = row_version
+        self._ids_by_name[brand.name] = brand.id
+        self._instances.pop(brand.id, None)
+        self._mappings.pop(brand.id, None)
+
+    def _remove(self, brand_id: int) -> None:
+        brand = self._brands.pop(brand_id, None)
+        if brand is not None:
+            del self._row_versions[brand_id]
+            self._ids.remove(brand_id)
+            self._ids_by_name.pop(brand.name, None)
+            self._instances.pop(brand_id, None)
+            self._mappings.pop(brand_id, None)
+
+    def _instance(self, brand_id: int) -> Brand:
+        instance = self._instances.get(brand_id)
+        if instance is None:
+            instance = Brand(**self._brands[brand_id].model_dump())
+            self._instances[brand_id] = instance
+        return instance
+
+
+def make_brand_catalog(settings: Settings) -> BrandCatalog:
+    return BrandCatalog(
+        make_cache(
+            settings.CACHE_BACKEND,
+            namespace='catalog',
+            shared_path=settings.SHARED_CACHE_PATH,
+        ),
+        max_age=settings.BRAND_CATALOG_MAX_AGE_SECONDS,
+    )
+
+
+async def get_brand_catalog(
+    request: Request,
+    db: AsyncSession = Depends(get_session),
+) -> BrandCatalog:
+    # Reloads go to the primary, a lagging replica could bring back the
+    # brands as they were before the change that bumped the version.
+    catalog = request.app.state.brand_catalog
+    await catalog.ensure(db)
+    return catalog
+
+
+async def warm_brand_catalog(catalog: BrandCatalog, engines: Engines) -> None:
+    # Errors propagate: a worker without its catalog would reject every
+    # brand, it must not report ready.
+    async with AsyncSession(engines.connect()) as db:
+        await catalog.load(db)
@@ -1,10 +1,322 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+import hashlib
+import itertools
+import logging
+import time
+from contextlib import AsyncExitStack
+from enum import Enum
+from typing import Dict, List, Optional, Sequence
 
+from fastapi import Request
+from sqlalchemy import Table, exc, insert
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
+    AsyncEngine,
+    AsyncSession,
+    create_async_engine,
+)
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from car_api.core.cache import CacheBackend, make_cache
+from car_api.core.metrics import instrument_engine
 from car_api.core.settings import Settings
+from car_api.core.slow_queries import SlowQueryLog
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    # Tracks how long checkouts take, including the wait for a free
+    # connection once pool_size + max_overflow are all in use.
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.max_wait_seconds = 0.0
+
+    def connect(self):
+        started_at = time.monotonic()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.monotonic() - started_at
+            self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+
+def engine_options(settings: Settings, url: Optional[str] = None) -> Dict:
+    url = make_url(url or settings.DATABASE_URL)
+    options = {'pool_pre_ping': settings.DATABASE_POOL_PRE_PING}
+
+    # An in-memory SQLite database lives in a single shared connection.
+    in_memory = url.database in {None, '', ':memory:'}
+    if url.get_backend_name() == 'sqlite' and in_memory:
+        return options
+
+    options.update(
+        poolclass=TimedQueuePool,
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+        pool_recycle=settings.DATABASE_POOL_RECYCLE,
+    )
+
+    timeout = settings.DATABASE_STATEMENT_TIMEOUT_MS
+    if timeout and url.get_backend_name() == 'postgresql':
+        # Set at connection startup, so it survives the pool's rollbacks.
+        if url.get_driver_name() == 'asyncpg':
+            options['connect_args'] = {
+                'server_settings': {'statement_timeout': str(timeout)}
+            }
+        else:
+            options['connect_args'] = {
+                'options': f'-c statement_timeout={timeout}'
+            }
+
+    return options
+
+
+class ReplicaSet:
+    # Round-robin over the read replicas. A replica that fails to hand out
+    # a connection is skipped for retry_after seconds.
+
+    def __init__(self, engines: Sequence[AsyncEngine], retry_after: float):
+        self.engines = list(engines)
+        self.retry_after = retry_after
+        self._counter = itertools.count()
+        self._down_until: Dict[int, float] = {}
+
+    def candidates(self) -> List[AsyncEngine]:
+        if not self.engines:
+            return []
+
+        start = next(self._counter) % len(self.engines)
+        ordered = self.engines[start:] + self.engines[:start]
+        return [engine for engine in ordered if self.is_healthy(engine)]
+
+    def mark_down(self, engine: AsyncEngine) -> None:
+        self._down_until[id(engine)] = time.monotonic() + self.retry_after
+
+    def is_healthy(self, engine: AsyncEngine) -> bool:
+        return self._down_until.get(id(engine), 0) <= time.monotonic()
+
+
+def is_replica(session: AsyncSession) -> bool:
+    return session.info.get('replica', False)
+
+
+def caller_key(request: Request) -> str:
+    # Authenticated callers are told apart by their token, anonymous ones
+    # by their address.
+    caller = request.headers.get('authorization') or (
+        request.client.host if request.client else ''
+    )
+    return hashlib.sha256(caller.encode()).hexdigest()
+
+
+def pool_stats(engine: AsyncEngine) -> Dict:
+    pool = engine.pool
+    stats = {'pool': type(pool).__name__}
+
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+            timeout=pool.timeout(),
+        )
+
+    if isinstance(pool, TimedQueuePool):
+        stats.update(
+            checkouts=pool.checkouts,
+            timeouts=pool.timeouts,
+            wait_seconds_total=pool.wait_seconds_total,
+            max_wait_seconds=pool.max_wait_seconds,
+        )
+
+    return stats
+
+
+def database_stats(engines: 'Engines') -> Dict:
+    # Served without authentication: counters only, no hosts or database
+    # names. Replicas are numbered in READ_REPLICA_URLS order.
+    primary = engines.connect()
+    replicas = engines.replicas
+    return {
+        **pool_stats(primary),
+        'replicas': [
+            {
+                'index': index,
+                'healthy': replicas.is_healthy(replica),
+                **pool_stats(replica),
+            }
+            for index, replica in enumerate(replicas.engines)
+        ],
+    }
+
+
+async def bulk_insert(
+    conn: AsyncConnection, table: Table, rows: Sequence[Dict]
+) -> None:
+    # COPY on PostgreSQL, a single executemany INSERT elsewhere. Columns
+    # left out of the rows take their server defaults either way.
+    columns = list(rows[0])
+    values = (
+        [
+            value.value if isinstance(value, Enum) else value
+            for value in (row[column] for column in columns)
+        ]
+        for row in rows
+    )
+
+    if conn.dialect.driver == 'psycopg':
+        raw = await conn.get_raw_connection()
+        cursor = raw.driver_connection.cursor()
+        async with cursor.copy(
+            f'COPY {table.name} ({", ".join(columns)}) FROM STDIN'
+        ) as copy:
+            for row in values:
+                await copy.write_row(row)
+        return
+
+    if conn.dialect.driver == 'asyncpg':
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            table.name, records=[tuple(row) for row in values], columns=columns
+        )
+        return
+
+    await conn.execute(insert(table), rows)
+
+
+class Engines:
+    # The primary and replica engines of one app. They are built from the
+    # settings on first use, normally by the app's lifespan rather than at
+    # import, and disposed again on shutdown.
+
+    def __init__(
+        self,
+        settings: Settings,
+        slow_query_log: Optional[SlowQueryLog] = None,
+    ):
+        self.settings = settings
+        self.slow_query_log = slow_query_log
+        self.primary: Optional[AsyncEngine] = None
+        self.replicas = ReplicaSet([], retry_after=0)
+
+    def connect(self) -> AsyncEngine:
+        if self.primary is not None:
+            return self.primary
+
+        settings = self.settings
+        self.primary = create_async_engine(
+            settings.DATABASE_URL, **engine_options(settings)
+        )
+        self.replicas = ReplicaSet(
+            [
+                create_async_engine(url, **engine_options(settings, url))
+                for url in settings.READ_REPLICA_URLS
+            ],
+            retry_after=settings.READ_REPLICA_RETRY_SECONDS,
+        )
+        for instrumented in (self.primary, *self.replicas.engines):
+            instrument_engine(instrumented)
+            if self.slow_query_log is not None:
+                self.slow_query_log.attach(instrumented)
+        return self.primary
+
+    async def warm_up(self, connections: int) -> int:
+        # Opens up to `connections` connections per engine, all at once so
+        # they are distinct, and returns them to the pool: the first
+        # requests find them idle instead of each paying for a connection
+        # setup. Never more than the pool keeps once they are returned.
+        # A primary that cannot be reached fails the startup, an unreachable
+        # replica is only left out of the reads.
+        opened = 0
+        for engine in (self.connect(), *self.replicas.engines):
+            pool = engine.pool
+            capacity = pool.size() if isinstance(pool, QueuePool) else 1
+            try:
+                async with AsyncExitStack() as stack:
+                    for _ in range(min(connections, capacity)):
+                        await stack.enter_async_context(engine.connect())
+                        opened += 1
+            except (exc.DBAPIError, OSError):
+                if engine is self.primary:
+                    raise
+                logger.warning(
+                    'Could not open the connections of %s at startup',
+                    engine.url.render_as_string(hide_password=True),
+                    exc_info=True,
+                )
+                self.replicas.mark_down(engine)
+        return opened
+
+    async def dispose(self) -> None:
+        if self.primary is None:
+            return
+
+        for engine in (self.primary, *self.replicas.engines):
+            await engine.dispose()
+        self.primary = None
+        self.replicas = ReplicaSet([], retry_after=0)
+
+
+def make_recent_writers(settings: Settings) -> CacheBackend:
+    return make_cache(
+        settings.CACHE_BACKEND,
+        namespace='writers',
+        ttl=settings.READ_YOUR_WRITES_SECONDS,
+        max_size=10_000,
+        shared_path=settings.SHARED_CACHE_PATH,
+    )
+
+
+async def get_session(request: Request):
+    state = request.app.state
+    # Marked before the handler runs, so a read sent as soon as this
+    # request returns already finds the caller among the recent writers.
+    if request.method not in SAFE_METHODS:
+        state.recent_writers.set(caller_key(request), True)
+
+    async with AsyncSession(
+        state.engines.connect(), expire_on_commit=False
+    ) as session:
+        yield session
+
+
+async def get_read_session(request: Request):
+    state = request.app.state
+    engines = state.engines
+    primary = engines.connect()
+    session = None
 
-engine = create_async_engine(Settings().DATABASE_URL)
+    # Recent writers read from the primary, so they see their own changes
+    # whatever the replication lag.
+    if state.recent_writers.get(caller_key(request)) is None:
+        for replica in engines.replicas.candidates():
+            session = AsyncSession(
+                replica, expire_on_commit=False, info={'replica': True}
+            )
+            try:
+                await session.connection()
+                break
+            except (exc.DBAPIError, OSError):
+                await session.close()
+                engines.replicas.mark_down(replica)
+                session = None
 
+    if session is None:
+        session = AsyncSession(primary, expire_on_commit=False)
 
-async def get_session():
-    async with AsyncSession(engine, expire_on_commit=False) as session:
+    async with session:
         yield session
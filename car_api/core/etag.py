@@ -0,0 +1,40 @@
+import hashlib
+from typing import Dict, Iterable
+
+from fastapi import Request, Response, status
+
+
+def make_etag(keys: Iterable) -> str:
+    # Strong validator built from the (id, version, ...) tuples of the rows
+    # behind a response: an update to any of them changes the tag.
+    digest = hashlib.blake2b(repr(list(keys)).encode(), digest_size=16)
+    return f'"{digest.hexdigest()}"'
+
+
+def has_validator(request: Request) -> bool:
+    return 'if-none-match' in request.headers
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get('if-none-match')
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+
+    # If-None-Match uses the weak comparison (RFC 9110, section 13.1.2).
+    tags = (tag.strip().removeprefix('W/') for tag in header.split(','))
+    return etag in tags
+
+
+def cache_headers(etag: str) -> Dict[str, str]:
+    # Responses depend on the caller: shared caches must not keep them and
+    # clients must revalidate before reusing them.
+    return {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+
+
+def not_modified(etag: str) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers=cache_headers(etag),
+    )
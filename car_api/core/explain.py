@@ -0,0 +1,88 @@
+import json
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import ClauseElement, Executable, Row
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.ext.compiler import compiles
+
+
+class Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement: ClauseElement, analyze: bool = False):
+        self.statement = statement
+        self.analyze = analyze
+
+
+def explain_prefix(dialect: str, analyze: bool = False) -> str:
+    if dialect == 'sqlite':
+        return 'EXPLAIN QUERY PLAN '
+    if dialect == 'postgresql':
+        options = 'ANALYZE, BUFFERS, FORMAT JSON' if analyze else 'FORMAT JSON'
+        return f'EXPLAIN ({options}) '
+    return 'EXPLAIN '
+
+
+@compiles(Explain)
+def _explain(element, compiler, **kw):
+    return explain_prefix(
+        compiler.dialect.name, element.analyze
+    ) + compiler.process(element.statement, **kw)
+
+
+def _plan(dialect: str, rows: List[Row]) -> List:
+    if dialect == 'postgresql':
+        plan = rows[0][0]
+        return json.loads(plan) if isinstance(plan, str) else plan
+
+    return [tuple(row) for row in rows]
+
+
+async def explain(conn: AsyncConnection, statement: ClauseElement) -> List:
+    result = await conn.execute(Explain(statement))
+    return _plan(conn.dialect.name, result.all())
+
+
+async def explain_sql(
+    conn: AsyncConnection,
+    statement: str,
+    parameters: Any = None,
+    analyze: bool = False,
+) -> List:
+    # A statement as the driver received it, with its parameters in the
+    # driver's own style.
+    prefix = explain_prefix(conn.dialect.name, analyze)
+    result = await conn.exec_driver_sql(prefix + statement, parameters)
+    return _plan(conn.dialect.name, result.all())
+
+
+async def estimated_rows(
+    conn: AsyncConnection, statement: ClauseElement
+) -> Optional[int]:
+    # The planner's row estimate, from table statistics, without running
+    # the statement. Only PostgreSQL plans carry one.
+    if conn.dialect.name != 'postgresql':
+        return None
+
+    plan = await explain(conn, statement)
+    return plan[0]['Plan']['Plan Rows']
+
+
+def _walk_postgresql(node: Dict) -> Iterator[Dict]:
+    yield node
+    for child in node.get('Plans', []):
+        yield from _walk_postgresql(child)
+
+
+def sequential_scans(plan: List, dialect: str, table: str) -> List[str]:
+    if dialect == 'postgresql':
+        return [
+            f'Seq Scan on {node["Relation Name"]}'
+            for node in _walk_postgresql(plan[0]['Plan'])
+            if node['Node Type'] == 'Seq Scan'
+            and node.get('Relation Name') == table
+        ]
+
+    # SQLite rows are (id, parent, notused, detail); a full table scan
+    # reads "SCAN <table>" while index lookups read "SEARCH <table> ...".
+    return [row[-1] for row in plan if row[-1] == f'SCAN {table}']
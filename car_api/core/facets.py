@@ -0,0 +1,80 @@
+import hashlib
+import json
+from typing import Any, Dict, Sequence, Tuple
+
+from fastapi import Request
+from sqlalchemy import Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from car_api.core.cache import CacheBackend, make_cache
+from car_api.core.explain import estimated_rows
+from car_api.core.settings import Settings
+
+
+def make_count_cache(settings: Settings) -> CacheBackend:
+    # Totals and facet counts are kept for a few seconds per filter set, so
+    # paging through the same results does not count them again; they may
+    # lag behind writes by up to COUNT_CACHE_TTL_SECONDS.
+    return make_cache(
+        settings.CACHE_BACKEND,
+        namespace='counts',
+        ttl=settings.COUNT_CACHE_TTL_SECONDS,
+        max_size=10_000,
+        shared_path=settings.SHARED_CACHE_PATH,
+    )
+
+
+def get_count_cache(request: Request) -> CacheBackend:
+    return request.app.state.count_cache
+
+
+def count_key(*parts: Any) -> str:
+    raw = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def facet_key(value: Any) -> str:
+    # Facet values become JSON object keys, booleans as true/false.
+    if isinstance(value, bool) or value is None:
+        return json.dumps(value)
+    return str(value)
+
+
+async def count_facets(
+    db: AsyncSession, query: Select, columns: Sequence
+) -> Tuple[int, Dict[str, Dict[str, int]]]:
+    # A single GROUP BY over every facet column: the total and the counts
+    # of each facet are sums over its groups.
+    count = func.count().label('count')
+    result = await db.execute(
+        query
+        .order_by(None)
+        .with_only_columns(*columns, count)
+        .group_by(*columns)
+    )
+
+    total = 0
+    facets = {column.key: {} for column in columns}
+    for row in result:
+        total += row.count
+        for column, value in zip(columns, row):
+            counts = facets[column.key]
+            key = facet_key(value)
+            counts[key] = counts.get(key, 0) + row.count
+
+    return total, facets
+
+
+async def count_rows(
+    db: AsyncSession, query: Select, estimate_above: int
+) -> Tuple[int, bool]:
+    # Returns (total, estimated). Past estimate_above rows the planner's
+    # estimate is used instead of counting them all.
+    query = query.order_by(None)
+
+    estimate = await estimated_rows(await db.connection(), query)
+    if estimate is not None and estimate > estimate_above:
+        return estimate, True
+
+    total = await db.scalar(select(func.count()).select_from(query.subquery()))
+    return total, False
@@ -0,0 +1,301 @@
+import itertools
+import math
+import random
+import string
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import AbstractSet, Dict, Iterator, List, Sequence, Tuple
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from car_api.core.database import bulk_insert
+from car_api.core.hashing import hash_password
+from car_api.models.cars import Brand, Car, FuelType, TransmissionType
+from car_api.models.users import User
+
+# Synthetic fleet data: the same seed always yields the same rows, and
+# every car passes CarSchema. Distributions are skewed the way a real
+# fleet is: a few brands and a few owners hold most of the cars (Zipf),
+# recent model years dominate, and prices follow a log-normal curve that
+# depends on the brand tier and the car's age.
+
+SEED = 20_240_601
+
+# Every synthetic user logs in with it; its hash is computed once.
+PASSWORD = 'fleet-password'
+
+CURRENT_YEAR = 2026
+OLDEST_MODEL_AGE = 30
+MIN_PRICE = 5_000
+
+BATCH_SIZE = 5_000
+
+BRAND_NAMES = (
+    'Volkswagen',
+    'Chevrolet',
+    'Fiat',
+    'Toyota',
+    'Hyundai',
+    'Honda',
+    'Renault',
+    'Jeep',
+    'Nissan',
+    'Ford',
+    'Peugeot',
+    'Citroën',
+    'BYD',
+    'Mitsubishi',
+    'Kia',
+    'BMW',
+    'Mercedes-Benz',
+    'Audi',
+    'Volvo',
+    'Porsche',
+)
+
+MODEL_NAMES = {
+    'Volkswagen': ('Gol', 'Polo', 'T-Cross', 'Nivus', 'Virtus', 'Saveiro'),
+    'Chevrolet': ('Onix', 'Tracker', 'S10', 'Spin', 'Cruze', 'Montana'),
+    'Fiat': ('Strada', 'Mobi', 'Argo', 'Toro', 'Pulse', 'Cronos'),
+    'Toyota': ('Corolla', 'Hilux', 'Yaris', 'Corolla Cross', 'SW4'),
+    'Hyundai': ('HB20', 'Creta', 'Tucson', 'HB20S'),
+    'Honda': ('Civic', 'City', 'HR-V', 'Fit', 'WR-V'),
+}
+
+# Cars of these brands cost about three times as much as the others.
+PREMIUM_BRANDS = {'BMW', 'Mercedes-Benz', 'Audi', 'Volvo', 'Porsche'}
+
+COLORS = ('Branco', 'Preto', 'Prata', 'Cinza', 'Vermelho', 'Azul', 'Verde')
+COLOR_WEIGHTS = (30, 25, 20, 15, 5, 4, 1)
+
+FUEL_WEIGHTS = {
+    FuelType.FLEX: 55,
+    FuelType.GASOLINE: 20,
+    FuelType.HYBRID: 8,
+    FuelType.DIESEL: 7,
+    FuelType.ELECTRIC: 5,
+    FuelType.ETHANOL: 5,
+}
+
+TRANSMISSION_WEIGHTS = {
+    TransmissionType.MANUAL: 45,
+    TransmissionType.AUTOMATIC: 35,
+    TransmissionType.CVT: 15,
+    TransmissionType.SEMI_AUTOMATIC: 5,
+}
+
+
+def zipf_weights(count: int, skew: float) -> List[float]:
+    # Rank r gets 1 / r ** skew: skew 0 is uniform, 1 a classic long tail.
+    return [1 / (rank**skew) for rank in range(1, count + 1)]
+
+
+def plate(index: int) -> str:
+    # Mercosul format (LLLNLNN), unique for the first 45 million indexes.
+    letters = string.ascii_uppercase
+    index, last_digits = divmod(index, 100)
+    index, fifth = divmod(index, 26)
+    index, fourth = divmod(index, 10)
+    prefix = ''
+    for _ in range(3):
+        index, letter = divmod(index, 26)
+        prefix = letters[letter] + prefix
+    return f'{prefix}{fourth}{letters[fifth]}{last_digits:02d}'
+
+
+def brand_name(index: int) -> str:
+    if index < len(BRAND_NAMES):
+        return BRAND_NAMES[index]
+    return f'Marca {index + 1:05d}'
+
+
+def user_email(index: int) -> str:
+    return f'user{index + 1:07d}@example.com'
+
+
+def brands(
+    count: int, first_index: int = 0, taken: AbstractSet[str] = frozenset()
+) -> Iterator[Dict]:
+    for index in range(first_index, first_index + count):
+        name = brand_name(index)
+        if name in taken:
+            name = f'{name} {index + 1}'
+        yield {
+            'name': name,
+            'description': f'Fabricante sintético {index + 1}',
+            'is_active': index % 20 != 19,
+        }
+
+
+def users(
+    count: int, password_hash: str, first_index: int = 0
+) -> Iterator[Dict]:
+    now = datetime.now(timezone.utc)
+    for index in range(first_index, first_index + count):
+        yield {
+            'username': f'user{index + 1:07d}',
+            'email': user_email(index),
+            'password': password_hash,
+            # Python side defaults, which COPY would skip.
+            'created_at': now,
+            'update_at': now,
+        }
+
+
+def cars(
+    count: int,
+    owner_ids: Sequence[int],
+    brands: Sequence[Tuple[int, str]],
+    seed: int = SEED,
+    owner_skew: float = 1.0,
+    brand_skew: float = 1.1,
+    first_index: int = 0,
+) -> Iterator[Dict]:
+    # Owners and brands are ranked by their position: the first ones get
+    # the most cars. `brands` holds (id, name) pairs.
+    rng = random.Random(seed)
+    owner_weights = _cumulative(zipf_weights(len(owner_ids), owner_skew))
+    brand_weights = _cumulative(zipf_weights(len(brands), brand_skew))
+    fuels, fuel_weights = _split(FUEL_WEIGHTS)
+    transmissions, transmission_weights = _split(TRANSMISSION_WEIGHTS)
+
+    for index in range(first_index, first_index + count):
+        brand_id, name = rng.choices(brands, cum_weights=brand_weights)[0]
+        age = min(int(rng.expovariate(1 / 4)), OLDEST_MODEL_AGE)
+        model_year = CURRENT_YEAR - age
+
+        yield {
+            'model': _model(rng, name),
+            'factory_year': model_year - (rng.random() < 0.3),
+            'model_year': model_year,
+            'color': rng.choices(COLORS, weights=COLOR_WEIGHTS)[0],
+            'plate': plate(index),
+            'fuel_type': rng.choices(fuels, weights=fuel_weights)[0].value,
+            'transmission': rng.choices(
+                transmissions, weights=transmission_weights
+            )[0].value,
+            'price': _price(rng, name, age),
+            'description': None,
+            'is_available': rng.random() < 0.85,
+            'brand_id': brand_id,
+            'owner_id': rng.choices(owner_ids, cum_weights=owner_weights)[0],
+        }
+
+
+def _cumulative(weights: Sequence[float]) -> List[float]:
+    return list(itertools.accumulate(weights))
+
+
+def _split(weights: Dict) -> Tuple[Tuple, Tuple]:
+    return tuple(weights), tuple(weights.values())
+
+
+def _model(rng: random.Random, brand: str) -> str:
+    models = MODEL_NAMES.get(brand)
+    if models is None:
+        return f'Modelo {rng.randint(1, 12)}'
+    return rng.choice(models)
+
+
+def _price(rng: random.Random, brand: str, age: int) -> Decimal:
+    median = 250_000 if brand in PREMIUM_BRANDS else 90_000
+    price = rng.lognormvariate(math.log(median), 0.35) * 0.88**age
+    return Decimal(max(round(price, 2), MIN_PRICE)).quantize(Decimal('0.01'))
+
+
+@dataclass
+class FleetSize:
+    users: int
+    brands: int
+    cars: int
+
+
+async def _count(conn: AsyncConnection, column) -> int:
+    return await conn.scalar(select(func.count(column)))
+
+
+async def _last_id(conn: AsyncConnection, column) -> int:
+    return await conn.scalar(select(func.max(column))) or 0
+
+
+async def _ids_after(conn: AsyncConnection, column, last_id: int) -> List:
+    result = await conn.execute(
+        select(column).where(column > last_id).order_by(column)
+    )
+    return list(result.scalars())
+
+
+async def _insert_batches(
+    conn: AsyncConnection, table, rows: Iterator[Dict], batch_size: int
+) -> None:
+    while batch := list(itertools.islice(rows, batch_size)):
+        await bulk_insert(conn, table, batch)
+
+
+async def seed_fleet(
+    conn: AsyncConnection,
+    size: FleetSize,
+    seed: int = SEED,
+    owner_skew: float = 1.0,
+    brand_skew: float = 1.1,
+    password: str = PASSWORD,
+    batch_size: int = BATCH_SIZE,
+) -> FleetSize:
+    # Adds the synthetic rows to whatever the database already holds; the
+    # new cars go to the new users and brands only. Returns the totals.
+    last_user_id = await _last_id(conn, User.id)
+    last_brand_id = await _last_id(conn, Brand.id)
+    last_car_id = await _last_id(conn, Car.id)
+    user_count = await _count(conn, User.id)
+    brand_count = await _count(conn, Brand.id)
+    car_count = await _count(conn, Car.id)
+    taken = set((await conn.execute(select(Brand.name))).scalars())
+
+    # Argon2 is deliberately slow: one hash serves every synthetic user.
+    password_hash = hash_password(password)
+    # Generated rows start past the highest id, not the row count: every
+    # row left from an earlier run was generated from an index below its
+    # id, so deletes in between cannot make usernames or plates repeat.
+    await _insert_batches(
+        conn,
+        User.__table__,
+        users(size.users, password_hash, first_index=last_user_id),
+        batch_size,
+    )
+    new_brands = list(brands(size.brands, last_brand_id, taken))
+    await _insert_batches(conn, Brand.__table__, iter(new_brands), batch_size)
+
+    # Ids are read back rather than assumed, sequences may have gaps.
+    owner_ids = await _ids_after(conn, User.id, last_user_id)
+    brand_ids = await _ids_after(conn, Brand.id, last_brand_id)
+    if size.cars:
+        if not owner_ids or not brand_ids:
+            raise ValueError('cars need new users and brands to refer to')
+        await _insert_batches(
+            conn,
+            Car.__table__,
+            cars(
+                size.cars,
+                owner_ids,
+                [
+                    (brand_id, brand['name'])
+                    for brand_id, brand in zip(brand_ids, new_brands)
+                ],
+                seed=seed,
+                owner_skew=owner_skew,
+                brand_skew=brand_skew,
+                first_index=last_car_id,
+            ),
+            batch_size,
+        )
+
+    # Fresh planner statistics for the new table sizes.
+    await conn.execute(text('ANALYZE'))
+
+    return FleetSize(
+        users=user_count + size.users,
+        brands=brand_count + size.brands,
+        cars=car_count + size.cars,
+    )
@@ -0,0 +1,174 @@
+import asyncio
+import functools
+import time
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Literal, Optional, Tuple
+
+from fastapi import HTTPException, status
+from pwdlib import PasswordHash
+
+
+@functools.cache
+def pwd_context() -> PasswordHash:
+    # Built on first use: loading the hashing backends takes longer than
+    # importing the rest of the module. Process workers build their own.
+    return PasswordHash.recommended()
+
+
+def hash_password(password: str) -> str:
+    return pwd_context().hash(password)
+
+
+def check_password(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context().verify(plain_password, hashed_password)
+
+
+def _timed_call(func: Callable, *args) -> tuple:
+    # Runs inside the worker: the start time shows how long the job waited
+    # in the executor queue (time.monotonic is system wide on Linux).
+    started_at = time.monotonic()
+    result = func(*args)
+    return started_at, time.monotonic(), result
+
+
+@dataclass
+class HasherMetrics:
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    rejected: int = 0
+    in_flight: int = 0
+    max_in_flight: int = 0
+    queue_seconds_total: float = 0.0
+    run_seconds_total: float = 0.0
+
+
+class PasswordHasher:
+    def __init__(
+        self,
+        executor: Literal['thread', 'process'] = 'thread',
+        max_workers: int = 4,
+        max_queue: int = 64,
+    ):
+        self.executor_type = executor
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor: Optional[Executor] = None
+        self._metrics = HasherMetrics()
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_type == 'process':
+                self._executor = ProcessPoolExecutor(self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    self.max_workers, thread_name_prefix='password-hasher'
+                )
+        return self._executor
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._submit(
+            check_password, plain_password, hashed_password
+        )
+
+    async def _submit(self, func: Callable, *args):
+        metrics = self._metrics
+
+        # Jobs beyond the workers plus the queue limit are rejected instead
+        # of piling up, so a login storm cannot starve the event loop.
+        if metrics.in_flight >= self.max_workers + self.max_queue:
+            metrics.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail='Password hashing service is busy',
+                headers={'Retry-After': '1'},
+            )
+
+        metrics.submitted += 1
+        metrics.in_flight += 1
+        metrics.max_in_flight = max(metrics.max_in_flight, metrics.in_flight)
+        submitted_at = time.monotonic()
+
+        try:
+            loop = asyncio.get_running_loop()
+            started_at, finished_at, result = await loop.run_in_executor(
+                self.executor, _timed_call, func, *args
+            )
+        except Exception:
+            metrics.failed += 1
+            raise
+        finally:
+            metrics.in_flight -= 1
+
+        metrics.completed += 1
+        metrics.queue_seconds_total += max(started_at - submitted_at, 0.0)
+        metrics.run_seconds_total += finished_at - started_at
+
+        return result
+
+    def metrics(self) -> Dict:
+        return {
+            **asdict(self._metrics),
+            'executor': self.executor_type,
+            'max_workers': self.max_workers,
+            'max_queue': self.max_queue,
+        }
+
+    def metric_families(self) -> List[Tuple]:
+        # For MetricsRegistry.register: the same numbers as metrics(), in
+        # the Prometheus exposition format.
+        metrics = self._metrics
+        labels = f'executor="{self.executor_type}"'
+        return [
+            (
+                'car_api_password_hash_jobs_total',
+                'counter',
+                'Password hash and verify jobs by outcome.',
+                [
+                    f'car_api_password_hash_jobs_total{{{labels},'
+                    f'outcome="{outcome}"}} {getattr(metrics, outcome)}'
+                    for outcome in ('completed', 'failed', 'rejected')
+                ],
+            ),
+            (
+                'car_api_password_hash_in_flight',
+                'gauge',
+                'Jobs running or waiting in the hashing executor.',
+                [
+                    f'car_api_password_hash_in_flight{{{labels}}} '
+                    f'{metrics.in_flight}'
+                ],
+            ),
+            (
+                'car_api_password_hash_queue_seconds_total',
+                'counter',
+                'Time jobs spent waiting for a hashing worker.',
+                [
+                    f'car_api_password_hash_queue_seconds_total{{{labels}}} '
+                    f'{metrics.queue_seconds_total}'
+                ],
+            ),
+            (
+                'car_api_password_hash_run_seconds_total',
+                'counter',
+                'Time spent hashing and verifying passwords.',
+                [
+                    f'car_api_password_hash_run_seconds_total{{{labels}}} '
+                    f'{metrics.run_seconds_total}'
+                ],
+            ),
+        ]
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
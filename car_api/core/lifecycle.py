@@ -0,0 +1,54 @@
+import asyncio
+import signal
+import threading
+
+STARTING = 'starting'
+READY = 'ready'
+DRAINING = 'draining'
+
+
+class Lifecycle:
+    # Where one worker is between startup and shutdown. It is ready only
+    # from the end of the warmup to SIGTERM, so a load balancer polling the
+    # readiness endpoint sends it traffic only in between.
+
+    def __init__(self):
+        self.status = STARTING
+
+    @property
+    def ready(self) -> bool:
+        return self.status == READY
+
+    def mark_ready(self) -> None:
+        self.status = READY
+
+    def start_draining(self) -> None:
+        self.status = DRAINING
+
+    def delay_shutdown(self, seconds: float) -> None:
+        # Called from the lifespan startup, after the server installed its
+        # own SIGTERM handler (uvicorn does). Once the server handles the
+        # signal it closes its sockets, and readiness can no longer be
+        # polled: so the worker first reports draining while still serving
+        # for `seconds`, then hands the signal over. A second SIGTERM goes
+        # straight through.
+        if seconds <= 0 or threading.current_thread() is not (
+            threading.main_thread()
+        ):
+            return
+
+        server_handler = signal.getsignal(signal.SIGTERM)
+        if not callable(server_handler):
+            return
+        loop = asyncio.get_running_loop()
+
+        def handle_term(sig, frame):
+            if self.status == DRAINING:
+                server_handler(sig, frame)
+                return
+            self.start_draining()
+            loop.call_soon_threadsafe(
+                loop.call_later, seconds, server_handler, sig, frame
+            )
+
+        signal.signal(signal.SIGTERM, handle_term)
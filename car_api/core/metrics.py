@@ -0,0 +1,391 @@
+import bisect
+import functools
+import inspect
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# The Prometheus client defaults, in seconds.
+LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.075,
+    0.1,
+    0.25,
+    0.5,
+    0.75,
+    1.0,
+    2.5,
+    5.0,
+    7.5,
+    10.0,
+)
+
+UNMATCHED_ROUTE = 'unmatched'
+
+# (name, type, help, samples): one metric family of the exposition format.
+Family = Tuple[str, str, str, List[str]]
+
+
+class RequestTimings:
+    # What one request spent, filled in by the engine hooks, TimedRoute and
+    # MetricsMiddleware.
+
+    __slots__ = (
+        'started_at',
+        'route',
+        'statements',
+        'db_seconds',
+        'serialization_seconds',
+        'endpoint_returned_at',
+        'response_started_at',
+    )
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.route: Optional[str] = None
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.serialization_seconds = 0.0
+        self.endpoint_returned_at: Optional[float] = None
+        self.response_started_at: Optional[float] = None
+
+    def response_started(self) -> None:
+        # Everything between the endpoint returning and the response
+        # headers going out is the response model and the JSON rendering.
+        self.response_started_at = time.perf_counter()
+        if self.endpoint_returned_at is not None:
+            self.serialization_seconds += (
+                self.response_started_at - self.endpoint_returned_at
+            )
+
+    def server_timing(self) -> str:
+        total = (self.response_started_at or time.perf_counter()) - (
+            self.started_at
+        )
+        return ', '.join((
+            f'db;dur={self.db_seconds * 1000:.2f};'
+            f'desc="{self.statements} SQL"',
+            f'serialize;dur={self.serialization_seconds * 1000:.2f}',
+            f'total;dur={total * 1000:.2f}',
+        ))
+
+
+current_timings: ContextVar[Optional[RequestTimings]] = ContextVar(
+    'current_timings', default=None
+)
+
+
+class Histogram:
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        bounds = [*(repr(b) for b in self.buckets), '+Inf']
+        total, counts = 0, []
+        for bound, count in zip(bounds, self.counts):
+            total += count
+            counts.append((bound, total))
+        return counts
+
+
+class RouteMetrics:
+    def __init__(self):
+        self.latency = Histogram()
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.serialization_seconds = 0.0
+        self.responses: Dict[int, int] = {}
+
+
+class MetricsRegistry:
+    # Per worker process: with several workers each one exposes its own
+    # numbers and Prometheus adds them up.
+
+    def __init__(self):
+        self.routes: Dict[Tuple[str, str], RouteMetrics] = {}
+        self.collectors: List[Callable[[], Iterable[Family]]] = []
+
+    def register(self, collector: Callable[[], Iterable[Family]]) -> None:
+        # Collectors are read at every scrape, for numbers kept elsewhere
+        # (executors, caches). Families of the same name are merged, so
+        # several collectors may contribute samples to one family.
+        self.collectors.append(collector)
+
+    def unregister(self, collector: Callable[[], Iterable[Family]]) -> None:
+        self.collectors.remove(collector)
+
+    def observe(
+        self, method: str, timings: RequestTimings, status_code: int
+    ) -> None:
+        route = timings.route or UNMATCHED_ROUTE
+        metrics = self.routes.get((method, route))
+        if metrics is None:
+            metrics = self.routes[method, route] = RouteMetrics()
+
+        metrics.latency.observe(time.perf_counter() - timings.started_at)
+        metrics.statements += timings.statements
+        metrics.db_seconds += timings.db_seconds
+        metrics.serialization_seconds += timings.serialization_seconds
+        metrics.responses[status_code] = (
+            metrics.responses.get(status_code, 0) + 1
+        )
+
+    def clear(self) -> None:
+        self.routes = {}
+
+    def render(self) -> str:
+        # Prometheus text exposition format, version 0.0.4.
+        lines = []
+
+        def family(name, kind, help_text, samples):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            lines.extend(samples)
+
+        routes = sorted(self.routes.items())
+        labels = {
+            key: f'method="{key[0]}",route="{_escape(key[1])}"'
+            for key, _ in routes
+        }
+
+        latency = []
+        for key, metrics in routes:
+            name = 'car_api_request_duration_seconds'
+            for bound, count in metrics.latency.cumulative():
+                latency.append(
+                    f'{name}_bucket{{{labels[key]},le="{bound}"}} {count}'
+                )
+            latency.append(
+                f'{name}_sum{{{labels[key]}}} {metrics.latency.sum}'
+            )
+            latency.append(
+                f'{name}_count{{{labels[key]}}} {metrics.latency.count}'
+            )
+        family(
+            'car_api_request_duration_seconds',
+            'histogram',
+            'Request latency by route.',
+            latency,
+        )
+
+        family(
+            'car_api_requests_total',
+            'counter',
+            'Responses by route and status code.',
+            [
+                f'car_api_requests_total{{{labels[key]},status="{status}"}} '
+                f'{count}'
+                for key, metrics in routes
+                for status, count in sorted(metrics.responses.items())
+            ],
+        )
+
+        for name, attribute, help_text in (
+            (
+                'car_api_sql_statements_total',
+                'statements',
+                'SQL statements executed by route.',
+            ),
+            (
+                'car_api_db_seconds_total',
+                'db_seconds',
+                'Time spent executing SQL statements by route.',
+            ),
+            (
+                'car_api_serialization_seconds_total',
+                'serialization_seconds',
+                'Time spent serializing responses by route.',
+            ),
+        ):
+            family(
+                name,
+                'counter',
+                help_text,
+                [
+                    f'{name}{{{labels[key]}}} {getattr(metrics, attribute)}'
+                    for key, metrics in routes
+                ],
+            )
+
+        collected: Dict[str, Family] = {}
+        for collector in self.collectors:
+            for name, kind, help_text, samples in collector():
+                if name in collected:
+                    collected[name][3].extend(samples)
+                else:
+                    collected[name] = (name, kind, help_text, list(samples))
+        for collected_family in collected.values():
+            family(*collected_family)
+
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', r'\\').replace('"', r'\"')
+
+
+request_metrics = MetricsRegistry()
+
+
+class MetricsMiddleware:
+    # Plain ASGI middleware: BaseHTTPMiddleware would run every request in
+    # an extra task and buffer streaming responses.
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        registry: MetricsRegistry = request_metrics,
+        server_timing: bool = True,
+    ):
+        self.app = app
+        self.registry = registry
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        status_code = 500
+
+        async def send_with_timings(message: Message) -> None:
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+                timings.response_started()
+                if self.server_timing:
+                    headers = MutableHeaders(scope=message)
+                    headers.append('Server-Timing', timings.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timings)
+        finally:
+            current_timings.reset(token)
+            self.registry.observe(scope['method'], timings, status_code)
+
+
+def _endpoint_returned() -> None:
+    timings = current_timings.get()
+    if timings is not None:
+        timings.endpoint_returned_at = time.perf_counter()
+
+
+def timed_endpoint(endpoint: Callable) -> Callable:
+    # Routes copied by include_router receive the already wrapped endpoint.
+    if getattr(endpoint, '__timed__', False):
+        return endpoint
+
+    if inspect.iscoroutinefunction(endpoint):
+
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                _endpoint_returned()
+
+    else:
+
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                _endpoint_returned()
+
+    wrapper.__timed__ = True
+    return wrapper
+
+
+class TimedRoute(APIRoute):
+    # Labels the request with the route template, not the raw path, and
+    # marks when the endpoint returned so serialization can be told apart.
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        super().__init__(path, timed_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        path_format = self.path_format
+
+        async def timed_handler(request: Request) -> Response:
+            timings = current_timings.get()
+            if timings is not None:
+                timings.route = route_template(path_format, request)
+            return await handler(request)
+
+        return timed_handler
+
+
+def route_template(path_format: str, request: Request) -> str:
+    # Depending on the FastAPI version, a route included with a prefix
+    # knows its full path or only its own part. The prefix is whatever
+    # precedes that part, filled with the path parameters, in the path.
+    path = request.scope['path']
+    own_path = path_format.format(**request.path_params)
+    if own_path and path.endswith(own_path):
+        return path[: len(path) - len(own_path)] + path_format
+    return path_format
+
+
+@contextmanager
+def serialization_timer():
+    # Serialization done inside an endpoint, such as MappingSerializer.
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings = current_timings.get()
+        if timings is not None:
+            timings.serialization_seconds += time.perf_counter() - started_at
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, many):
+    # Statements never nest on a connection. One that fails leaves its
+    # start behind, to be overwritten by the next.
+    conn.info['query_started_at'] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, many):
+    started_at = conn.info.pop('query_started_at', None)
+    timings = current_timings.get()
+    if timings is not None and started_at is not None:
+        timings.statements += 1
+        timings.db_seconds += time.perf_counter() - started_at
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    # SQLAlchemy runs the sync engine inside a greenlet that shares the
+    # request's context, so the hooks see its RequestTimings.
+    sync_engine = engine.sync_engine
+    if not event.contains(
+        sync_engine, 'before_cursor_execute', _before_cursor_execute
+    ):
+        event.listen(
+            sync_engine, 'before_cursor_execute', _before_cursor_execute
+        )
+        event.listen(
+            sync_engine, 'after_cursor_execute', _after_cursor_execute
+        )
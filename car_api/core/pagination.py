@@ -0,0 +1,84 @@
+import base64
+import binascii
+import json
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import Select, tuple_
+from sqlalchemy.orm import InstrumentedAttribute
+
+
+def encode_cursor(columns: Sequence[InstrumentedAttribute], row: Any) -> str:
+    payload = {
+        'k': [column.key for column in columns],
+        'v': [getattr(row, column.key) for column in columns],
+    }
+    raw = json.dumps(payload, default=str, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(
+    cursor: str, columns: Sequence[InstrumentedAttribute]
+) -> List:
+    try:
+        padding = '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(cursor + padding))
+        if payload['k'] != [column.key for column in columns]:
+            raise ValueError('cursor built for another ordering')
+        return [
+            column.type.python_type(value)
+            for column, value in zip(columns, payload['v'], strict=True)
+        ]
+    except (
+        binascii.Error,
+        UnicodeDecodeError,
+        KeyError,
+        TypeError,
+        ValueError,
+        ArithmeticError,
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='Cursor inválido',
+        )
+
+
+def paginate(
+    query: Select,
+    columns: Sequence[InstrumentedAttribute],
+    cursor: Optional[str],
+    offset: int,
+    limit: int,
+    ranked: bool = False,
+) -> Select:
+    # Ranked (search) results are already ordered by relevance, the key
+    # columns only break ties there, so cursors do not apply.
+    if ranked and cursor:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='Cursor não suportado em buscas',
+        )
+
+    query = query.order_by(*columns)
+
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        query = query.where(tuple_(*columns) > tuple_(*values))
+
+    # One extra row tells whether there is a next page.
+    return query.offset(offset).limit(limit + 1)
+
+
+def split_page(
+    rows: Sequence,
+    columns: Sequence[InstrumentedAttribute],
+    limit: int,
+    ranked: bool = False,
+) -> Tuple[Sequence, Optional[str]]:
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    if ranked:
+        return rows, None
+    return rows, encode_cursor(columns, rows[-1])
@@ -0,0 +1,131 @@
+import codecs
+import csv
+import io
+import json
+from enum import Enum
+from typing import (
+    AsyncIterator,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from fastapi import HTTPException, status
+
+
+class RecordFormat(str, Enum):
+    NDJSON = 'ndjson'
+    CSV = 'csv'
+
+
+MEDIA_TYPES = {
+    RecordFormat.NDJSON: 'application/x-ndjson',
+    RecordFormat.CSV: 'text/csv',
+}
+
+CONTENT_TYPES = {
+    'application/x-ndjson': RecordFormat.NDJSON,
+    'application/ndjson': RecordFormat.NDJSON,
+    'application/jsonl': RecordFormat.NDJSON,
+    'text/csv': RecordFormat.CSV,
+}
+
+
+def format_from_content_type(content_type: Optional[str]) -> RecordFormat:
+    media_type = (content_type or '').split(';')[0].strip().lower()
+
+    if media_type not in CONTENT_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail='Formato não suportado, use text/csv ou '
+            'application/x-ndjson',
+        )
+
+    return CONTENT_TYPES[media_type]
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    pending = ''
+
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split('\n')
+        for line in lines:
+            yield line.rstrip('\r')
+
+    pending += decoder.decode(b'', final=True)
+    if pending:
+        yield pending.rstrip('\r')
+
+
+async def read_records(
+    chunks: AsyncIterator[bytes], record_format: RecordFormat
+) -> AsyncIterator[Tuple[int, Union[Dict, str]]]:
+    # Yields (line number, record) pairs, or (line number, error message)
+    # for lines that cannot be parsed, holding one line in memory at a time.
+    # CSV fields are one per line: quoted values cannot span lines.
+    header = None
+    line_number = 0
+
+    async for line in iter_lines(chunks):
+        line_number += 1
+        if not line.strip():
+            continue
+
+        if record_format == RecordFormat.NDJSON:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                yield line_number, 'JSON inválido'
+                continue
+            if not isinstance(record, dict):
+                yield line_number, 'Registro deve ser um objeto JSON'
+                continue
+            yield line_number, record
+            continue
+
+        values = next(csv.reader([line]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+
+        if len(values) != len(header):
+            yield line_number, 'Número de colunas diferente do cabeçalho'
+            continue
+
+        # Empty cells are left out so optional fields keep their defaults.
+        record = {name: value for name, value in zip(header, values) if value}
+        yield line_number, record
+
+
+async def write_records(
+    batches: AsyncIterator[List[Dict]],
+    record_format: RecordFormat,
+    fieldnames: Sequence[str],
+) -> AsyncIterator[str]:
+    # Yields one chunk of text per batch, so the response is sent in a few
+    # large writes and only one batch is held in memory at a time.
+    if record_format == RecordFormat.NDJSON:
+        async for batch in batches:
+            yield ''.join(
+                json.dumps(record, separators=(',', ':')) + '\n'
+                for record in batch
+            )
+        return
+
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames, lineterminator='\n')
+    writer.writeheader()
+
+    async for batch in batches:
+        writer.writerows(batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
@@ -0,0 +1,110 @@
+from typing import Sequence, Tuple
+
+from sqlalchemy import (
+    DDL,
+    Select,
+    Table,
+    column,
+    event,
+    func,
+    literal_column,
+    or_,
+    table,
+)
+
+# The SQLite trigram tokenizer cannot match terms shorter than this.
+MIN_TRIGRAM_LENGTH = 3
+
+
+class SearchIndex:
+    # Substring search over a few text columns of a table.
+    #
+    # PostgreSQL: pg_trgm GIN indexes serve the ILIKE predicates and
+    # word_similarity ranks the results. SQLite: an external content FTS5
+    # table with the trigram tokenizer, kept in sync by triggers and ranked
+    # by bm25. Other dialects fall back to unranked ILIKE.
+
+    def __init__(self, source: Table, columns: Sequence[str]):
+        self.source = source
+        self.columns = tuple(columns)
+        self.name = f'{source.name}_search'
+        self.fts = table(self.name, column('rowid'), column('rank'))
+
+        for statement in self.sqlite_ddl():
+            event.listen(
+                source,
+                'after_create',
+                DDL(statement).execute_if(dialect='sqlite'),
+            )
+        for statement in self.postgresql_ddl():
+            event.listen(
+                source,
+                'after_create',
+                DDL(statement).execute_if(dialect='postgresql'),
+            )
+        event.listen(
+            source,
+            'before_drop',
+            DDL(f'DROP TABLE IF EXISTS {self.name}').execute_if(
+                dialect='sqlite'
+            ),
+        )
+
+    def sqlite_ddl(self) -> Sequence[str]:
+        source, name = self.source.name, self.name
+        names = ', '.join(self.columns)
+        new_values = ', '.join(f'new.{c}' for c in self.columns)
+        old_values = ', '.join(f'old.{c}' for c in self.columns)
+        delete_old = (
+            f'INSERT INTO {name}({name}, rowid, {names}) '
+            f"VALUES ('delete', old.id, {old_values});"
+        )
+        insert_new = (
+            f'INSERT INTO {name}(rowid, {names}) '
+            f'VALUES (new.id, {new_values});'
+        )
+        return (
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {name} USING fts5('
+            f"{names}, content='{source}', content_rowid='id', "
+            "tokenize='trigram')",
+            f'CREATE TRIGGER IF NOT EXISTS {name}_ai AFTER INSERT ON {source} '
+            f'BEGIN {insert_new} END',
+            f'CREATE TRIGGER IF NOT EXISTS {name}_ad AFTER DELETE ON {source} '
+            f'BEGIN {delete_old} END',
+            f'CREATE TRIGGER IF NOT EXISTS {name}_au AFTER UPDATE ON {source} '
+            f'BEGIN {delete_old} {insert_new} END',
+        )
+
+    def postgresql_ddl(self) -> Sequence[str]:
+        return ('CREATE EXTENSION IF NOT EXISTS pg_trgm',) + tuple(
+            f'CREATE INDEX IF NOT EXISTS ix_{self.source.name}_{c}_trgm '
+            f'ON {self.source.name} USING gin ({c} gin_trgm_ops)'
+            for c in self.columns
+        )
+
+    def apply(
+        self, query: Select, term: str, dialect: str
+    ) -> Tuple[Select, bool]:
+        # Returns the filtered query and whether it is ordered by relevance.
+        columns = [self.source.c[c] for c in self.columns]
+
+        if dialect == 'sqlite' and len(term) >= MIN_TRIGRAM_LENGTH:
+            phrase = '"{}"'.format(term.replace('"', '""'))
+            query = (
+                query
+                .join(self.fts, self.fts.c.rowid == self.source.c.id)
+                .where(literal_column(self.name).op('MATCH')(phrase))
+                .order_by(self.fts.c.rank)
+            )
+            return query, True
+
+        search_filter = f'%{term}%'
+        query = query.where(or_(*(c.ilike(search_filter) for c in columns)))
+
+        if dialect == 'postgresql':
+            relevance = func.greatest(
+                *(func.word_similarity(term, c) for c in columns)
+            )
+            return query.order_by(relevance.desc()), True
+
+        return query, False
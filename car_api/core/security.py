@@ -1,31 +1,62 @@
+import hashlib
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Dict, Optional
 
 import jwt
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from pwdlib import PasswordHash
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from car_api.core.cache import CacheBackend, MemoryCache, make_cache
 from car_api.core.database import get_session
+from car_api.core.hashing import PasswordHasher, check_password, hash_password
 from car_api.core.settings import Settings
 from car_api.models.users import User
 
-pwd_context = PasswordHash.recommended()
 security = HTTPBearer()
-settings = Settings()
+
+
+def make_password_hasher(settings: Settings) -> PasswordHasher:
+    return PasswordHasher(
+        executor=settings.PASSWORD_HASH_EXECUTOR,
+        max_workers=settings.PASSWORD_HASH_WORKERS,
+        max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+    )
+
+
+def make_user_cache(settings: Settings) -> CacheBackend:
+    return make_cache(
+        settings.CACHE_BACKEND,
+        namespace='users',
+        ttl=settings.USER_CACHE_TTL_SECONDS,
+        max_size=settings.USER_CACHE_MAX_SIZE,
+        shared_path=settings.SHARED_CACHE_PATH,
+    )
+
+
+def make_token_cache(settings: Settings) -> CacheBackend:
+    return MemoryCache('tokens', max_size=settings.TOKEN_CACHE_MAX_SIZE)
+
+
+def get_password_hasher(request: Request) -> PasswordHasher:
+    return request.app.state.password_hasher
+
+
+def get_user_cache(request: Request) -> CacheBackend:
+    return request.app.state.user_cache
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return hash_password(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return check_password(plain_password, hashed_password)
 
 
-def create_access_token(data: Dict) -> str:
+def create_access_token(data: Dict, settings: Settings) -> str:
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + timedelta(
         minutes=settings.JWT_EXPIRATION_MINUTES
@@ -39,12 +70,19 @@ def create_access_token(data: Dict) -> str:
     return encoded_jwt
 
 
-def verify_token(token: str) -> Dict:
+def verify_token(
+    token: str, settings: Settings, token_cache: CacheBackend
+) -> Dict:
+    digest = hashlib.sha256(token.encode()).digest()
+
+    payload = token_cache.get(digest)
+    if payload is not None:
+        return payload
+
     try:
         payload = jwt.decode(
             token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
         )
-        return payload
     except jwt.ExpiredSignatureError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -58,9 +96,22 @@ def verify_token(token: str) -> Dict:
             headers={'WWW-Authenticate': 'Bearer'},
         )
 
+    # Never keep a payload past its exp claim, so an expired token always
+    # falls through to jwt.decode and gets the usual 401.
+    ttl = settings.TOKEN_CACHE_TTL_SECONDS
+    if 'exp' in payload:
+        ttl = min(ttl, payload['exp'] - time.time())
+    if ttl > 0:
+        token_cache.set(digest, payload, ttl=ttl)
+
+    return payload
+
 
 async def authenticate_user(
-    email: str, password: str, db: AsyncSession
+    email: str,
+    password: str,
+    db: AsyncSession,
+    password_hasher: PasswordHasher,
 ) -> Optional[User]:
     result = await db.execute(select(User).where(User.email == email))
     user = result.scalar_one_or_none()
@@ -68,17 +119,21 @@ async def authenticate_user(
     if not user:
         return None
 
-    if not verify_password(password, user.password):
+    if not await password_hasher.verify(password, user.password):
         return None
 
     return user
 
 
 async def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: AsyncSession = Depends(get_session),
 ) -> User:
-    payload = verify_token(credentials.credentials)
+    state = request.app.state
+    payload = verify_token(
+        credentials.credentials, state.settings, state.token_cache
+    )
 
     user_id_str = payload.get('sub')
     if not user_id_str:
@@ -97,6 +152,11 @@ async def get_current_user(
             headers={'WWW-Authenticate': 'Bearer'},
         )
 
+    user_cache = state.user_cache
+    cached = user_cache.get(user_id)
+    if cached is not None:
+        return user_from_principal(cached)
+
     result = await db.execute(select(User).where(User.id == user_id))
     user = result.scalar_one_or_none()
 
@@ -107,9 +167,33 @@ async def get_current_user(
             headers={'WWW-Authenticate': 'Bearer'},
         )
 
+    user_cache.set(user_id, principal_from_user(user))
+
     return user
 
 
+def principal_from_user(user: User) -> Dict:
+    return {
+        'id': user.id,
+        'username': user.username,
+        'email': user.email,
+        'created_at': user.created_at.isoformat(),
+        'update_at': user.update_at.isoformat(),
+    }
+
+
+def user_from_principal(principal: Dict) -> User:
+    # Detached instance carrying only the public columns; handlers use it
+    # for identity and ownership checks, never to write back.
+    return User(
+        id=principal['id'],
+        username=principal['username'],
+        email=principal['email'],
+        created_at=datetime.fromisoformat(principal['created_at']),
+        update_at=datetime.fromisoformat(principal['update_at']),
+    )
+
+
 def verify_car_ownership(user: User, car_owner_id: int) -> None:
     if user.id != car_owner_id:
         raise HTTPException(
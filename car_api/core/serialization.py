@@ -0,0 +1,81 @@
+import functools
+from datetime import datetime
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+    Type,
+    Union,
+    get_args,
+    get_origin,
+)
+
+import orjson
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+from typing_extensions import TypedDict
+
+from car_api.core.metrics import serialization_timer
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:  # noqa: PLR6301
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def as_datetime(value: Any) -> datetime:
+    # Timestamps stored in string columns come back as ISO 8601 text.
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    return value
+
+
+@functools.cache
+def mapping_type(model: Type[BaseModel], total: bool = True) -> type:
+    # A TypedDict with the fields of the schema, nested schemas included.
+    # TypeAdapter serializes plain dicts against it with the same rules as
+    # the schema, without validating them first. With total=False any key
+    # may be left out, for sparse responses.
+    fields = {
+        name: _mapping_annotation(field.annotation, total)
+        for name, field in model.model_fields.items()
+    }
+    return TypedDict(f'{model.__name__}Mapping', fields, total=total)
+
+
+def _mapping_annotation(annotation: Any, total: bool) -> Any:
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return mapping_type(annotation, total)
+
+    # List[Schema], Optional[Schema] and the like.
+    args = get_args(annotation)
+    if args and get_origin(annotation) in {list, Union}:
+        args = tuple(_mapping_annotation(arg, total) for arg in args)
+        if get_origin(annotation) is list:
+            return List[args[0]]
+        return Union[args]
+
+    return annotation
+
+
+class MappingSerializer:
+    # Dumps row mappings shaped like the schema straight to JSON bytes.
+    # Keys missing from the schema are left out, as response_model does.
+
+    def __init__(self, model: Type[BaseModel], total: bool = True):
+        self.adapter = TypeAdapter(mapping_type(model, total))
+
+    def dump_json(self, content: Dict) -> bytes:
+        with serialization_timer():
+            return self.adapter.dump_json(content)
+
+    def response(
+        self, content: Dict, headers: Optional[Dict[str, str]] = None
+    ) -> Response:
+        return Response(
+            self.dump_json(content),
+            media_type='application/json',
+            headers=headers,
+        )
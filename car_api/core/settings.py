@@ -1,4 +1,9 @@
-from pydantic_settings import BaseSettings, SettingsConfigDict
+import functools
+from typing import Annotated, List, Literal
+
+from fastapi import Request
+from pydantic import field_validator
+from pydantic_settings import BaseSettings, NoDecode, SettingsConfigDict
 
 
 class Settings(BaseSettings):
@@ -7,7 +12,78 @@ class Settings(BaseSettings):
     )
 
     DATABASE_URL: str
+    DATABASE_POOL_SIZE: int = 10
+    DATABASE_MAX_OVERFLOW: int = 20
+    DATABASE_POOL_TIMEOUT: float = 10
+    DATABASE_POOL_RECYCLE: int = 1800
+    DATABASE_POOL_PRE_PING: bool = True
+    DATABASE_STATEMENT_TIMEOUT_MS: int = 30_000
+    DATABASE_POOL_WARMUP_CONNECTIONS: int = 2
+
+    READ_REPLICA_URLS: Annotated[List[str], NoDecode] = []
+    READ_YOUR_WRITES_SECONDS: float = 5
+    READ_REPLICA_RETRY_SECONDS: float = 30
 
     JWT_SECRET_KEY: str
     JWT_ALGORITHM: str = 'HS256'
     JWT_EXPIRATION_MINUTES: int = 30
+    TOKEN_CACHE_TTL_SECONDS: int = 300
+    TOKEN_CACHE_MAX_SIZE: int = 10_000
+
+    PASSWORD_HASH_EXECUTOR: Literal['thread', 'process'] = 'thread'
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 64
+
+    CACHE_BACKEND: Literal['memory', 'shared'] = 'memory'
+    SHARED_CACHE_PATH: str = 'car_api_cache.db'
+
+    USER_CACHE_TTL_SECONDS: int = 60
+    USER_CACHE_MAX_SIZE: int = 10_000
+    BRAND_CATALOG_MAX_AGE_SECONDS: int = 300
+
+    BULK_IMPORT_BATCH_SIZE: int = 1000
+    EXPORT_BATCH_SIZE: int = 1000
+
+    COUNT_CACHE_TTL_SECONDS: float = 10
+    COUNT_ESTIMATE_THRESHOLD: int = 100_000
+
+    FAST_JSON: bool = False
+
+    SERVER_TIMING: bool = True
+
+    SLOW_QUERY_MS: float = 500
+    SLOW_QUERY_EXPLAIN: bool = False
+    SLOW_QUERY_LOGS_PER_MINUTE: int = 60
+    SLOW_QUERY_LOG_PARAMETERS: bool = True
+    SLOW_QUERY_LOG_FILE: str = ''
+
+    SERVER_HOST: str = '0.0.0.0'
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: int = 0
+    SERVER_LOOP: Literal['auto', 'asyncio', 'uvloop'] = 'uvloop'
+    SERVER_HTTP: Literal['auto', 'h11', 'httptools'] = 'httptools'
+    SERVER_BACKLOG: int = 2048
+    SERVER_KEEP_ALIVE_SECONDS: int = 75
+    SERVER_GRACEFUL_SHUTDOWN_SECONDS: int = 30
+    SERVER_SHUTDOWN_DELAY_SECONDS: float = 5
+    SERVER_FORWARDED_ALLOW_IPS: str = '127.0.0.1'
+    SERVER_ACCESS_LOG: bool = False
+
+    @field_validator('READ_REPLICA_URLS', mode='before')
+    @classmethod
+    def split_urls(cls, value):
+        if isinstance(value, str):
+            return [url.strip() for url in value.split(',') if url.strip()]
+        return value
+
+
+@functools.cache
+def get_settings() -> Settings:
+    # Read once per process, for the default app and the command line
+    # tools: the environment and .env are parsed a single time.
+    return Settings()
+
+
+def get_app_settings(request: Request) -> Settings:
+    # The settings the handling app was created with.
+    return request.app.state.settings
@@ -0,0 +1,269 @@
+import asyncio
+import contextvars
+import hashlib
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Sequence, Set
+
+from sqlalchemy import event
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from car_api.core.cache import CacheBackend, make_cache
+from car_api.core.explain import explain_sql
+from car_api.core.metrics import current_timings
+from car_api.core.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+# Bound values are cut to this many characters in the log.
+MAX_PARAMETER_LENGTH = 200
+
+# Values bound to these columns are logged as REDACTED, so password
+# hashes and emails never reach the log.
+SENSITIVE_PARAMETERS = frozenset({'password', 'email'})
+REDACTED = '[redacted]'
+
+# Statements run by the log itself are not logged.
+SKIP_OPTION = 'slow_query_log'
+
+
+class RateLimiter:
+    # At most `limit` events per window; the rest are counted as dropped.
+
+    def __init__(self, limit: int, window: float = 60):
+        self.limit = limit
+        self.window = window
+        self.window_started_at = 0.0
+        self.count = 0
+        self.dropped = 0
+
+    def allow(self) -> bool:
+        now = time.monotonic()
+        if now - self.window_started_at >= self.window:
+            self.window_started_at = now
+            self.count = 0
+        if self.count >= self.limit:
+            self.dropped += 1
+            return False
+        self.count += 1
+        return True
+
+
+def _parameter(value: Any) -> Any:
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    text = value if isinstance(value, str) else repr(value)
+    if len(text) > MAX_PARAMETER_LENGTH:
+        return text[:MAX_PARAMETER_LENGTH] + '...'
+    return text
+
+
+def _is_sensitive(name: str) -> bool:
+    # Bind names carry the column name and a numeric suffix: email_1, or
+    # email_1_2 for the second value of an expanded IN.
+    return name.rstrip('_0123456789') in SENSITIVE_PARAMETERS
+
+
+def loggable_parameters(
+    parameters: Any, names: Optional[Sequence[str]] = None
+) -> Any:
+    # `names` are the bind names of positional parameters, in order.
+    if isinstance(parameters, dict):
+        return {
+            key: REDACTED if _is_sensitive(key) else _parameter(v)
+            for key, v in parameters.items()
+        }
+    if isinstance(parameters, (list, tuple)):
+        names = list(names or ())
+        if len(names) != len(parameters):
+            # An expanded IN adds positions the compiled names do not
+            # list: when one of them is sensitive, nothing is logged.
+            if any(_is_sensitive(name) for name in names):
+                return [REDACTED] * len(parameters)
+            names = [''] * len(parameters)
+        return [
+            REDACTED if _is_sensitive(name) else _parameter(v)
+            for name, v in zip(names, parameters)
+        ]
+    return _parameter(parameters)
+
+
+class SlowQueryLog:
+    # Logs, as one JSON object per line, every statement slower than the
+    # threshold with its parameters, duration and the route that ran it.
+    #
+    # With explain on, the plan is captured in the background on another
+    # connection, at most once per statement per `explained` TTL: EXPLAIN
+    # QUERY PLAN on SQLite, EXPLAIN (ANALYZE, BUFFERS) on PostgreSQL for
+    # SELECTs, which runs the query again, and a plain EXPLAIN otherwise.
+
+    def __init__(
+        self,
+        threshold_ms: float,
+        explain: bool,
+        limiter: RateLimiter,
+        explained: CacheBackend,
+        log_parameters: bool = True,
+    ):
+        self.threshold_ms = threshold_ms
+        self.explain = explain
+        self.limiter = limiter
+        self.explained = explained
+        self.log_parameters = log_parameters
+        self._tasks: Set[asyncio.Task] = set()
+
+    def attach(self, engine: AsyncEngine) -> None:
+        sync_engine = engine.sync_engine
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            conn.info['slow_query_started_at'] = time.perf_counter()
+
+        def after_cursor_execute(
+            conn, cursor, statement, parameters, context, executemany
+        ):
+            started_at = conn.info.pop('slow_query_started_at', None)
+            if started_at is None or not self.threshold_ms:
+                return
+            duration_ms = (time.perf_counter() - started_at) * 1000
+            if duration_ms < self.threshold_ms:
+                return
+            if context is not None and not context.execution_options.get(
+                SKIP_OPTION, True
+            ):
+                return
+            compiled = getattr(context, 'compiled', None)
+            self.record(
+                engine,
+                statement,
+                parameters,
+                duration_ms,
+                executemany,
+                getattr(compiled, 'positiontup', None),
+            )
+
+        event.listen(
+            sync_engine, 'before_cursor_execute', before_cursor_execute
+        )
+        event.listen(sync_engine, 'after_cursor_execute', after_cursor_execute)
+
+    def record(
+        self,
+        engine: AsyncEngine,
+        statement: str,
+        parameters: Any,
+        duration_ms: float,
+        executemany: bool = False,
+        parameter_names: Optional[Sequence[str]] = None,
+    ) -> None:
+        if not self.limiter.allow():
+            return
+
+        timings = current_timings.get()
+        entry = {
+            'event': 'slow_query',
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'duration_ms': round(duration_ms, 3),
+            'route': timings.route if timings is not None else None,
+            'dialect': engine.dialect.name,
+            'statement': statement,
+        }
+        if self.log_parameters:
+            entry['parameters'] = (
+                f'{len(parameters)} rows'
+                if executemany
+                else loggable_parameters(parameters, parameter_names)
+            )
+
+        if self.explain and not executemany and self._first_seen(statement):
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                loop = None
+            if loop is not None:
+                # Out of the request's context, so its metrics do not
+                # count the EXPLAIN.
+                task = loop.create_task(
+                    self._explain_and_log(
+                        engine, statement, parameters, entry
+                    ),
+                    context=contextvars.Context(),
+                )
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+                return
+
+        self._log(entry)
+
+    def _first_seen(self, statement: str) -> bool:
+        key = hashlib.sha256(statement.encode()).hexdigest()
+        if self.explained.get(key) is not None:
+            return False
+        self.explained.set(key, True)
+        return True
+
+    async def _explain_and_log(
+        self,
+        engine: AsyncEngine,
+        statement: str,
+        parameters: Any,
+        entry: Dict,
+    ) -> None:
+        analyze = engine.dialect.name == 'postgresql' and (
+            statement.lstrip()[:6].upper() == 'SELECT'
+        )
+        try:
+            # Never committed: whatever ANALYZE runs is rolled back.
+            explaining = engine.execution_options(**{SKIP_OPTION: False})
+            async with explaining.connect() as conn:
+                entry['plan'] = await explain_sql(
+                    conn, statement, parameters, analyze=analyze
+                )
+        except SQLAlchemyError as error:
+            entry['plan_error'] = str(error)
+        self._log(entry)
+
+    async def drain(self) -> None:
+        # Waits for the plans still being captured.
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    @staticmethod
+    def _log(entry: Dict) -> None:
+        logger.warning(json.dumps(entry, default=str))
+
+
+def configure_log_file(path: str) -> None:
+    # The JSON lines alone, without logging's prefix, in their own file.
+    # Once per file, however many apps the process builds.
+    path = os.path.abspath(path)
+    if any(
+        getattr(handler, 'baseFilename', None) == path
+        for handler in logger.handlers
+    ):
+        return
+    handler = logging.FileHandler(path, encoding='utf-8')
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(handler)
+
+
+def make_slow_query_log(settings: Settings) -> SlowQueryLog:
+    if settings.SLOW_QUERY_LOG_FILE:
+        configure_log_file(settings.SLOW_QUERY_LOG_FILE)
+
+    return SlowQueryLog(
+        threshold_ms=settings.SLOW_QUERY_MS,
+        explain=settings.SLOW_QUERY_EXPLAIN,
+        limiter=RateLimiter(settings.SLOW_QUERY_LOGS_PER_MINUTE),
+        explained=make_cache(
+            settings.CACHE_BACKEND,
+            namespace='slow_queries',
+            ttl=60,
+            max_size=1024,
+            shared_path=settings.SHARED_CACHE_PATH,
+        ),
+        log_parameters=settings.SLOW_QUERY_LOG_PARAMETERS,
+    )
@@ -0,0 +1,151 @@
+from typing import Sequence
+
+from sqlalchemy import (
+    DDL,
+    Column,
+    ForeignKey,
+    Integer,
+    Numeric,
+    Table,
+    event,
+)
+
+
+class SummaryTable:
+    # Aggregates of a table kept up to date by triggers: one row per
+    # distinct combination of the group columns, with the number of source
+    # rows and the sum of some numeric columns. Reading it costs the number
+    # of groups, not the number of source rows.
+    #
+    # Each insert adds the new row to its group, each delete subtracts the
+    # old row, and an update of a group or summed column does both. Groups
+    # that drop to zero rows are deleted.
+
+    def __init__(
+        self,
+        name: str,
+        source: Table,
+        group_by: Sequence[str],
+        sums: Sequence[str],
+    ):
+        self.name = name
+        self.source = source
+        self.group_by = tuple(group_by)
+        self.sums = tuple(sums)
+
+        self.table = Table(
+            name,
+            source.metadata,
+            *(self._group_column(c) for c in self.group_by),
+            Column('row_count', Integer, nullable=False),
+            *(
+                Column(
+                    f'{c}_total',
+                    Numeric(18, source.c[c].type.scale),
+                    nullable=False,
+                )
+                for c in self.sums
+            ),
+        )
+
+        # Created once every table exists: the triggers on the source
+        # table write to the summary table.
+        for statement in self.sqlite_ddl():
+            event.listen(
+                source.metadata,
+                'after_create',
+                DDL(statement).execute_if(dialect='sqlite'),
+            )
+        for statement in self.postgresql_ddl():
+            event.listen(
+                source.metadata,
+                'after_create',
+                DDL(statement).execute_if(dialect='postgresql'),
+            )
+        event.listen(
+            source.metadata,
+            'after_drop',
+            DDL(f'DROP FUNCTION IF EXISTS {name}_sync()').execute_if(
+                dialect='postgresql'
+            ),
+        )
+
+    def _group_column(self, name: str) -> Column:
+        column = self.source.c[name]
+        if column.foreign_keys:
+            # Typed from the referenced column, whose table may not be
+            # defined yet.
+            return Column(
+                name,
+                *(
+                    ForeignKey(fk.target_fullname)
+                    for fk in column.foreign_keys
+                ),
+                primary_key=True,
+            )
+        return Column(name, column.type, primary_key=True)
+
+    def _statements(self, old: str, new: str):
+        name = self.name
+        match_old = ' AND '.join(f'{c} = {old}.{c}' for c in self.group_by)
+        subtract = ', '.join(
+            ['row_count = row_count - 1']
+            + [f'{c}_total = {c}_total - {old}.{c}' for c in self.sums]
+        )
+        columns = ', '.join([
+            *self.group_by,
+            'row_count',
+            *(f'{c}_total' for c in self.sums),
+        ])
+        values = ', '.join(
+            [*(f'{new}.{c}' for c in self.group_by), '1']
+            + [f'{new}.{c}' for c in self.sums]
+        )
+        add = ', '.join(
+            [f'row_count = {name}.row_count + 1']
+            + [
+                f'{c}_total = {name}.{c}_total + excluded.{c}_total'
+                for c in self.sums
+            ]
+        )
+
+        remove_old = (
+            f'UPDATE {name} SET {subtract} WHERE {match_old}; '
+            f'DELETE FROM {name} WHERE {match_old} AND row_count = 0;'
+        )
+        add_new = (
+            f'INSERT INTO {name} ({columns}) VALUES ({values}) '
+            f'ON CONFLICT ({", ".join(self.group_by)}) DO UPDATE SET {add};'
+        )
+        return remove_old, add_new
+
+    def _watched(self) -> str:
+        return ', '.join((*self.group_by, *self.sums))
+
+    def sqlite_ddl(self) -> Sequence[str]:
+        name, source = self.name, self.source.name
+        remove_old, add_new = self._statements('old', 'new')
+        return (
+            f'CREATE TRIGGER IF NOT EXISTS {name}_ai AFTER INSERT ON {source} '
+            f'BEGIN {add_new} END',
+            f'CREATE TRIGGER IF NOT EXISTS {name}_ad AFTER DELETE ON {source} '
+            f'BEGIN {remove_old} END',
+            f'CREATE TRIGGER IF NOT EXISTS {name}_au AFTER UPDATE OF '
+            f'{self._watched()} ON {source} BEGIN {remove_old} {add_new} END',
+        )
+
+    def postgresql_ddl(self) -> Sequence[str]:
+        name, source = self.name, self.source.name
+        remove_old, add_new = self._statements('OLD', 'NEW')
+        return (
+            f'CREATE OR REPLACE FUNCTION {name}_sync() RETURNS trigger AS $$ '
+            "BEGIN IF TG_OP IN ('UPDATE', 'DELETE') THEN "
+            f'{remove_old} END IF; '
+            "IF TG_OP IN ('INSERT', 'UPDATE') THEN "
+            f'{add_new} END IF; '
+            'RETURN NULL; END $$ LANGUAGE plpgsql',
+            f'DROP TRIGGER IF EXISTS {name}_sync ON {source}',
+            f'CREATE TRIGGER {name}_sync AFTER INSERT OR DELETE OR UPDATE OF '
+            f'{self._watched()} ON {source} '
+            f'FOR EACH ROW EXECUTE FUNCTION {name}_sync()',
+        )
@@ -2,9 +2,20 @@ from decimal import Decimal
 from enum import Enum
 from typing import TYPE_CHECKING, List, Optional
 
-from sqlalchemy import ForeignKey, Integer, Numeric, String, Text, func
+from sqlalchemy import (
+    ForeignKey,
+    Index,
+    Integer,
+    Numeric,
+    String,
+    Text,
+    func,
+    literal_column,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
+from car_api.core.search import SearchIndex
+from car_api.core.summary import SummaryTable
 from car_api.models import Base
 
 if TYPE_CHECKING:
@@ -29,8 +40,13 @@ class TransmissionType(str, Enum):
 
 class Brand(Base):
     __tablename__ = 'brands'
+    __mapper_args__ = {'eager_defaults': True}
 
     id: Mapped[int] = mapped_column(primary_key=True)
+    version: Mapped[int] = mapped_column(
+        server_default='1',
+        onupdate=literal_column('version') + 1,
+    )
     name: Mapped[str] = mapped_column(String[50], unique=True)
     is_active: Mapped[bool] = mapped_column(default=True)
     description: Mapped[Optional[str]] = mapped_column(Text, default=None)
@@ -49,8 +65,27 @@ class Brand(Base):
 
 class Car(Base):
     __tablename__ = 'cars'
+    __table_args__ = (
+        Index('ix_cars_owner_id_id', 'owner_id', 'id'),
+        Index('ix_cars_owner_id_price_id', 'owner_id', 'price', 'id'),
+        Index(
+            'ix_cars_owner_id_is_available_price',
+            'owner_id',
+            'is_available',
+            'price',
+        ),
+        Index('ix_cars_owner_id_brand_id', 'owner_id', 'brand_id'),
+        Index('ix_cars_owner_id_fuel_type', 'owner_id', 'fuel_type'),
+        Index('ix_cars_owner_id_transmission', 'owner_id', 'transmission'),
+        Index('ix_cars_brand_id', 'brand_id'),
+    )
+    __mapper_args__ = {'eager_defaults': True}
 
     id: Mapped[int] = mapped_column(primary_key=True)
+    version: Mapped[int] = mapped_column(
+        server_default='1',
+        onupdate=literal_column('version') + 1,
+    )
 
     model: Mapped[str] = mapped_column(String[100])
     factory_year: Mapped[int] = mapped_column(Integer)
@@ -87,3 +122,13 @@ class Car(Base):
         'User',
         back_populates='cars',
     )
+
+
+brand_search = SearchIndex(Brand.__table__, ['name'])
+car_search = SearchIndex(Car.__table__, ['model', 'color', 'plate'])
+car_stats = SummaryTable(
+    'car_stats',
+    Car.__table__,
+    group_by=['owner_id', 'brand_id', 'fuel_type', 'model_year'],
+    sums=['price'],
+)
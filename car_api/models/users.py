@@ -1,9 +1,10 @@
 from typing import TYPE_CHECKING, List
 from datetime import datetime, timezone
 
-from sqlalchemy import DateTime, func
+from sqlalchemy import DateTime, func, literal_column
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
+from car_api.core.search import SearchIndex
 from car_api.models import Base
 
 if TYPE_CHECKING:
@@ -12,8 +13,13 @@ if TYPE_CHECKING:
 
 class User(Base):
     __tablename__ = 'users'
+    __mapper_args__ = {'eager_defaults': True}
 
     id: Mapped[int] = mapped_column(primary_key=True)
+    version: Mapped[int] = mapped_column(
+        server_default='1',
+        onupdate=literal_column('version') + 1,
+    )
     username: Mapped[str] = mapped_column(unique=True)
     password: Mapped[str]
     email: Mapped[str] = mapped_column(unique=True)
@@ -30,3 +36,6 @@ class User(Base):
     cars: Mapped[List['Car']] = relationship(
         back_populates='owner',
     )
+
+
+user_search = SearchIndex(User.__table__, ['username', 'email'])
@@ -2,15 +2,19 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from car_api.core.database import get_session
+from car_api.core.hashing import PasswordHasher
+from car_api.core.metrics import TimedRoute
 from car_api.core.security import (
     authenticate_user,
     create_access_token,
     get_current_user,
+    get_password_hasher,
 )
+from car_api.core.settings import Settings, get_app_settings
 from car_api.models.users import User
 from car_api.schemas.auth import LoginRequest, Token
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 
 @router.post(
@@ -21,9 +25,13 @@ router = APIRouter()
 )
 async def token(
     login_data: LoginRequest,
+    settings: Settings = Depends(get_app_settings),
+    password_hasher: PasswordHasher = Depends(get_password_hasher),
     db: AsyncSession = Depends(get_session),
 ):
-    user = await authenticate_user(login_data.email, login_data.password, db)
+    user = await authenticate_user(
+        login_data.email, login_data.password, db, password_hasher
+    )
 
     if not user:
         raise HTTPException(
@@ -31,7 +39,7 @@ async def token(
             detail='Incorrect email or password',
             headers={'WWW-Authenticate': 'Bearer'},
         )
-    access_token = create_access_token(data={'sub': str(user.id)})
+    access_token = create_access_token({'sub': str(user.id)}, settings)
 
     return {'access_token': access_token, 'token_type': 'bearer'}
 
@@ -42,7 +50,10 @@ async def token(
     status_code=status.HTTP_200_OK,
     summary='Atualizar token de acesso',
 )
-async def refresh_token(current_user: User = Depends(get_current_user)):
-    access_token = create_access_token(data={'sub': str(current_user.id)})
+async def refresh_token(
+    current_user: User = Depends(get_current_user),
+    settings: Settings = Depends(get_app_settings),
+):
+    access_token = create_access_token({'sub': str(current_user.id)}, settings)
 
     return {'access_token': access_token, 'token_type': 'bearer'}
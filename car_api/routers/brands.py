@@ -1,12 +1,30 @@
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
 from sqlalchemy import exists, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from car_api.core.database import get_session
+from car_api.core.catalog import BrandCatalog, get_brand_catalog
+from car_api.core.database import get_read_session, get_session
+from car_api.core.etag import (
+    cache_headers,
+    etag_matches,
+    has_validator,
+    make_etag,
+    not_modified,
+)
+from car_api.core.metrics import TimedRoute
+from car_api.core.pagination import decode_cursor, paginate, split_page
 from car_api.core.security import get_current_user
-from car_api.models.cars import Brand, Car
+from car_api.models.cars import Brand, Car, brand_search
 from car_api.models.users import User
 from car_api.schemas.brands import (
     BrandListPublicSchema,
@@ -15,7 +33,9 @@ from car_api.schemas.brands import (
     BrandUpdateSchema,
 )
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
+
+BRAND_ORDERING = (Brand.id,)
 
 
 @router.post(
@@ -27,6 +47,7 @@ router = APIRouter()
 async def create_brand(
     brand: BrandSchema,
     current_user: User = Depends(get_current_user),
+    catalog: BrandCatalog = Depends(get_brand_catalog),
     db: AsyncSession = Depends(get_session),
 ):
     name_exists = await db.scalar(
@@ -47,7 +68,7 @@ async def create_brand(
 
     db.add(db_brand)
     await db.commit()
-    await db.refresh(db_brand)
+    catalog.write_through(db_brand)
 
     return db_brand
 
@@ -59,8 +80,13 @@ async def create_brand(
     summary='Listar marcas',
 )
 async def list_brands(
+    request: Request,
+    response: Response,
     offset: int = Query(0, ge=0, description='Número de registros para pular'),
     limit: int = Query(100, ge=1, le=100, description='Limite de registros'),
+    cursor: Optional[str] = Query(
+        None, description='Cursor da próxima página (next_cursor)'
+    ),
     search: Optional[str] = Query(
         None, description='Buscar por nome da marca'
     ),
@@ -68,26 +94,46 @@ async def list_brands(
         None, description='Filtrar por marcas ativas'
     ),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_session),
+    catalog: BrandCatalog = Depends(get_brand_catalog),
+    db: AsyncSession = Depends(get_read_session),
 ):
-    query = select(Brand)
-
+    # Searches need the search index, every other listing is served from
+    # the catalog.
     if search:
-        search_filter = f'%{search}%'
-        query = query.where(Brand.name.ilike(search_filter))
-
-    if is_active is not None:
-        query = query.where(Brand.is_active == is_active)
-
-    query = query.offset(offset).limit(limit)
+        query, ranked = brand_search.apply(
+            select(Brand), search, db.bind.dialect.name
+        )
+        if is_active is not None:
+            query = query.where(Brand.is_active == is_active)
+        query = paginate(query, BRAND_ORDERING, cursor, offset, limit, ranked)
 
-    result = await db.execute(query)
-    brands = result.scalars().all()
+        if has_validator(request):
+            keys = await db.execute(
+                query.with_only_columns(Brand.id, Brand.version)
+            )
+            etag = make_etag(keys)
+            if etag_matches(request, etag):
+                return not_modified(etag)
+
+        result = await db.execute(query)
+        rows = result.scalars().all()
+        etag = make_etag((b.id, b.version) for b in rows)
+    else:
+        ranked = False
+        after = decode_cursor(cursor, BRAND_ORDERING)[0] if cursor else None
+        rows = catalog.page(after, offset, limit + 1, is_active)
+        etag = make_etag((b.id, catalog.row_version(b.id)) for b in rows)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+    response.headers.update(cache_headers(etag))
+    brands, next_cursor = split_page(rows, BRAND_ORDERING, limit, ranked)
 
     return {
         'brands': brands,
         'offset': offset,
         'limit': limit,
+        'next_cursor': next_cursor,
     }
 
 
@@ -99,10 +145,14 @@ async def list_brands(
 )
 async def get_brand(
     brand_id: int,
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
+    catalog: BrandCatalog = Depends(get_brand_catalog),
     db: AsyncSession = Depends(get_session),
 ):
-    brand = await db.get(Brand, brand_id)
+    await catalog.cover(db, [brand_id])
+    brand = catalog.get(brand_id)
 
     if not brand:
         raise HTTPException(
@@ -110,6 +160,11 @@ async def get_brand(
             detail='Marca não encontrada',
         )
 
+    etag = make_etag([(brand.id, catalog.row_version(brand.id))])
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers.update(cache_headers(etag))
+
     return brand
 
 
@@ -123,6 +178,7 @@ async def update_brand(
     brand_id: int,
     brand_update: BrandUpdateSchema,
     current_user: User = Depends(get_current_user),
+    catalog: BrandCatalog = Depends(get_brand_catalog),
     db: AsyncSession = Depends(get_session),
 ):
     brand = await db.get(Brand, brand_id)
@@ -154,7 +210,7 @@ async def update_brand(
         setattr(brand, field, value)
 
     await db.commit()
-    await db.refresh(brand)
+    catalog.write_through(brand)
 
     return brand
 
@@ -167,6 +223,7 @@ async def update_brand(
 async def delete_brand(
     brand_id: int,
     current_user: User = Depends(get_current_user),
+    catalog: BrandCatalog = Depends(get_brand_catalog),
     db: AsyncSession = Depends(get_session),
 ):
     brand = await db.get(Brand, brand_id)
@@ -188,3 +245,4 @@ async def delete_brand(
 
     await db.delete(brand)
     await db.commit()
+    catalog.discard(brand_id)
@@ -1,62 +1,489 @@
-from typing import Optional
+from collections import Counter
+from decimal import Decimal
+from typing import (
+    Annotated,
+    Dict,
+    FrozenSet,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import exists, select
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from pydantic import Field, ValidationError
+from sqlalchemy import (
+    Integer,
+    Row,
+    Select,
+    exists,
+    false,
+    literal,
+    null,
+    select,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
-
-from car_api.core.database import get_session
+from sqlalchemy.orm import joinedload, selectinload
+
+from car_api.core.cache import CacheBackend
+from car_api.core.catalog import BrandCatalog, get_brand_catalog
+from car_api.core.database import (
+    bulk_insert,
+    get_read_session,
+    get_session,
+)
+from car_api.core.etag import (
+    cache_headers,
+    etag_matches,
+    has_validator,
+    make_etag,
+    not_modified,
+)
+from car_api.core.facets import (
+    count_facets,
+    count_key,
+    count_rows,
+    get_count_cache,
+)
+from car_api.core.metrics import TimedRoute
+from car_api.core.pagination import paginate, split_page
+from car_api.core.records import (
+    MEDIA_TYPES,
+    RecordFormat,
+    format_from_content_type,
+    read_records,
+    write_records,
+)
 from car_api.core.security import get_current_user, verify_car_ownership
-from car_api.models.cars import Brand, Car, FuelType, TransmissionType
+from car_api.core.serialization import MappingSerializer, as_datetime
+from car_api.core.settings import Settings, get_app_settings
+from car_api.models.cars import (
+    Car,
+    FuelType,
+    TransmissionType,
+    car_search,
+    car_stats,
+)
 from car_api.models.users import User
 from car_api.schemas.cars import (
+    CarBulkImportPublicSchema,
+    CarExpand,
+    CarExportSchema,
+    CarFilterSchema,
+    CarInclude,
     CarListPublicSchema,
+    CarListSparsePublicSchema,
+    CarOrderBy,
     CarPublicSchema,
     CarSchema,
+    CarSparsePublicSchema,
+    CarStatsPublicSchema,
     CarUpdateSchema,
 )
+from car_api.schemas.users import UserPublicSchema
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
+CAR_ORDERINGS = {
+    CarOrderBy.ID: (Car.id,),
+    CarOrderBy.PRICE: (Car.price, Car.id),
+}
 
-@router.post(
-    path='/',
-    status_code=status.HTTP_201_CREATED,
-    response_model=CarPublicSchema,
-    summary='Criar novo carro',
+CAR_FACETS = (Car.fuel_type, Car.transmission, Car.brand_id, Car.is_available)
+
+CAR_FIELDS = tuple(
+    name for name in CarPublicSchema.model_fields if name in Car.__table__.c
 )
-async def create_car(
-    car: CarSchema,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_session),
-):
 
-    plate_exists = await db.scalar(
-        select(exists().where(Car.plate == car.plate))
+# Columns stored as plain strings, turned into the types CarPublicSchema
+# declares.
+CAR_CONVERSIONS = {
+    'fuel_type': FuelType,
+    'transmission': TransmissionType,
+    'created_at': as_datetime,
+    'update_at': as_datetime,
+}
+
+# The owner's columns, prefixed by owner_ so they can share the car row.
+OWNER_FIELDS = tuple(UserPublicSchema.model_fields)
+OWNER_COLUMNS = tuple(
+    User.__table__.c[name].label(f'owner_{name}')
+    for name in (*OWNER_FIELDS, 'version')
+)
+
+# Row path: cars are loaded as plain rows and dumped to JSON without
+# building the response schemas. Used for sparse responses (fields=,
+# expand=) and, with FAST_JSON, for full ones.
+car_serializer = MappingSerializer(CarPublicSchema, total=False)
+car_list_serializer = MappingSerializer(CarListPublicSchema, total=False)
+
+# The response models of the reads, full or sparse. Tried left to right, so
+# a full response is validated against the full schema only; sparse ones
+# take the row path and are documented here, not validated.
+CarResponse = Annotated[
+    Union[CarPublicSchema, CarSparsePublicSchema],
+    Field(union_mode='left_to_right'),
+]
+CarListResponse = Annotated[
+    Union[CarListPublicSchema, CarListSparsePublicSchema],
+    Field(union_mode='left_to_right'),
+]
+
+
+class CarView(NamedTuple):
+    # What a car response contains: the car fields, in schema order, and
+    # the relations embedded in it.
+    fields: Tuple[str, ...]
+    expand: FrozenSet[CarExpand]
+
+
+FULL_CAR_VIEW = CarView(CAR_FIELDS, frozenset(CarExpand))
+
+
+def average_price(total: Decimal, count: int) -> Decimal:
+    return (Decimal(total) / count).quantize(Decimal('0.01'))
+
+
+def split_names(value: Optional[str]) -> List[str]:
+    return [name.strip() for name in (value or '').split(',') if name.strip()]
+
+
+def car_view(
+    fields: Optional[str] = Query(
+        None,
+        description='Campos do carro, separados por vírgula (o id sempre '
+        'é incluído)',
+    ),
+    expand: Optional[str] = Query(
+        None,
+        description='Relações incluídas, separadas por vírgula: brand, owner',
+    ),
+) -> Optional[CarView]:
+    # None keeps the default response, with every field and relation.
+    if fields is None and expand is None:
+        return None
+
+    names = split_names(fields)
+    for name in names:
+        if name not in CAR_FIELDS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f'Campo inválido: {name}',
+            )
+    if not names:
+        names = CAR_FIELDS
+
+    relations = set()
+    for name in split_names(expand):
+        try:
+            relations.add(CarExpand(name))
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f'Relação inválida: {name}',
+            )
+
+    return CarView(
+        tuple(name for name in CAR_FIELDS if name == 'id' or name in names),
+        frozenset(relations),
     )
-    if plate_exists:
+
+
+def car_includes(
+    include: Optional[str] = Query(
+        None,
+        description='Informações extras, separadas por vírgula: total, facets',
+    ),
+) -> FrozenSet[CarInclude]:
+    includes = set()
+    for name in split_names(include):
+        try:
+            includes.add(CarInclude(name))
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f'Informação inválida: {name}',
+            )
+    return frozenset(includes)
+
+
+async def count_cars(
+    db: AsyncSession,
+    count_cache: CacheBackend,
+    query: Select,
+    includes: FrozenSet[CarInclude],
+    signature: Tuple,
+    estimate_threshold: int,
+) -> Dict:
+    key = count_key(Car.__tablename__, *signature, sorted(includes))
+    counts = count_cache.get(key)
+    if counts is not None:
+        return counts
+
+    counts = {}
+    if CarInclude.FACETS in includes:
+        # The grouped query visits every row anyway, its total is exact.
+        total, counts['facets'] = await count_facets(db, query, CAR_FACETS)
+        estimated = False
+    else:
+        total, estimated = await count_rows(db, query, estimate_threshold)
+    if CarInclude.TOTAL in includes:
+        counts.update(total=total, total_estimated=estimated)
+
+    count_cache.set(key, counts)
+    return counts
+
+
+def car_key_columns(view: CarView) -> List:
+    # Everything a car response is built from: the car, its brand (served
+    # by the catalog) and its owner, when they are embedded.
+    owner_version = User.version if CarExpand.OWNER in view.expand else null()
+    return [Car.id, Car.version, Car.brand_id, owner_version]
+
+
+def with_owner(query: Select, view: CarView) -> Select:
+    if CarExpand.OWNER in view.expand:
+        return query.join(Car.owner)
+    return query
+
+
+def car_etag(
+    catalog: BrandCatalog, keys, view: CarView, counts: Optional[Dict] = None
+) -> str:
+    # The view is part of the tag: a sparse response differs from the full
+    # one for the same rows. So are the counts: a change outside the page
+    # leaves its rows alone but not the total and facets in the body.
+    brand = CarExpand.BRAND in view.expand
+    return make_etag([
+        (view.fields, sorted(view.expand)),
+        sorted((counts or {}).items()),
+        *(
+            (
+                car_id,
+                version,
+                catalog.row_version(brand_id) if brand else None,
+                owner_version,
+            )
+            for car_id, version, brand_id, owner_version in keys
+        ),
+    ])
+
+
+def car_keys(cars: List[Car]) -> List[Tuple]:
+    return [(c.id, c.version, c.brand_id, c.owner.version) for c in cars]
+
+
+def row_keys(rows: List[Row], view: CarView) -> List[Tuple]:
+    owner = CarExpand.OWNER in view.expand
+    return [
+        (r.id, r.version, r.brand_id, r.owner_version if owner else None)
+        for r in rows
+    ]
+
+
+async def load_car_rows(
+    db: AsyncSession,
+    catalog: BrandCatalog,
+    query: Select,
+    view: CarView,
+    ordering: Sequence = (),
+) -> List[Row]:
+    # The ETag, ownership and cursor columns are always read, only the
+    # requested fields end up in the response.
+    names = {'id', 'version', 'brand_id', 'owner_id', *view.fields}
+    names.update(column.key for column in ordering)
+    columns = [column for column in Car.__table__.c if column.key in names]
+    if CarExpand.OWNER in view.expand:
+        columns.extend(OWNER_COLUMNS)
+
+    result = await db.execute(
+        with_owner(query, view).with_only_columns(*columns)
+    )
+    rows = result.all()
+    if CarExpand.BRAND in view.expand:
+        await catalog.cover(db, (row.brand_id for row in rows))
+    return rows
+
+
+def car_mappings(
+    catalog: BrandCatalog, rows: List[Row], view: CarView
+) -> List[Dict]:
+    # Rows are not validated again, only the string columns are converted.
+    cars = []
+    for row in rows:
+        values = row._mapping
+        car = {name: values[name] for name in view.fields}
+        for name, convert in CAR_CONVERSIONS.items():
+            if name in car:
+                car[name] = convert(car[name])
+        if CarExpand.BRAND in view.expand:
+            car['brand'] = catalog.mapping(row.brand_id)
+        if CarExpand.OWNER in view.expand:
+            car['owner'] = {
+                name: values[f'owner_{name}'] for name in OWNER_FIELDS
+            }
+        cars.append(car)
+    return cars
+
+
+async def load_car_references(
+    db: AsyncSession,
+    catalog: BrandCatalog,
+    plate: Optional[str],
+    brand_id: int,
+    owner_id: int,
+    car_id: Optional[int] = None,
+) -> User:
+    # Checks the plate and loads the owner in a single statement: the
+    # requested owner id is selected as a one row subquery and outer joined
+    # to users, so a missing owner comes back as None. The brand is checked
+    # against the catalog, which looks up the brands it does not know.
+    if plate:
+        plate_taken = exists().where(Car.plate == plate)
+        if car_id is not None:
+            plate_taken = plate_taken.where(Car.id != car_id)
+    else:
+        plate_taken = false()
+
+    requested = select(
+        literal(owner_id, Integer).label('owner_id'),
+        plate_taken.label('plate_taken'),
+    ).subquery()
+
+    result = await db.execute(
+        select(requested.c.plate_taken, User)
+        .select_from(requested)
+        .outerjoin(User, User.id == requested.c.owner_id)
+    )
+    plate_taken, owner = result.one()
+
+    if plate_taken:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail='Placa já está em uso',
         )
 
-    brand_exists = await db.scalar(
-        select(exists().where(Brand.id == car.brand_id))
-    )
-    if not brand_exists:
+    await catalog.cover(db, [brand_id])
+    if brand_id not in catalog:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail='Marca não encontrada',
         )
 
-    owner_exists = await db.scalar(
-        select(exists().where(User.id == car.owner_id))
-    )
-    if not owner_exists:
+    if owner is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail='Proprietario não encontrado',
         )
+
+    return owner
+
+
+async def import_car_batch(
+    db: AsyncSession,
+    catalog: BrandCatalog,
+    batch: List[Tuple[int, CarSchema]],
+    errors: List[Dict],
+) -> int:
+    plates = {car.plate for _, car in batch}
+    owner_ids = {car.owner_id for _, car in batch}
+
+    taken_plates = set(
+        await db.scalars(select(Car.plate).where(Car.plate.in_(plates)))
+    )
+    known_owners = set(
+        await db.scalars(select(User.id).where(User.id.in_(owner_ids)))
+    )
+
+    await catalog.cover(db, {car.brand_id for _, car in batch})
+
+    rows = []
+    for line, car in batch:
+        row_errors = []
+        if car.plate in taken_plates:
+            row_errors.append('Placa já está em uso')
+        if car.brand_id not in catalog:
+            row_errors.append('Marca não encontrada')
+        if car.owner_id not in known_owners:
+            row_errors.append('Proprietario não encontrado')
+
+        if row_errors:
+            errors.append({'line': line, 'errors': row_errors})
+            continue
+
+        # Later rows of the same file cannot reuse the plate either.
+        taken_plates.add(car.plate)
+        rows.append(car.model_dump())
+
+    if rows:
+        await insert_cars(db, rows)
+        await db.commit()
+
+    return len(rows)
+
+
+async def insert_cars(db: AsyncSession, rows: List[Dict]) -> None:
+    await bulk_insert(await db.connection(), Car.__table__, rows)
+
+
+def filter_cars(
+    query: Select, filters: CarFilterSchema, dialect: str
+) -> Tuple[Select, bool]:
+    ranked = False
+    if filters.search:
+        query, ranked = car_search.apply(query, filters.search, dialect)
+
+    if filters.brand_id is not None:
+        query = query.where(Car.brand_id == filters.brand_id)
+
+    if filters.owner_id is not None:
+        query = query.where(Car.owner_id == filters.owner_id)
+
+    if filters.fuel_type is not None:
+        query = query.where(Car.fuel_type == filters.fuel_type)
+
+    if filters.transmission is not None:
+        query = query.where(Car.transmission == filters.transmission)
+
+    if filters.is_available is not None:
+        query = query.where(Car.is_available == filters.is_available)
+
+    if filters.min_price is not None:
+        query = query.where(Car.price >= filters.min_price)
+
+    if filters.max_price is not None:
+        query = query.where(Car.price <= filters.max_price)
+
+    return query, ranked
+
+
+@router.post(
+    path='/',
+    status_code=status.HTTP_201_CREATED,
+    response_model=CarPublicSchema,
+    summary='Criar novo carro',
+)
+async def create_car(
+    car: CarSchema,
+    current_user: User = Depends(get_current_user),
+    catalog: BrandCatalog = Depends(get_brand_catalog),
+    db: AsyncSession = Depends(get_session),
+):
+    owner = await load_car_references(
+        db, catalog, car.plate, car.brand_id, car.owner_id
+    )
+
     db_car = Car(
         model=car.model,
         factory_year=car.factory_year,
@@ -69,116 +496,293 @@ async def create_car(
         description=car.description,
         is_available=car.is_available,
         brand_id=car.brand_id,
-        owner_id=car.owner_id,
+        owner=owner,
     )
 
     db.add(db_car)
     await db.commit()
-    await db.refresh(db_car)
+    await catalog.attach(db, [db_car])
 
-    result = await db.execute(
-        select(Car)
-        .options(selectinload(Car.brand), selectinload(Car.owner))
-        .where(Car.id == db_car.id)
+    return db_car
+
+
+@router.post(
+    path='/bulk',
+    status_code=status.HTTP_200_OK,
+    response_model=CarBulkImportPublicSchema,
+    summary='Importar carros em lote',
+    openapi_extra={
+        'requestBody': {
+            'required': True,
+            'content': {
+                'text/csv': {'schema': {'type': 'string'}},
+                'application/x-ndjson': {'schema': {'type': 'string'}},
+            },
+        }
+    },
+)
+async def bulk_import_cars(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    catalog: BrandCatalog = Depends(get_brand_catalog),
+    settings: Settings = Depends(get_app_settings),
+    db: AsyncSession = Depends(get_session),
+):
+    record_format = format_from_content_type(
+        request.headers.get('content-type')
     )
-    car_with_relations = result.scalar_one()
 
-    return car_with_relations
+    received = 0
+    imported = 0
+    errors = []
+    batch = []
+
+    async for line, record in read_records(request.stream(), record_format):
+        received += 1
+
+        if isinstance(record, str):
+            errors.append({'line': line, 'errors': [record]})
+            continue
+
+        try:
+            batch.append((line, CarSchema.model_validate(record)))
+        except ValidationError as exc:
+            errors.append({
+                'line': line,
+                'errors': [
+                    f'{".".join(map(str, error["loc"]))}: {error["msg"]}'
+                    for error in exc.errors()
+                ],
+            })
+            continue
+
+        if len(batch) >= settings.BULK_IMPORT_BATCH_SIZE:
+            imported += await import_car_batch(db, catalog, batch, errors)
+            batch = []
+
+    if batch:
+        imported += await import_car_batch(db, catalog, batch, errors)
+
+    errors.sort(key=lambda error: error['line'])
+
+    return {'received': received, 'imported': imported, 'errors': errors}
 
 
 @router.get(
     path='/',
     status_code=status.HTTP_200_OK,
-    response_model=CarListPublicSchema,
+    response_model=CarListResponse,
+    response_model_exclude_unset=True,
     summary='Listar carros',
 )
 async def list_cars(
+    request: Request,
+    response: Response,
     offset: int = Query(0, ge=0, description='Número de registros para pular'),
     limit: int = Query(100, ge=1, le=100, description='Limite de registros'),
-    search: Optional[str] = Query(
-        None, description='Buscar por modelo, cor ou placa'
-    ),
-    brand_id: Optional[int] = Query(None, description='Filtrar por marca'),
-    owner_id: Optional[int] = Query(
-        None, description='Filtrar por proprietário'
+    cursor: Optional[str] = Query(
+        None, description='Cursor da próxima página (next_cursor)'
     ),
-    fuel_type: Optional[FuelType] = Query(
-        None, description='Filtrar por tipo de combustível'
+    order_by: CarOrderBy = Query(
+        CarOrderBy.ID, description='Ordenação da paginação'
     ),
-    transmission: Optional[TransmissionType] = Query(
-        None, description='Filtrar por transmissão'
-    ),
-    is_available: Optional[bool] = Query(
-        None, description='Filtrar por disponibilidade'
-    ),
-    min_price: Optional[float] = Query(None, description='Preço mínimo'),
-    max_price: Optional[float] = Query(None, description='Preço máximo'),
+    filters: CarFilterSchema = Depends(),
+    view: Optional[CarView] = Depends(car_view),
+    includes: FrozenSet[CarInclude] = Depends(car_includes),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_session),
+    catalog: BrandCatalog = Depends(get_brand_catalog),
+    settings: Settings = Depends(get_app_settings),
+    count_cache: CacheBackend = Depends(get_count_cache),
+    db: AsyncSession = Depends(get_read_session),
 ):
-    query = select(Car).options(
-        selectinload(Car.brand), selectinload(Car.owner)
-    )
-    query = query.where(Car.owner_id == current_user.id)
-
-    if search:
-        search_filter = f'%{search}%'
-        query = query.where(
-            (Car.model.ilike(search_filter))
-            | (Car.color.ilike(search_filter))
-            | (Car.plate.ilike(search_filter))
+    filtered = select(Car).where(Car.owner_id == current_user.id)
+    filtered, ranked = filter_cars(filtered, filters, db.bind.dialect.name)
+
+    ordering = CAR_ORDERINGS[order_by]
+    query = paginate(filtered, ordering, cursor, offset, limit, ranked)
+
+    # Sparse responses, and full ones with FAST_JSON, take the row path.
+    use_rows = view is not None or settings.FAST_JSON
+    view = view or FULL_CAR_VIEW
+
+    counts = {}
+    if includes:
+        counts = await count_cars(
+            db,
+            count_cache,
+            filtered,
+            includes,
+            (current_user.id, filters.model_dump(mode='json')),
+            settings.COUNT_ESTIMATE_THRESHOLD,
         )
 
-    if brand_id is not None:
-        query = query.where(Car.brand_id == brand_id)
-
-    if owner_id is not None:
-        query = query.where(Car.owner_id == owner_id)
-
-    if fuel_type is not None:
-        query = query.where(Car.fuel_type == fuel_type)
+    # Revalidation only reads the version columns of the page.
+    if has_validator(request):
+        keys = await db.execute(
+            with_owner(query, view).with_only_columns(*car_key_columns(view))
+        )
+        etag = car_etag(catalog, keys, view, counts)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+    if use_rows:
+        rows = await load_car_rows(db, catalog, query, view, ordering)
+        keys = row_keys(rows, view)
+    else:
+        result = await db.execute(query.options(selectinload(Car.owner)))
+        rows = result.scalars().all()
+        await catalog.attach(db, rows)
+        keys = car_keys(rows)
+    headers = cache_headers(car_etag(catalog, keys, view, counts))
+
+    cars, next_cursor = split_page(rows, ordering, limit, ranked)
+    content = {
+        'cars': cars,
+        'offset': offset,
+        'limit': limit,
+        'next_cursor': next_cursor,
+        **counts,
+    }
 
-    if transmission is not None:
-        query = query.where(Car.transmission == transmission)
+    if use_rows:
+        content['cars'] = car_mappings(catalog, cars, view)
+        return car_list_serializer.response(content, headers)
 
-    if is_available is not None:
-        query = query.where(Car.is_available == is_available)
+    response.headers.update(headers)
+    return content
 
-    if min_price is not None:
-        query = query.where(Car.price >= min_price)
 
-    if max_price is not None:
-        query = query.where(Car.price <= max_price)
+@router.get(
+    path='/export',
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse,
+    summary='Exportar carros',
+)
+async def export_cars(
+    format: RecordFormat = Query(
+        RecordFormat.NDJSON, description='Formato do arquivo exportado'
+    ),
+    filters: CarFilterSchema = Depends(),
+    current_user: User = Depends(get_current_user),
+    settings: Settings = Depends(get_app_settings),
+    db: AsyncSession = Depends(get_read_session),
+):
+    # Plain column rows instead of Car instances: nothing is kept in the
+    # session identity map, so memory stays flat however many rows match.
+    query = select(*Car.__table__.c).where(Car.owner_id == current_user.id)
+    query, _ = filter_cars(query, filters, db.bind.dialect.name)
+    query = query.order_by(Car.id).execution_options(
+        yield_per=settings.EXPORT_BATCH_SIZE
+    )
 
-    query = query.offset(offset).limit(limit)
+    async def batches():
+        result = await db.stream(query)
+        async for partition in result.partitions():
+            yield [
+                CarExportSchema(**row._asdict()).model_dump(mode='json')
+                for row in partition
+            ]
+
+    return StreamingResponse(
+        write_records(batches(), format, list(CarExportSchema.model_fields)),
+        media_type=MEDIA_TYPES[format],
+        headers={
+            'Content-Disposition': f'attachment; filename=cars.{format.value}'
+        },
+    )
 
-    result = await db.execute(query)
-    cars = result.scalars().all()
 
+@router.get(
+    path='/stats',
+    status_code=status.HTTP_200_OK,
+    response_model=CarStatsPublicSchema,
+    summary='Estatísticas dos carros',
+)
+async def car_statistics(
+    brand_id: Optional[int] = Query(None, description='ID da marca'),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_session),
+):
+    # car_stats holds one row per (owner, brand, fuel type, model year),
+    # kept up to date by triggers on cars: the cost follows the number of
+    # groups, not the number of cars.
+    stats = car_stats.table.c
+    query = select(stats).where(stats.owner_id == current_user.id)
+    if brand_id is not None:
+        query = query.where(stats.brand_id == brand_id)
+    rows = (await db.execute(query)).all()
+
+    brand_counts, brand_totals = Counter(), Counter()
+    fuel_types, model_years = Counter(), Counter()
+    for row in rows:
+        brand_counts[row.brand_id] += row.row_count
+        brand_totals[row.brand_id] += Decimal(row.price_total)
+        fuel_types[row.fuel_type] += row.row_count
+        model_years[str(row.model_year)] += row.row_count
+
+    count = brand_counts.total()
     return {
-        'cars': cars,
-        'offset': offset,
-        'limit': limit,
+        'count': count,
+        'average_price': (
+            average_price(brand_totals.total(), count) if count else None
+        ),
+        'brands': [
+            {
+                'brand_id': brand,
+                'count': brand_counts[brand],
+                'average_price': average_price(
+                    brand_totals[brand], brand_counts[brand]
+                ),
+            }
+            for brand in sorted(brand_counts)
+        ],
+        'fuel_types': dict(sorted(fuel_types.items())),
+        'model_years': dict(sorted(model_years.items())),
     }
 
 
 @router.get(
     path='/{car_id}',
     status_code=status.HTTP_200_OK,
-    response_model=CarPublicSchema,
+    response_model=CarResponse,
     summary='Buscar carro por ID',
 )
 async def get_car(
     car_id: int,
+    request: Request,
+    response: Response,
+    view: Optional[CarView] = Depends(car_view),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_session),
+    catalog: BrandCatalog = Depends(get_brand_catalog),
+    settings: Settings = Depends(get_app_settings),
+    db: AsyncSession = Depends(get_read_session),
 ):
-    result = await db.execute(
-        select(Car)
-        .options(selectinload(Car.brand), selectinload(Car.owner))
-        .where(Car.id == car_id)
-    )
-    car = result.scalar_one_or_none()
+    use_rows = view is not None or settings.FAST_JSON
+    view = view or FULL_CAR_VIEW
+
+    if has_validator(request):
+        result = await db.execute(
+            with_owner(
+                select(Car.owner_id, *car_key_columns(view)), view
+            ).where(Car.id == car_id)
+        )
+        row = result.one_or_none()
+        if row is not None:
+            verify_car_ownership(current_user, row.owner_id)
+            etag = car_etag(catalog, [row[1:]], view)
+            if etag_matches(request, etag):
+                return not_modified(etag)
+
+    if use_rows:
+        rows = await load_car_rows(
+            db, catalog, select(Car).where(Car.id == car_id), view
+        )
+        car = rows[0] if rows else None
+    else:
+        result = await db.execute(
+            select(Car).options(joinedload(Car.owner)).where(Car.id == car_id)
+        )
+        car = result.scalar_one_or_none()
 
     if not car:
         raise HTTPException(
@@ -188,6 +792,17 @@ async def get_car(
 
     verify_car_ownership(current_user, car.owner_id)
 
+    if use_rows:
+        return car_serializer.response(
+            car_mappings(catalog, [car], view)[0],
+            cache_headers(car_etag(catalog, row_keys([car], view), view)),
+        )
+
+    await catalog.attach(db, [car])
+    response.headers.update(
+        cache_headers(car_etag(catalog, car_keys([car]), view))
+    )
+
     return car
 
 
@@ -201,9 +816,13 @@ async def update_car(
     car_id: int,
     car_update: CarUpdateSchema,
     current_user: User = Depends(get_current_user),
+    catalog: BrandCatalog = Depends(get_brand_catalog),
     db: AsyncSession = Depends(get_session),
 ):
-    car = await db.get(Car, car_id)
+    result = await db.execute(
+        select(Car).options(joinedload(Car.owner)).where(Car.id == car_id)
+    )
+    car = result.scalar_one_or_none()
 
     if not car:
         raise HTTPException(
@@ -215,54 +834,27 @@ async def update_car(
 
     update_data = car_update.model_dump(exclude_unset=True)
 
-    if 'plate' in update_data and update_data['plate'] != car.plate:
-        plate_exists = await db.scalar(
-            select(
-                exists().where(
-                    (Car.plate == update_data['plate']) & (Car.id != car_id)
-                )
-            )
-        )
-        if plate_exists:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail='Placa já está em uso',
-            )
-
-    if 'brand_id' in update_data:
-        brand_exists = await db.scalar(
-            select(exists().where(Brand.id == update_data['brand_id']))
-        )
-        if not brand_exists:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail='Marca não encontrada',
-            )
-
-    if 'owner_id' in update_data:
-        owner_exists = await db.scalar(
-            select(exists().where(User.id == update_data['owner_id']))
+    plate = update_data.get('plate')
+    if plate == car.plate:
+        plate = None
+
+    if plate or 'brand_id' in update_data or 'owner_id' in update_data:
+        car.owner = await load_car_references(
+            db,
+            catalog,
+            plate,
+            update_data.get('brand_id', car.brand_id),
+            update_data.get('owner_id', car.owner_id),
+            car_id=car_id,
         )
-        if not owner_exists:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail='Proprietario não encontrado',
-            )
 
     for field, value in update_data.items():
         setattr(car, field, value)
 
     await db.commit()
-    await db.refresh(car)
+    await catalog.attach(db, [car])
 
-    result = await db.execute(
-        select(Car)
-        .options(selectinload(Car.brand), selectinload(Car.owner))
-        .where(Car.id == car_id)
-    )
-    car_with_relations = result.scalar_one()
-
-    return car_with_relations
+    return car
 
 
 @router.delete(
@@ -1,12 +1,35 @@
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
 from sqlalchemy import exists, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from car_api.core.database import get_session
-from car_api.core.security import get_current_user, get_password_hash
-from car_api.models.users import User
+from car_api.core.cache import CacheBackend
+from car_api.core.database import get_read_session, get_session
+from car_api.core.etag import (
+    cache_headers,
+    etag_matches,
+    has_validator,
+    make_etag,
+    not_modified,
+)
+from car_api.core.hashing import PasswordHasher
+from car_api.core.metrics import TimedRoute
+from car_api.core.pagination import paginate, split_page
+from car_api.core.security import (
+    get_current_user,
+    get_password_hasher,
+    get_user_cache,
+)
+from car_api.models.users import User, user_search
 from car_api.schemas.users import (
     UserListPublicSchema,
     UserPublicSchema,
@@ -14,7 +37,9 @@ from car_api.schemas.users import (
     UserUpdateSchema,
 )
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
+
+USER_ORDERING = (User.id,)
 
 
 @router.post(
@@ -25,20 +50,23 @@ router = APIRouter()
 )
 async def create_user(
     user: UserSchema,
+    password_hasher: PasswordHasher = Depends(get_password_hasher),
     db: AsyncSession = Depends(get_session),
 ):
-    username_exists = await db.scalar(
-        select(exists().where(User.username == user.username))
+    result = await db.execute(
+        select(
+            exists().where(User.username == user.username),
+            exists().where(User.email == user.email),
+        )
     )
+    username_exists, email_exists = result.one()
+
     if username_exists:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail='Username já está em uso',
         )
 
-    email_exists = await db.scalar(
-        select(exists().where(User.email == user.email))
-    )
     if email_exists:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -48,12 +76,11 @@ async def create_user(
     db_user = User(
         username=user.username,
         email=user.email,
-        password=get_password_hash(user.password),
+        password=await password_hasher.hash(user.password),
     )
 
     db.add(db_user)
     await db.commit()
-    await db.refresh(db_user)
 
     return db_user
 
@@ -65,28 +92,46 @@ async def create_user(
     summary='Listar usuários',
 )
 async def list_users(
+    request: Request,
+    response: Response,
     offset: int = Query(0, ge=0, description='Número de registros para pular'),
     limit: int = Query(100, ge=1, le=100, description='Limite de registros'),
+    cursor: Optional[str] = Query(
+        None, description='Cursor da próxima página (next_cursor)'
+    ),
     search: Optional[str] = Query(
         None, description='Buscar por username ou email'
     ),
-    db: AsyncSession = Depends(get_session),
+    db: AsyncSession = Depends(get_read_session),
 ):
     query = select(User)
 
+    ranked = False
     if search:
-        search_filter = f'%{search}%'
-        query = query.where(
-            (User.username.ilike(search_filter))
-            | (User.email.ilike(search_filter))
-        )
+        query, ranked = user_search.apply(query, search, db.bind.dialect.name)
 
-    query = query.offset(offset).limit(limit)
+    query = paginate(query, USER_ORDERING, cursor, offset, limit, ranked)
+
+    if has_validator(request):
+        keys = await db.execute(query.with_only_columns(User.id, User.version))
+        etag = make_etag(keys)
+        if etag_matches(request, etag):
+            return not_modified(etag)
 
     result = await db.execute(query)
-    users = result.scalars().all()
+    rows = result.scalars().all()
+    response.headers.update(
+        cache_headers(make_etag((u.id, u.version) for u in rows))
+    )
+
+    users, next_cursor = split_page(rows, USER_ORDERING, limit, ranked)
 
-    return {'users': users, 'offset': offset, 'limit': limit}
+    return {
+        'users': users,
+        'offset': offset,
+        'limit': limit,
+        'next_cursor': next_cursor,
+    }
 
 
 @router.get(
@@ -97,8 +142,18 @@ async def list_users(
 )
 async def get_user(
     user_id: int,
-    db: AsyncSession = Depends(get_session),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_session),
 ):
+    if has_validator(request):
+        version = await db.scalar(
+            select(User.version).where(User.id == user_id)
+        )
+        etag = make_etag([(user_id, version)])
+        if version is not None and etag_matches(request, etag):
+            return not_modified(etag)
+
     user = await db.get(User, user_id)
 
     if not user:
@@ -107,6 +162,10 @@ async def get_user(
             detail='Usuário não encontrado',
         )
 
+    response.headers.update(
+        cache_headers(make_etag([(user.id, user.version)]))
+    )
+
     return user
 
 
@@ -120,6 +179,8 @@ async def update_user(
     user_id: int,
     user_update: UserUpdateSchema,
     current_user: User = Depends(get_current_user),
+    password_hasher: PasswordHasher = Depends(get_password_hasher),
+    user_cache: CacheBackend = Depends(get_user_cache),
     db: AsyncSession = Depends(get_session),
 ):
     user = await db.get(User, user_id)
@@ -162,13 +223,15 @@ async def update_user(
             )
 
     if 'password' in update_data:
-        update_data['password'] = get_password_hash(update_data['password'])
+        update_data['password'] = await password_hasher.hash(
+            update_data['password']
+        )
 
     for field, value in update_data.items():
         setattr(user, field, value)
 
     await db.commit()
-    await db.refresh(user)
+    user_cache.delete(user_id)
 
     return user
 
@@ -181,6 +244,7 @@ async def update_user(
 async def delete_user(
     user_id: int,
     current_user: User = Depends(get_current_user),
+    user_cache: CacheBackend = Depends(get_user_cache),
     db: AsyncSession = Depends(get_session),
 ):
     user = await db.get(User, user_id)
@@ -193,3 +257,4 @@ async def delete_user(
 
     await db.delete(user)
     await db.commit()
+    user_cache.delete(user_id)
@@ -43,3 +43,4 @@ class BrandListPublicSchema(BaseModel):
     brands: List[BrandPublicSchema]
     offset: int
     limit: int
+    next_cursor: Optional[str] = None
@@ -1,14 +1,51 @@
 from datetime import datetime
 from decimal import Decimal
-from typing import List, Optional
+from enum import Enum
+from typing import Dict, List, Optional
 
-from pydantic import BaseModel, ConfigDict, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 from car_api.models.cars import FuelType, TransmissionType
 from car_api.schemas.brands import BrandPublicSchema
 from car_api.schemas.users import UserPublicSchema
 
 
+class CarOrderBy(str, Enum):
+    ID = 'id'
+    PRICE = 'price'
+
+
+class CarExpand(str, Enum):
+    BRAND = 'brand'
+    OWNER = 'owner'
+
+
+class CarInclude(str, Enum):
+    TOTAL = 'total'
+    FACETS = 'facets'
+
+
+class CarFilterSchema(BaseModel):
+    search: Optional[str] = Field(
+        None, description='Buscar por modelo, cor ou placa'
+    )
+    brand_id: Optional[int] = Field(None, description='Filtrar por marca')
+    owner_id: Optional[int] = Field(
+        None, description='Filtrar por proprietário'
+    )
+    fuel_type: Optional[FuelType] = Field(
+        None, description='Filtrar por tipo de combustível'
+    )
+    transmission: Optional[TransmissionType] = Field(
+        None, description='Filtrar por transmissão'
+    )
+    is_available: Optional[bool] = Field(
+        None, description='Filtrar por disponibilidade'
+    )
+    min_price: Optional[float] = Field(None, description='Preço mínimo')
+    max_price: Optional[float] = Field(None, description='Preço máximo')
+
+
 class CarSchema(BaseModel):
     model: str
     factory_year: int
@@ -123,7 +160,87 @@ class CarPublicSchema(BaseModel):
     owner: UserPublicSchema
 
 
+class CarSparsePublicSchema(BaseModel):
+    # A car sent with fields= or expand=: the id, the requested fields and
+    # the requested relations; the others are left out.
+    id: int
+    model: Optional[str] = None
+    factory_year: Optional[int] = None
+    model_year: Optional[int] = None
+    color: Optional[str] = None
+    plate: Optional[str] = None
+    fuel_type: Optional[FuelType] = None
+    transmission: Optional[TransmissionType] = None
+    price: Optional[Decimal] = None
+    description: Optional[str] = None
+    is_available: Optional[bool] = None
+    brand_id: Optional[int] = None
+    owner_id: Optional[int] = None
+    created_at: Optional[datetime] = None
+    update_at: Optional[datetime] = None
+    brand: Optional[BrandPublicSchema] = None
+    owner: Optional[UserPublicSchema] = None
+
+
+class CarExportSchema(BaseModel):
+    id: int
+    model: str
+    factory_year: int
+    model_year: int
+    color: str
+    plate: str
+    fuel_type: FuelType
+    transmission: TransmissionType
+    price: Decimal
+    description: Optional[str] = None
+    is_available: bool
+    brand_id: int
+    owner_id: int
+    created_at: datetime
+    update_at: datetime
+
+
+class CarFacetsSchema(BaseModel):
+    fuel_type: Dict[str, int]
+    transmission: Dict[str, int]
+    brand_id: Dict[str, int]
+    is_available: Dict[str, int]
+
+
 class CarListPublicSchema(BaseModel):
     cars: List[CarPublicSchema]
     offset: int
     limit: int
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+    total_estimated: Optional[bool] = None
+    facets: Optional[CarFacetsSchema] = None
+
+
+class CarListSparsePublicSchema(CarListPublicSchema):
+    cars: List[CarSparsePublicSchema]
+
+
+class CarBrandStatsSchema(BaseModel):
+    brand_id: int
+    count: int
+    average_price: Decimal
+
+
+class CarStatsPublicSchema(BaseModel):
+    count: int
+    average_price: Optional[Decimal] = None
+    brands: List[CarBrandStatsSchema]
+    fuel_types: Dict[str, int]
+    model_years: Dict[str, int]
+
+
+class CarImportErrorSchema(BaseModel):
+    line: int
+    errors: List[str]
+
+
+class CarBulkImportPublicSchema(BaseModel):
+    received: int
+    imported: int
+    errors: List[CarImportErrorSchema]
@@ -54,3 +54,4 @@ class UserListPublicSchema(BaseModel):
     users: List[UserPublicSchema]
     offset: int
     limit: int
+    next_cursor: Optional[str] = None
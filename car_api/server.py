@@ -0,0 +1,75 @@
+import argparse
+import os
+import sys
+from typing import Dict, List, Optional
+
+import uvicorn
+
+from car_api.core.settings import Settings, get_settings
+
+APP = 'car_api.app:app'
+
+
+def default_workers() -> int:
+    # One worker per CPU the process may run on; containers limited by a
+    # CPU quota rather than a cpuset should set SERVER_WORKERS instead.
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def server_options(
+    settings: Settings, args: Optional[argparse.Namespace] = None
+) -> Dict:
+    workers = getattr(args, 'workers', None) or settings.SERVER_WORKERS
+    workers = workers or default_workers()
+    if (
+        workers > 1
+        and settings.READ_REPLICA_URLS
+        and settings.CACHE_BACKEND != 'shared'
+    ):
+        # The recent writers would be kept per worker: a read served by
+        # another worker than the write could go to a lagging replica.
+        raise ValueError(
+            'READ_REPLICA_URLS com mais de um worker exige '
+            'CACHE_BACKEND=shared'
+        )
+    return {
+        'host': getattr(args, 'host', None) or settings.SERVER_HOST,
+        'port': getattr(args, 'port', None) or settings.SERVER_PORT,
+        'workers': workers,
+        'loop': settings.SERVER_LOOP,
+        'http': settings.SERVER_HTTP,
+        'backlog': settings.SERVER_BACKLOG,
+        # Longer than the idle timeout of the proxy in front, so the proxy
+        # is the one closing idle connections, never halfway a request.
+        'timeout_keep_alive': settings.SERVER_KEEP_ALIVE_SECONDS,
+        # On SIGTERM: stop accepting, let in-flight requests finish for up
+        # to this long, then run the lifespan shutdown.
+        'timeout_graceful_shutdown': settings.SERVER_GRACEFUL_SHUTDOWN_SECONDS,
+        'proxy_headers': True,
+        'forwarded_allow_ips': settings.SERVER_FORWARDED_ALLOW_IPS,
+        'access_log': settings.SERVER_ACCESS_LOG,
+        'server_header': False,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='car-api-server')
+    parser.add_argument('--host')
+    parser.add_argument('--port', type=int)
+    parser.add_argument('--workers', type=int)
+    args = parser.parse_args(argv)
+
+    try:
+        options = server_options(get_settings(), args)
+    except ValueError as error:
+        parser.error(str(error))
+
+    uvicorn.run(APP, **options)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,39 @@
+"""add cars pagination indexes
+
+Revision ID: b7d2e4f19a3c
+Revises: 541cc8d0ccc1
+Create Date: 2026-10-18 09:12:44.310582
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b7d2e4f19a3c"
+down_revision: Union[str, Sequence[str], None] = "541cc8d0ccc1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+
+    op.create_index(
+        "ix_cars_owner_id_id",
+        "cars",
+        ["owner_id", "id"],
+    )
+    op.create_index(
+        "ix_cars_owner_id_price_id",
+        "cars",
+        ["owner_id", "price", "id"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+
+    op.drop_index("ix_cars_owner_id_price_id", table_name="cars")
+    op.drop_index("ix_cars_owner_id_id", table_name="cars")
@@ -0,0 +1,93 @@
+"""add search indexes
+
+Revision ID: c41f8a0d6e27
+Revises: b7d2e4f19a3c
+Create Date: 2026-10-18 10:03:17.540912
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c41f8a0d6e27"
+down_revision: Union[str, Sequence[str], None] = "b7d2e4f19a3c"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SEARCH_COLUMNS = {
+    "brands": ["name"],
+    "cars": ["model", "color", "plate"],
+    "users": ["username", "email"],
+}
+
+
+def upgrade_sqlite(table: str, columns: list) -> None:
+    name = f"{table}_search"
+    names = ", ".join(columns)
+    new_values = ", ".join(f"new.{c}" for c in columns)
+    old_values = ", ".join(f"old.{c}" for c in columns)
+    delete_old = (
+        f"INSERT INTO {name}({name}, rowid, {names}) "
+        f"VALUES ('delete', old.id, {old_values});"
+    )
+    insert_new = (
+        f"INSERT INTO {name}(rowid, {names}) VALUES (new.id, {new_values});"
+    )
+
+    op.execute(
+        f"CREATE VIRTUAL TABLE {name} USING fts5({names}, "
+        f"content='{table}', content_rowid='id', tokenize='trigram')"
+    )
+    op.execute(
+        f"CREATE TRIGGER {name}_ai AFTER INSERT ON {table} "
+        f"BEGIN {insert_new} END"
+    )
+    op.execute(
+        f"CREATE TRIGGER {name}_ad AFTER DELETE ON {table} "
+        f"BEGIN {delete_old} END"
+    )
+    op.execute(
+        f"CREATE TRIGGER {name}_au AFTER UPDATE ON {table} "
+        f"BEGIN {delete_old} {insert_new} END"
+    )
+    op.execute(f"INSERT INTO {name}({name}) VALUES ('rebuild')")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+
+    dialect = op.get_bind().dialect.name
+
+    if dialect == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for table, columns in SEARCH_COLUMNS.items():
+            for column in columns:
+                op.execute(
+                    f"CREATE INDEX ix_{table}_{column}_trgm "
+                    f"ON {table} USING gin ({column} gin_trgm_ops)"
+                )
+
+    elif dialect == "sqlite":
+        for table, columns in SEARCH_COLUMNS.items():
+            upgrade_sqlite(table, columns)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+
+    dialect = op.get_bind().dialect.name
+
+    if dialect == "postgresql":
+        for table, columns in SEARCH_COLUMNS.items():
+            for column in columns:
+                op.execute(f"DROP INDEX ix_{table}_{column}_trgm")
+
+    elif dialect == "sqlite":
+        for table in SEARCH_COLUMNS:
+            name = f"{table}_search"
+            for suffix in ("ai", "ad", "au"):
+                op.execute(f"DROP TRIGGER {name}_{suffix}")
+            op.execute(f"DROP TABLE {name}")
@@ -0,0 +1,44 @@
+"""add cars filter indexes
+
+Revision ID: d93a5c7b2f04
+Revises: c41f8a0d6e27
+Create Date: 2026-10-18 10:47:52.118406
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d93a5c7b2f04"
+down_revision: Union[str, Sequence[str], None] = "c41f8a0d6e27"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = {
+    "ix_cars_owner_id_is_available_price": [
+        "owner_id",
+        "is_available",
+        "price",
+    ],
+    "ix_cars_owner_id_brand_id": ["owner_id", "brand_id"],
+    "ix_cars_owner_id_fuel_type": ["owner_id", "fuel_type"],
+    "ix_cars_owner_id_transmission": ["owner_id", "transmission"],
+    "ix_cars_brand_id": ["brand_id"],
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+
+    for name, columns in INDEXES.items():
+        op.create_index(name, "cars", columns)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+
+    for name in reversed(list(INDEXES)):
+        op.drop_index(name, table_name="cars")
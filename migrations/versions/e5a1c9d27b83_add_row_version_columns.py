@@ -0,0 +1,43 @@
+"""add row version columns
+
+Revision ID: e5a1c9d27b83
+Revises: d93a5c7b2f04
+Create Date: 2026-10-18 14:12:31.504217
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e5a1c9d27b83"
+down_revision: Union[str, Sequence[str], None] = "d93a5c7b2f04"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TABLES = ("users", "brands", "cars")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+
+    for table in TABLES:
+        op.add_column(
+            table,
+            sa.Column(
+                "version",
+                sa.Integer(),
+                server_default="1",
+                nullable=False,
+            ),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+
+    for table in reversed(TABLES):
+        op.drop_column(table, "version")
@@ -0,0 +1,116 @@
+"""add car stats
+
+Revision ID: f2b6d8e41c95
+Revises: e5a1c9d27b83
+Create Date: 2026-10-18 19:41:08.215634
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f2b6d8e41c95"
+down_revision: Union[str, Sequence[str], None] = "e5a1c9d27b83"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+GROUP_BY = ["owner_id", "brand_id", "fuel_type", "model_year"]
+WATCHED = ", ".join([*GROUP_BY, "price"])
+
+
+def statements(old: str, new: str) -> tuple:
+    match_old = " AND ".join(f"{c} = {old}.{c}" for c in GROUP_BY)
+    group = ", ".join(GROUP_BY)
+    new_group = ", ".join(f"{new}.{c}" for c in GROUP_BY)
+    remove_old = (
+        "UPDATE car_stats SET row_count = row_count - 1, "
+        f"price_total = price_total - {old}.price WHERE {match_old}; "
+        f"DELETE FROM car_stats WHERE {match_old} AND row_count = 0;"
+    )
+    add_new = (
+        f"INSERT INTO car_stats ({group}, row_count, price_total) "
+        f"VALUES ({new_group}, 1, {new}.price) "
+        f"ON CONFLICT ({group}) DO UPDATE SET "
+        "row_count = car_stats.row_count + 1, "
+        "price_total = car_stats.price_total + excluded.price_total;"
+    )
+    return remove_old, add_new
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+
+    op.create_table(
+        "car_stats",
+        sa.Column("owner_id", sa.Integer(), nullable=False),
+        sa.Column("brand_id", sa.Integer(), nullable=False),
+        sa.Column("fuel_type", sa.String(length=20), nullable=False),
+        sa.Column("model_year", sa.Integer(), nullable=False),
+        sa.Column("row_count", sa.Integer(), nullable=False),
+        sa.Column(
+            "price_total", sa.Numeric(precision=18, scale=2), nullable=False
+        ),
+        sa.ForeignKeyConstraint(["owner_id"], ["users.id"]),
+        sa.ForeignKeyConstraint(["brand_id"], ["brands.id"]),
+        sa.PrimaryKeyConstraint(*GROUP_BY),
+    )
+
+    dialect = op.get_bind().dialect.name
+
+    if dialect == "postgresql":
+        remove_old, add_new = statements("OLD", "NEW")
+        op.execute(
+            "CREATE OR REPLACE FUNCTION car_stats_sync() RETURNS trigger "
+            "AS $$ BEGIN IF TG_OP IN ('UPDATE', 'DELETE') THEN "
+            f"{remove_old} END IF; "
+            "IF TG_OP IN ('INSERT', 'UPDATE') THEN "
+            f"{add_new} END IF; "
+            "RETURN NULL; END $$ LANGUAGE plpgsql"
+        )
+        op.execute(
+            "CREATE TRIGGER car_stats_sync AFTER INSERT OR DELETE OR UPDATE "
+            f"OF {WATCHED} ON cars "
+            "FOR EACH ROW EXECUTE FUNCTION car_stats_sync()"
+        )
+
+    elif dialect == "sqlite":
+        remove_old, add_new = statements("old", "new")
+        op.execute(
+            "CREATE TRIGGER car_stats_ai AFTER INSERT ON cars "
+            f"BEGIN {add_new} END"
+        )
+        op.execute(
+            "CREATE TRIGGER car_stats_ad AFTER DELETE ON cars "
+            f"BEGIN {remove_old} END"
+        )
+        op.execute(
+            f"CREATE TRIGGER car_stats_au AFTER UPDATE OF {WATCHED} ON cars "
+            f"BEGIN {remove_old} {add_new} END"
+        )
+
+    # The cars that already exist.
+    group = ", ".join(GROUP_BY)
+    op.execute(
+        f"INSERT INTO car_stats ({group}, row_count, price_total) "
+        f"SELECT {group}, count(*), sum(price) FROM cars GROUP BY {group}"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+
+    dialect = op.get_bind().dialect.name
+
+    if dialect == "postgresql":
+        op.execute("DROP TRIGGER car_stats_sync ON cars")
+        op.execute("DROP FUNCTION car_stats_sync()")
+
+    elif dialect == "sqlite":
+        for suffix in ("ai", "ad", "au"):
+            op.execute(f"DROP TRIGGER car_stats_{suffix}")
+
+    op.drop_table("car_stats")
@@ -1,19 +1,33 @@
 import pytest
 import pytest_asyncio
 from fastapi.testclient import TestClient
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 
-from car_api.app import app
-from car_api.core.database import get_session
+from car_api.app import create_app
+from car_api.core.database import get_read_session, get_session
+from car_api.core.metrics import current_timings
 from car_api.core.security import get_password_hash
+from car_api.core.settings import get_settings
 from car_api.models import Base
 from car_api.models.cars import Brand, Car
 from car_api.models.users import User
 
 
+@pytest.fixture
+def database_url(tmp_path):
+    # A file, so the app's own engines see the tables the session creates.
+    return f'sqlite+aiosqlite:///{tmp_path}/car_api.db'
+
+
+@pytest.fixture
+def settings(database_url):
+    return get_settings().model_copy(update={'DATABASE_URL': database_url})
+
+
 @pytest_asyncio.fixture
-async def session():
-    engine = create_async_engine(url='sqlite+aiosqlite:///:memory:')
+async def session(database_url):
+    engine = create_async_engine(url=database_url)
 
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
@@ -23,19 +37,85 @@ async def session():
 
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
+    await engine.dispose()
+
+
+@pytest.fixture
+def statements(session):
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    engine = session.bind.sync_engine
+    event.listen(engine, 'before_cursor_execute', record)
+    yield executed
+    event.remove(engine, 'before_cursor_execute', record)
+
+
+query_budget_key = pytest.StashKey[dict]()
+
+
+@pytest.fixture(autouse=True)
+def query_budget(request):
+    # @pytest.mark.query_budget(n): every request the test makes with
+    # client may run at most n statements on the session fixture's engine.
+    # Statements run outside requests, as fixtures do, are not counted.
+    marker = request.node.get_closest_marker('query_budget')
+    if marker is None:
+        yield
+        return
+
+    statements_by_request = {}
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        timings = current_timings.get()
+        if timings is not None:
+            statements_by_request.setdefault(timings, []).append(statement)
+
+    engine = request.getfixturevalue('session').bind.sync_engine
+    event.listen(engine, 'before_cursor_execute', record)
+    request.node.stash[query_budget_key] = statements_by_request
+    yield
+    event.remove(engine, 'before_cursor_execute', record)
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    # Checked here rather than in the fixture teardown, so going over the
+    # budget fails the test instead of erroring it.
+    result = yield
+
+    statements_by_request = item.stash.get(query_budget_key, None)
+    if statements_by_request is not None:
+        budget = item.get_closest_marker('query_budget').args[0]
+        for timings, statements in statements_by_request.items():
+            if len(statements) > budget:
+                pytest.fail(
+                    f'{timings.route} ran {len(statements)} statements, '
+                    f'over the query budget of {budget}:\n'
+                    + '\n'.join(statements),
+                    pytrace=False,
+                )
+
+    return result
 
 
 @pytest.fixture
-def client(session):
+def client(session, settings):
     def get_session_override():
         return session
 
+    app = create_app(settings)
+    app.dependency_overrides[get_session] = get_session_override
+    app.dependency_overrides[get_read_session] = get_session_override
+
     with TestClient(app) as client:
-        app.dependency_overrides[get_session] = get_session_override
+        # Fixtures insert brands behind the catalog's back, after the
+        # startup load: the first request of the test loads them.
+        app.state.brand_catalog.clear()
         yield client
 
-    app.dependency_overrides.clear()
-
 
 @pytest_asyncio.fixture
 async def user_data():
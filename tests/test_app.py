@@ -0,0 +1,155 @@
+import asyncio
+import signal
+import subprocess
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import OperationalError
+
+from car_api.app import create_app
+from car_api.core.lifecycle import Lifecycle
+from car_api.core.metrics import request_metrics
+from car_api.core.serialization import FastJSONResponse
+from car_api.core.settings import get_settings
+
+
+class TestSettings:
+    def test_settings_are_read_once(self):
+        assert get_settings() is get_settings()
+
+
+class TestCreateApp:
+    def test_uses_given_settings(self, session, settings):
+        settings = settings.model_copy(
+            update={'FAST_JSON': True, 'USER_CACHE_MAX_SIZE': 5}
+        )
+        app = create_app(settings)
+
+        assert app.router.default_response_class is FastJSONResponse
+        with TestClient(app):
+            assert app.state.engines.settings is settings
+            assert app.state.user_cache.max_size == 5
+
+    def test_apps_do_not_share_state(self, session, settings):
+        first = create_app(
+            settings.model_copy(update={'TOKEN_CACHE_MAX_SIZE': 1})
+        )
+        second = create_app(settings)
+
+        with TestClient(first), TestClient(second):
+            assert first.state.engines is not second.state.engines
+            assert first.state.token_cache.max_size == 1
+            assert second.state.token_cache.max_size == (
+                settings.TOKEN_CACHE_MAX_SIZE
+            )
+
+    def test_lifespan_builds_engines_once(self, session, settings):
+        app = create_app(settings)
+        with TestClient(app) as client:
+            primary = app.state.engines.primary
+            assert primary is not None
+
+            assert client.get('/pool_stats').status_code == 200
+            assert app.state.engines.primary is primary
+
+        assert app.state.engines.primary is None
+
+    def test_shutdown_stops_password_hasher(self, session, settings):
+        app = create_app(settings)
+        with TestClient(app):
+            assert app.state.password_hasher.executor is not None
+
+        assert app.state.password_hasher._executor is None
+
+    def test_shutdown_unregisters_metrics(self, session, settings):
+        collectors = list(request_metrics.collectors)
+
+        with TestClient(create_app(settings)):
+            assert len(request_metrics.collectors) > len(collectors)
+
+        assert request_metrics.collectors == collectors
+
+    def test_unreachable_primary_fails_startup(self, tmp_path, settings):
+        url = f'sqlite+aiosqlite:///{tmp_path}/missing/car_api.db'
+        app = create_app(settings.model_copy(update={'DATABASE_URL': url}))
+        collectors = list(request_metrics.collectors)
+
+        with pytest.raises(OperationalError), TestClient(app):
+            pass
+
+        assert not app.state.lifecycle.ready
+        assert app.state.engines.primary is None
+        assert request_metrics.collectors == collectors
+
+    def test_missing_catalog_fails_startup(self, settings):
+        # The database answers but has no brands table.
+        app = create_app(settings)
+
+        with pytest.raises(OperationalError), TestClient(app):
+            pass
+
+        assert not app.state.lifecycle.ready
+
+    def test_import_is_lazy(self):
+        # A fresh interpreter: this one has long built everything.
+        code = (
+            'from car_api.app import app\n'
+            'from car_api.core import hashing\n'
+            "assert not hasattr(app.state, 'engines')\n"
+            'assert hashing.pwd_context.cache_info().currsize == 0\n'
+        )
+
+        subprocess.run([sys.executable, '-c', code], check=True)
+
+
+class TestHealth:
+    def test_liveness(self, client):
+        assert client.get('/health/live').json() == {'status': 'ok'}
+        assert client.get('/health_check').json() == {'status': 'ok'}
+
+    def test_ready_after_warmup(self, client):
+        response = client.get('/health/ready')
+
+        assert response.status_code == 200
+        assert response.json() == {'status': 'ready'}
+
+    def test_not_ready_before_startup(self):
+        # Without the context manager the lifespan never runs.
+        response = TestClient(create_app()).get('/health/ready')
+
+        assert response.status_code == 503
+        assert response.json() == {'status': 'starting'}
+
+
+class TestLifecycle:
+    @pytest.mark.asyncio
+    async def test_sigterm_reports_draining_before_server_stops(self):
+        received = []
+        previous = signal.signal(
+            signal.SIGTERM, lambda sig, frame: received.append(sig)
+        )
+        try:
+            lifecycle = Lifecycle()
+            lifecycle.mark_ready()
+            lifecycle.delay_shutdown(0.1)
+
+            signal.raise_signal(signal.SIGTERM)
+            await asyncio.sleep(0.01)
+
+            assert lifecycle.status == 'draining'
+            assert not received
+
+            await asyncio.sleep(0.2)
+
+            assert received == [signal.SIGTERM]
+        finally:
+            signal.signal(signal.SIGTERM, previous)
+
+    @pytest.mark.asyncio
+    async def test_no_delay_keeps_server_handler(self):
+        handler = signal.getsignal(signal.SIGTERM)
+
+        Lifecycle().delay_shutdown(0)
+
+        assert signal.getsignal(signal.SIGTERM) is handler
@@ -1,9 +1,15 @@
+import time
 from datetime import datetime, timedelta, timezone
 
 import jwt
 import pytest
-from fastapi import status
+from fastapi import HTTPException, status
 
+from car_api.core.security import (
+    create_access_token,
+    make_token_cache,
+    verify_token,
+)
 from car_api.core.settings import Settings
 
 
@@ -172,3 +178,55 @@ class TestTokenValidation:
         response = client.get('/api/v1/brands/', headers=headers)
 
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+class TestTokenCache:
+    @pytest.mark.asyncio
+    async def test_token_is_verified_once(self, monkeypatch):
+        settings = Settings()
+        token_cache = make_token_cache(settings)
+        token = create_access_token({'sub': '1'}, settings)
+        calls = []
+        decode = jwt.decode
+
+        def counting_decode(*args, **kwargs):
+            calls.append(args)
+            return decode(*args, **kwargs)
+
+        monkeypatch.setattr(jwt, 'decode', counting_decode)
+
+        first = verify_token(token, settings, token_cache)
+        second = verify_token(token, settings, token_cache)
+
+        assert first == second
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_cached_token_respects_exp(self, monkeypatch):
+        settings = Settings()
+        token_cache = make_token_cache(settings)
+        now = time.time()
+        token = jwt.encode(
+            {'sub': '1', 'exp': int(now) + 60},
+            settings.JWT_SECRET_KEY,
+            algorithm=settings.JWT_ALGORITHM,
+        )
+
+        verify_token(token, settings, token_cache)
+        assert len(token_cache) == 1
+
+        # Two minutes later, for the cache and for PyJWT alike.
+        later = now + 120
+
+        class Later(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return datetime.fromtimestamp(later, tz)
+
+        monkeypatch.setattr(time, 'time', lambda: later)
+        monkeypatch.setattr(jwt.api_jwt, 'datetime', Later)
+
+        with pytest.raises(HTTPException) as exc_info:
+            verify_token(token, settings, token_cache)
+
+        assert exc_info.value.detail == 'Token has expired'
@@ -4,6 +4,7 @@ from fastapi import status
 
 class TestCreateBrand:
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(4)
     async def test_create_brand_success(
         self,
         client,
@@ -26,6 +27,7 @@ class TestCreateBrand:
         assert 'update_at' in data
 
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(4)
     async def test_create_brand_minimal_data(self, client, auth_headers):
         brand_data = {'name': 'Honda'}
 
@@ -41,6 +43,7 @@ class TestCreateBrand:
         assert data['is_active'] is True
 
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(3)
     async def test_create_brand_duplicate_name(
         self,
         client,
@@ -62,6 +65,7 @@ class TestCreateBrand:
         assert 'Nome da marca já está em uso' in response.json()['detail']
 
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(2)
     async def test_create_brand_short_name(self, client, auth_headers):
         brand_data = {'name': 'A'}
 
@@ -75,6 +79,7 @@ class TestCreateBrand:
         assert '2 caracteres' in response.json()['detail'][0]['msg']
 
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(0)
     async def test_create_brand_unauthorized(self, client, brand_data):
         response = client.post('/api/v1/brands/', json=brand_data)
 
@@ -83,6 +88,7 @@ class TestCreateBrand:
 
 class TestListBrands:
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(2)
     async def test_list_brands_success(self, client, auth_headers, brand):
         response = client.get('/api/v1/brands/', headers=auth_headers)
 
@@ -95,6 +101,7 @@ class TestListBrands:
         assert data['brands'][0]['name'] == brand.name
 
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(2)
     async def test_list_brands_empty(self, client, auth_headers):
         response = client.get('/api/v1/brands/', headers=auth_headers)
 
@@ -103,6 +110,7 @@ class TestListBrands:
         assert data['brands'] == []
 
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(3)
     async def test_list_brands_with_search(
         self,
         client,
@@ -120,6 +128,7 @@ class TestListBrands:
         assert data['brands'][0]['name'] == brand.name
 
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(3)
     async def test_list_brands_with_search_no_results(
         self,
         client,
@@ -136,6 +145,7 @@ class TestListBrands:
         assert len(data['brands']) == 0
 
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(2)
     async def test_list_brands_filter_by_active(
         self,
         client,
@@ -152,6 +162,7 @@ class TestListBrands:
         assert len(data['brands']) == 1
 
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(2)
     async def test_list_brands_filter_by_inactive(
         self,
         client,
@@ -168,6 +179,7 @@ class TestListBrands:
         assert len(data['brands']) == 0
 
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(2)
     async def test_list_brands_with_pagination(
         self,
         client,
@@ -185,6 +197,33 @@ class TestListBrands:
         assert data['limit'] == 1
 
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(2)
+    async def test_list_brands_with_cursor(
+        self,
+        client,
+        auth_headers,
+        brand,
+        another_brand,
+    ):
+        response = client.get(
+            '/api/v1/brands/?limit=1',
+            headers=auth_headers,
+        )
+        first_page = response.json()
+
+        assert [b['id'] for b in first_page['brands']] == [brand.id]
+
+        response = client.get(
+            f'/api/v1/brands/?limit=1&cursor={first_page["next_cursor"]}',
+            headers=auth_headers,
+        )
+        second_page = response.json()
+
+        assert [b['id'] for b in second_page['brands']] == [another_brand.id]
+        assert second_page['next_cursor'] is None
+
+    @pytest.mark.asyncio
+    @pytest.mark.query_budget(0)
     async def test_list_brands_unauthorized(self, client):
         response = client.get('/api/v1/brands/')
 
@@ -193,6 +232,7 @@ class TestListBrands:
 
 class TestGetBrand:
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(2)
     async def test_get_brand_success(
         self,
         client,
@@ -211,6 +251,7 @@ class TestGetBrand:
         assert data['description'] == brand.description
 
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(3)
     async def test_get_brand_not_found(self, client, auth_headers):
         response = client.get('/api/v1/brands/999', headers=auth_headers)
 
@@ -218,14 +259,71 @@ class TestGetBrand:
         assert 'Marca não encontrada' in response.json()['detail']
 
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(0)
     async def test_get_brand_unauthorized(self, client, brand):
         response = client.get(f'/api/v1/brands/{brand.id}')
 
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
 
 
+class TestConditionalGetBrands:
+    @pytest.mark.asyncio
+    @pytest.mark.query_budget(2)
+    async def test_get_brand_not_modified(self, client, auth_headers, brand):
+        url = f'/api/v1/brands/{brand.id}'
+        etag = client.get(url, headers=auth_headers).headers['etag']
+
+        response = client.get(
+            url, headers={**auth_headers, 'If-None-Match': f'W/{etag}'}
+        )
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.headers['cache-control'] == 'private, no-cache'
+
+    @pytest.mark.asyncio
+    @pytest.mark.query_budget(2)
+    async def test_list_brands_modified_after_update(
+        self, client, auth_headers, brand
+    ):
+        etag = client.get('/api/v1/brands/', headers=auth_headers).headers[
+            'etag'
+        ]
+        response = client.get(
+            '/api/v1/brands/',
+            headers={**auth_headers, 'If-None-Match': f'"other", {etag}'},
+        )
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        client.put(
+            f'/api/v1/brands/{brand.id}',
+            json={'description': 'Updated'},
+            headers=auth_headers,
+        )
+        response = client.get(
+            '/api/v1/brands/', headers={**auth_headers, 'If-None-Match': etag}
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['brands'][0]['description'] == 'Updated'
+
+    @pytest.mark.asyncio
+    @pytest.mark.query_budget(3)
+    async def test_search_brands_not_modified(
+        self, client, auth_headers, brand
+    ):
+        url = '/api/v1/brands/?search=toy'
+        etag = client.get(url, headers=auth_headers).headers['etag']
+
+        response = client.get(
+            url, headers={**auth_headers, 'If-None-Match': etag}
+        )
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+
 class TestUpdateBrand:
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(4)
     async def test_update_brand_success(
         self,
         client,
@@ -251,6 +349,7 @@ class TestUpdateBrand:
         assert data['is_active'] is False
 
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(4)
     async def test_update_brand_partial(
         self,
         client,
@@ -271,6 +370,7 @@ class TestUpdateBrand:
         assert data['description'] == brand.description
 
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(3)
     async def test_update_brand_not_found(self, client, auth_headers):
         update_data = {'name': 'Updated Brand'}
 
@@ -284,6 +384,7 @@ class TestUpdateBrand:
         assert 'Marca não encontrada' in response.json()['detail']
 
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(3)
     async def test_update_brand_duplicate_name(
         self,
         client,
@@ -303,6 +404,7 @@ class TestUpdateBrand:
         assert 'Nome da marca já está em uso' in response.json()['detail']
 
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(0)
     async def test_update_brand_unauthorized(self, client, brand):
         update_data = {'name': 'Updated'}
 
@@ -313,6 +415,7 @@ class TestUpdateBrand:
 
 class TestDeleteBrand:
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(5)
     async def test_delete_brand_success(
         self,
         client,
@@ -331,6 +434,7 @@ class TestDeleteBrand:
         assert get_response.status_code == status.HTTP_404_NOT_FOUND
 
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(3)
     async def test_delete_brand_not_found(self, client, auth_headers):
         response = client.delete(
             '/api/v1/brands/999',
@@ -341,6 +445,7 @@ class TestDeleteBrand:
         assert 'Marca não encontrada' in response.json()['detail']
 
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(3)
     async def test_delete_brand_with_cars(
         self,
         client,
@@ -358,6 +463,7 @@ class TestDeleteBrand:
         assert detail_msg in response.json()['detail']
 
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(0)
     async def test_delete_brand_unauthorized(self, client, brand):
         response = client.delete(f'/api/v1/brands/{brand.id}')
 
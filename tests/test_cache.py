@@ -0,0 +1,128 @@
+import time
+
+import pytest
+from fastapi import status
+
+from car_api.core.cache import CacheBackend, MemoryCache, SharedCache
+
+
+class TestCacheBackend:
+    def test_backends_must_implement_storage(self):
+        class Incomplete(CacheBackend):
+            def _get(self, key):
+                return None
+
+        with pytest.raises(TypeError, match='_set'):
+            Incomplete('incomplete')
+
+
+class TestMemoryCache:
+    def test_get_and_set(self):
+        cache = MemoryCache('test')
+
+        assert cache.get('key') is None
+        cache.set('key', {'value': 1})
+
+        assert cache.get('key') == {'value': 1}
+        assert cache.stats()['hits'] == 1
+        assert cache.stats()['misses'] == 1
+
+    def test_evicts_least_recently_used(self):
+        cache = MemoryCache('test', max_size=2)
+
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        assert cache.get('a') == 1
+        assert cache.get('b') is None
+        assert cache.get('c') == 3
+
+    def test_expires_entries(self):
+        cache = MemoryCache('test', ttl=0.01)
+
+        cache.set('key', 'value')
+        time.sleep(0.02)
+
+        assert cache.get('key') is None
+        assert len(cache) == 0
+
+    def test_incr(self):
+        cache = MemoryCache('test', ttl=0.01)
+
+        assert cache.incr('counter') == 1
+        assert cache.incr('counter') == 2
+        time.sleep(0.02)
+
+        assert cache.get('counter') == 2
+
+
+class TestSharedCache:
+    def test_is_visible_across_instances(self, tmp_path):
+        path = str(tmp_path / 'cache.db')
+        first = SharedCache('users', path)
+        second = SharedCache('users', path)
+
+        first.set(1, {'username': 'testuser'})
+
+        assert second.get(1) == {'username': 'testuser'}
+        second.delete(1)
+        assert first.get(1) is None
+
+    def test_evicts_over_max_size(self, tmp_path):
+        cache = SharedCache('users', str(tmp_path / 'cache.db'), max_size=2)
+
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.set('c', 3)
+
+        assert len(cache) == 2
+        assert cache.get('c') == 3
+
+    def test_incr_is_shared_across_instances(self, tmp_path):
+        path = str(tmp_path / 'cache.db')
+        first = SharedCache('catalog', path)
+        second = SharedCache('catalog', path)
+
+        assert first.incr('brands') == 1
+        assert second.incr('brands') == 2
+
+        assert first.get('brands') == 2
+
+
+class TestUserCache:
+    @pytest.mark.asyncio
+    async def test_current_user_is_cached(self, client, auth_headers, user):
+        client.get('/api/v1/brands/', headers=auth_headers)
+        client.get('/api/v1/brands/', headers=auth_headers)
+
+        user_cache = client.app.state.user_cache
+        assert user_cache.get(user.id)['username'] == user.username
+        assert user_cache.stats()['hits'] >= 1
+
+    @pytest.mark.asyncio
+    async def test_update_user_invalidates_cache(
+        self, client, auth_headers, user
+    ):
+        client.get('/api/v1/brands/', headers=auth_headers)
+
+        response = client.put(
+            f'/api/v1/users/{user.id}',
+            json={'username': 'renamed'},
+            headers=auth_headers,
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert client.app.state.user_cache.get(user.id) is None
+
+    @pytest.mark.asyncio
+    async def test_deleted_user_token_is_rejected(
+        self, client, auth_headers, user
+    ):
+        client.get('/api/v1/brands/', headers=auth_headers)
+        client.delete(f'/api/v1/users/{user.id}', headers=auth_headers)
+
+        response = client.get('/api/v1/brands/', headers=auth_headers)
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
@@ -1,9 +1,15 @@
+import json
+
 import pytest
 from fastapi import status
 
+from car_api.models.cars import Car
+from car_api.schemas.cars import CarSparsePublicSchema
+
 
 class TestCreateCar:
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(4)
     async def test_create_car_success(
         self,
         client,
@@ -31,6 +37,7 @@ class TestCreateCar:
         assert 'owner' in data
 
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(3)
     async def test_create_car_duplicate_plate(
         self,
         client,
@@ -60,6 +67,7 @@ class TestCreateCar:
         assert 'Placa já está em uso' in response.json()['detail']
 
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(4)
     async def test_create_car_invalid_brand(
         self,
         client,
@@ -79,6 +87,7 @@ class TestCreateCar:
         assert 'Marca não encontrada' in response.json()['detail']
 
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(3)
     async def test_create_car_invalid_owner(
         self,
         client,
@@ -98,6 +107,7 @@ class TestCreateCar:
         assert 'Proprietario não encontrado' in response.json()['detail']
 
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(2)
     async def test_create_car_short_model(
         self,
         client,
@@ -116,6 +126,7 @@ class TestCreateCar:
         assert '2 caracteres' in response.json()['detail'][0]['msg']
 
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(2)
     async def test_create_car_invalid_plate(
         self,
         client,
@@ -134,6 +145,7 @@ class TestCreateCar:
         assert '7 e 10 caracteres' in response.json()['detail'][0]['msg']
 
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(2)
     async def test_create_car_invalid_year(
         self,
         client,
@@ -152,6 +164,7 @@ class TestCreateCar:
         assert '1900 e 2030' in response.json()['detail'][0]['msg']
 
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(2)
     async def test_create_car_invalid_price(
         self,
         client,
@@ -170,14 +183,203 @@ class TestCreateCar:
         assert 'maior do que zero' in response.json()['detail'][0]['msg']
 
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(0)
     async def test_create_car_unauthorized(self, client, car_data):
         response = client.post('/api/v1/cars/', json=car_data)
 
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
 
 
+class TestBulkImportCars:
+    @pytest.mark.asyncio
+    @pytest.mark.query_budget(6)
+    async def test_bulk_import_csv(
+        self,
+        client,
+        auth_headers,
+        brand,
+        user,
+    ):
+        body = (
+            'model,factory_year,model_year,color,plate,fuel_type,'
+            'transmission,price,description,brand_id,owner_id\n'
+            f'Corolla,2023,2024,Silver,ABC1234,hybrid,automatic,150000,,'
+            f'{brand.id},{user.id}\n'
+            f'Etios,2019,2020,White,DEF5678,flex,manual,55000,Usado,'
+            f'{brand.id},{user.id}\n'
+        )
+
+        response = client.post(
+            '/api/v1/cars/bulk',
+            content=body,
+            headers={**auth_headers, 'Content-Type': 'text/csv'},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {
+            'received': 2,
+            'imported': 2,
+            'errors': [],
+        }
+
+        response = client.get('/api/v1/cars/', headers=auth_headers)
+        cars = response.json()['cars']
+        assert [c['plate'] for c in cars] == ['ABC1234', 'DEF5678']
+        assert cars[0]['description'] is None
+        assert cars[0]['is_available'] is True
+
+    @pytest.mark.asyncio
+    @pytest.mark.query_budget(11)
+    async def test_bulk_import_ndjson_reports_row_errors(
+        self,
+        client,
+        auth_headers,
+        car,
+        car_data,
+        monkeypatch,
+        settings,
+    ):
+        monkeypatch.setattr(settings, 'BULK_IMPORT_BATCH_SIZE', 2)
+        rows = [
+            {**car_data, 'plate': 'NEW0001'},
+            {**car_data, 'plate': car.plate},
+            {**car_data, 'plate': 'NEW0002', 'brand_id': 999},
+            {**car_data, 'plate': 'NEW0001'},
+            {**car_data, 'plate': 'NEW0003', 'price': -1},
+            {**car_data, 'plate': 'NEW0004'},
+        ]
+        body = '\n'.join(json.dumps(row) for row in rows) + '\n{broken\n'
+
+        response = client.post(
+            '/api/v1/cars/bulk',
+            content=body,
+            headers={**auth_headers, 'Content-Type': 'application/x-ndjson'},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data['received'] == 7
+        assert data['imported'] == 2
+        assert [e['line'] for e in data['errors']] == [2, 3, 4, 5, 7]
+        assert data['errors'][0]['errors'] == ['Placa já está em uso']
+        assert data['errors'][1]['errors'] == ['Marca não encontrada']
+        assert data['errors'][2]['errors'] == ['Placa já está em uso']
+        assert 'price' in data['errors'][3]['errors'][0]
+        assert data['errors'][4]['errors'] == ['JSON inválido']
+
+    @pytest.mark.asyncio
+    @pytest.mark.query_budget(2)
+    async def test_bulk_import_unsupported_format(
+        self,
+        client,
+        auth_headers,
+    ):
+        response = client.post(
+            '/api/v1/cars/bulk',
+            json=[],
+            headers=auth_headers,
+        )
+
+        assert response.status_code == status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+
+    @pytest.mark.asyncio
+    @pytest.mark.query_budget(0)
+    async def test_bulk_import_unauthorized(self, client):
+        response = client.post(
+            '/api/v1/cars/bulk',
+            content='',
+            headers={'Content-Type': 'text/csv'},
+        )
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+class TestExportCars:
+    @pytest.mark.asyncio
+    @pytest.mark.query_budget(2)
+    async def test_export_cars_ndjson(
+        self,
+        client,
+        auth_headers,
+        car,
+        another_car,
+        monkeypatch,
+        settings,
+    ):
+        monkeypatch.setattr(settings, 'EXPORT_BATCH_SIZE', 1)
+
+        response = client.get('/api/v1/cars/export', headers=auth_headers)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers['content-type'].startswith(
+            'application/x-ndjson'
+        )
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [row['plate'] for row in rows] == [car.plate, another_car.plate]
+        assert rows[0]['fuel_type'] == 'hybrid'
+        assert rows[0]['brand_id'] == car.brand_id
+        assert 'brand' not in rows[0]
+
+    @pytest.mark.asyncio
+    @pytest.mark.query_budget(2)
+    async def test_export_cars_csv_with_filters(
+        self,
+        client,
+        auth_headers,
+        car,
+        another_car,
+    ):
+        response = client.get(
+            '/api/v1/cars/export?format=csv&transmission=manual',
+            headers=auth_headers,
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers['content-type'].startswith('text/csv')
+        header, *lines = response.text.splitlines()
+        assert header.startswith('id,model,factory_year')
+        assert len(lines) == 1
+        assert another_car.plate in lines[0]
+
+    @pytest.mark.asyncio
+    @pytest.mark.query_budget(2)
+    async def test_export_cars_empty_csv(self, client, auth_headers):
+        response = client.get(
+            '/api/v1/cars/export?format=csv', headers=auth_headers
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.text.splitlines()) == 1
+
+    @pytest.mark.asyncio
+    @pytest.mark.query_budget(2)
+    async def test_export_cars_only_own(
+        self,
+        client,
+        auth_headers,
+        session,
+        car_data,
+        another_user,
+    ):
+        session.add(Car(**{**car_data, 'owner_id': another_user.id}))
+        await session.commit()
+
+        response = client.get('/api/v1/cars/export', headers=auth_headers)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert not response.text
+
+    @pytest.mark.asyncio
+    @pytest.mark.query_budget(0)
+    async def test_export_cars_unauthorized(self, client):
+        response = client.get('/api/v1/cars/export')
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
 class TestListCars:
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(4)
     async def test_list_cars_success(self, client, auth_headers, car):
         response = client.get('/api/v1/cars/', headers=auth_headers)
 
@@ -190,6 +392,7 @@ class TestListCars:
         assert data['cars'][0]['model'] == car.model
 
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(3)
     async def test_list_cars_empty(self, client, auth_headers):
         response = client.get('/api/v1/cars/', headers=auth_headers)
 
@@ -198,6 +401,7 @@ class TestListCars:
         assert data['cars'] == []
 
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(4)
     async def test_list_cars_search_by_model(
         self,
         client,
@@ -215,6 +419,7 @@ class TestListCars:
         assert data['cars'][0]['model'] == car.model
 
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(4)
     async def test_list_cars_search_by_color(
         self,
         client,
@@ -231,6 +436,7 @@ class TestListCars:
         assert len(data['cars']) == 1
 
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(4)
     async def test_list_cars_search_by_plate(
         self,
         client,
@@ -247,6 +453,80 @@ class TestListCars:
         assert len(data['cars']) == 1
 
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(4)
+    async def test_list_cars_search_ranked_by_relevance(
+        self,
+        client,
+        auth_headers,
+        car,
+        another_car,
+        session,
+    ):
+        car.color = 'Blue'
+        another_car.model = 'Blue Bird'
+        await session.commit()
+
+        response = client.get(
+            '/api/v1/cars/?search=blue',
+            headers=auth_headers,
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert [c['id'] for c in data['cars']] == [another_car.id, car.id]
+        assert data['cars'][0]['model'] == 'Blue Bird'
+
+    @pytest.mark.asyncio
+    @pytest.mark.query_budget(4)
+    async def test_list_cars_search_by_partial_term(
+        self,
+        client,
+        auth_headers,
+        car,
+        another_car,
+    ):
+        response = client.get(
+            '/api/v1/cars/?search=oroll',
+            headers=auth_headers,
+        )
+
+        data = response.json()
+        assert [c['id'] for c in data['cars']] == [car.id]
+
+    @pytest.mark.asyncio
+    @pytest.mark.query_budget(4)
+    async def test_list_cars_search_short_term(
+        self,
+        client,
+        auth_headers,
+        car,
+        another_car,
+    ):
+        response = client.get(
+            '/api/v1/cars/?search=iv',
+            headers=auth_headers,
+        )
+
+        data = response.json()
+        assert [c['id'] for c in data['cars']] == [another_car.id]
+
+    @pytest.mark.asyncio
+    @pytest.mark.query_budget(2)
+    async def test_list_cars_search_with_cursor(
+        self,
+        client,
+        auth_headers,
+        car,
+    ):
+        response = client.get(
+            '/api/v1/cars/?search=corolla&cursor=eyJrIjpbImlkIl0sInYiOlsxXX0',
+            headers=auth_headers,
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.asyncio
+    @pytest.mark.query_budget(4)
     async def test_list_cars_filter_by_brand(
         self,
         client,
@@ -263,6 +543,7 @@ class TestListCars:
         assert len(data['cars']) == 1
 
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(4)
     async def test_list_cars_filter_by_fuel_type(
         self,
         client,
@@ -281,6 +562,7 @@ class TestListCars:
         assert len(data['cars']) == 1
 
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(4)
     async def test_list_cars_filter_by_transmission(
         self,
         client,
@@ -299,6 +581,7 @@ class TestListCars:
         assert len(data['cars']) == 1
 
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(4)
     async def test_list_cars_filter_by_availability(
         self,
         client,
@@ -315,6 +598,7 @@ class TestListCars:
         assert len(data['cars']) == 1
 
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(4)
     async def test_list_cars_filter_by_price_range(
         self,
         client,
@@ -331,6 +615,7 @@ class TestListCars:
         assert len(data['cars']) == 1
 
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(4)
     async def test_list_cars_with_pagination(
         self,
         client,
@@ -348,6 +633,94 @@ class TestListCars:
         assert data['limit'] == 1
 
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(4)
+    async def test_list_cars_with_cursor(
+        self,
+        client,
+        auth_headers,
+        car,
+        another_car,
+    ):
+        response = client.get(
+            '/api/v1/cars/?limit=1',
+            headers=auth_headers,
+        )
+        first_page = response.json()
+
+        assert [c['id'] for c in first_page['cars']] == [car.id]
+        assert first_page['next_cursor'] is not None
+
+        response = client.get(
+            f'/api/v1/cars/?limit=1&cursor={first_page["next_cursor"]}',
+            headers=auth_headers,
+        )
+        second_page = response.json()
+
+        assert [c['id'] for c in second_page['cars']] == [another_car.id]
+        assert second_page['next_cursor'] is None
+
+    @pytest.mark.asyncio
+    @pytest.mark.query_budget(4)
+    async def test_list_cars_with_cursor_ordered_by_price(
+        self,
+        client,
+        auth_headers,
+        car,
+        another_car,
+    ):
+        response = client.get(
+            '/api/v1/cars/?limit=1&order_by=price',
+            headers=auth_headers,
+        )
+        first_page = response.json()
+
+        assert [c['id'] for c in first_page['cars']] == [another_car.id]
+
+        response = client.get(
+            '/api/v1/cars/?limit=1&order_by=price'
+            f'&cursor={first_page["next_cursor"]}',
+            headers=auth_headers,
+        )
+        second_page = response.json()
+
+        assert [c['id'] for c in second_page['cars']] == [car.id]
+        assert second_page['next_cursor'] is None
+
+    @pytest.mark.asyncio
+    @pytest.mark.query_budget(4)
+    async def test_list_cars_cursor_from_another_ordering(
+        self,
+        client,
+        auth_headers,
+        car,
+        another_car,
+    ):
+        response = client.get(
+            '/api/v1/cars/?limit=1',
+            headers=auth_headers,
+        )
+        next_cursor = response.json()['next_cursor']
+
+        response = client.get(
+            f'/api/v1/cars/?order_by=price&cursor={next_cursor}',
+            headers=auth_headers,
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'Cursor inválido' in response.json()['detail']
+
+    @pytest.mark.asyncio
+    @pytest.mark.query_budget(2)
+    async def test_list_cars_invalid_cursor(self, client, auth_headers):
+        response = client.get(
+            '/api/v1/cars/?cursor=not-a-cursor',
+            headers=auth_headers,
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.asyncio
+    @pytest.mark.query_budget(0)
     async def test_list_cars_unauthorized(self, client):
         response = client.get('/api/v1/cars/')
 
@@ -356,6 +729,7 @@ class TestListCars:
 
 class TestGetCar:
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(3)
     async def test_get_car_success(
         self,
         client,
@@ -376,6 +750,7 @@ class TestGetCar:
         assert 'owner' in data
 
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(3)
     async def test_get_car_not_found(self, client, auth_headers):
         response = client.get('/api/v1/cars/999', headers=auth_headers)
 
@@ -383,6 +758,7 @@ class TestGetCar:
         assert 'Carro não encontrado' in response.json()['detail']
 
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(3)
     async def test_get_car_not_owner(
         self,
         client,
@@ -398,14 +774,544 @@ class TestGetCar:
         assert response.status_code == status.HTTP_200_OK
 
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(0)
     async def test_get_car_unauthorized(self, client, car):
         response = client.get(f'/api/v1/cars/{car.id}')
 
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
 
 
+class TestConditionalGetCars:
+    @pytest.mark.asyncio
+    @pytest.mark.query_budget(3)
+    async def test_get_car_not_modified(self, client, auth_headers, car):
+        response = client.get(f'/api/v1/cars/{car.id}', headers=auth_headers)
+        etag = response.headers['etag']
+
+        response = client.get(
+            f'/api/v1/cars/{car.id}',
+            headers={**auth_headers, 'If-None-Match': etag},
+        )
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.headers['etag'] == etag
+        assert response.content == b''
+
+    @pytest.mark.asyncio
+    @pytest.mark.query_budget(3)
+    async def test_get_car_modified_after_update(
+        self, client, auth_headers, car, another_brand
+    ):
+        response = client.get(f'/api/v1/cars/{car.id}', headers=auth_headers)
+        etag = response.headers['etag']
+
+        client.put(
+            f'/api/v1/cars/{car.id}',
+            json={'brand_id': another_brand.id},
+            headers=auth_headers,
+        )
+        response = client.get(
+            f'/api/v1/cars/{car.id}',
+            headers={**auth_headers, 'If-None-Match': etag},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers['etag'] != etag
+        assert response.json()['brand']['name'] == another_brand.name
+
+    @pytest.mark.asyncio
+    @pytest.mark.query_budget(4)
+    async def test_list_cars_modified_after_brand_update(
+        self, client, auth_headers, car, brand
+    ):
+        response = client.get('/api/v1/cars/', headers=auth_headers)
+        etag = response.headers['etag']
+
+        response = client.get(
+            '/api/v1/cars/', headers={**auth_headers, 'If-None-Match': etag}
+        )
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        client.put(
+            f'/api/v1/brands/{brand.id}',
+            json={'name': 'Lexus'},
+            headers=auth_headers,
+        )
+        response = client.get(
+            '/api/v1/cars/', headers={**auth_headers, 'If-None-Match': etag}
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers['etag'] != etag
+
+    @pytest.mark.asyncio
+    @pytest.mark.query_budget(4)
+    async def test_list_cars_etag_depends_on_filters(
+        self, client, auth_headers, car, another_car
+    ):
+        response = client.get('/api/v1/cars/', headers=auth_headers)
+        etag = response.headers['etag']
+
+        response = client.get(
+            '/api/v1/cars/?transmission=manual',
+            headers={**auth_headers, 'If-None-Match': etag},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()['cars']) == 1
+
+    @pytest.mark.asyncio
+    @pytest.mark.query_budget(3)
+    async def test_get_car_not_modified_checks_ownership(
+        self, client, auth_headers, session, car_data, another_user
+    ):
+        car = Car(**{**car_data, 'owner_id': another_user.id})
+        session.add(car)
+        await session.commit()
+
+        response = client.get(
+            f'/api/v1/cars/{car.id}',
+            headers={**auth_headers, 'If-None-Match': '*'},
+        )
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+class TestFastJSONCars:
+    @pytest.mark.asyncio
+    @pytest.mark.query_budget(4)
+    async def test_list_cars_same_body_as_default(
+        self, client, auth_headers, car, another_car, monkeypatch, settings
+    ):
+        expected = client.get('/api/v1/cars/?limit=1', headers=auth_headers)
+
+        monkeypatch.setattr(settings, 'FAST_JSON', True)
+        response = client.get('/api/v1/cars/?limit=1', headers=auth_headers)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers['content-type'] == 'application/json'
+        assert response.json() == expected.json()
+        assert response.json()['next_cursor'] is not None
+        assert response.headers['etag'] == expected.headers['etag']
+
+    @pytest.mark.asyncio
+    @pytest.mark.query_budget(3)
+    async def test_get_car_same_body_as_default(
+        self, client, auth_headers, car, monkeypatch, settings
+    ):
+        expected = client.get(f'/api/v1/cars/{car.id}', headers=auth_headers)
+
+        monkeypatch.setattr(settings, 'FAST_JSON', True)
+        response = client.get(f'/api/v1/cars/{car.id}', headers=auth_headers)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == expected.json()
+        assert response.headers['etag'] == expected.headers['etag']
+
+    @pytest.mark.asyncio
+    @pytest.mark.query_budget(3)
+    async def test_get_car_not_found(
+        self, client, auth_headers, monkeypatch, settings
+    ):
+        monkeypatch.setattr(settings, 'FAST_JSON', True)
+
+        response = client.get('/api/v1/cars/999', headers=auth_headers)
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert response.json()['detail'] == 'Carro não encontrado'
+
+    @pytest.mark.asyncio
+    @pytest.mark.query_budget(3)
+    async def test_get_car_checks_ownership(
+        self,
+        client,
+        auth_headers,
+        session,
+        car_data,
+        another_user,
+        monkeypatch,
+        settings,
+    ):
+        car = Car(**{**car_data, 'owner_id': another_user.id})
+        session.add(car)
+        await session.commit()
+        monkeypatch.setattr(settings, 'FAST_JSON', True)
+
+        response = client.get(f'/api/v1/cars/{car.id}', headers=auth_headers)
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+class TestSparseFieldsCars:
+    @pytest.mark.asyncio
+    @pytest.mark.query_budget(2)
+    async def test_list_cars_fields(
+        self, client, auth_headers, car, statements
+    ):
+        client.get('/api/v1/brands/', headers=auth_headers)
+        statements.clear()
+
+        response = client.get(
+            '/api/v1/cars/?fields=model,plate,price', headers=auth_headers
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        (data,) = response.json()['cars']
+        assert list(data) == ['id', 'model', 'plate', 'price']
+        assert data['plate'] == 'ABC1234'
+        car_query = statements[-1]
+        assert 'description' not in car_query
+        assert 'users' not in car_query.split('FROM')[1]
+
+    @pytest.mark.asyncio
+    async def test_sparse_responses_are_documented(
+        self, client, auth_headers, car
+    ):
+        response = client.get(
+            f'/api/v1/cars/{car.id}?fields=model&expand=brand',
+            headers=auth_headers,
+        )
+
+        sparse = CarSparsePublicSchema.model_validate(response.json())
+        assert sparse.model_dump(mode='json', exclude_unset=True) == (
+            response.json()
+        )
+
+        paths = client.get('/openapi.json').json()['paths']
+        for path, schema in (
+            ('/api/v1/cars/', 'CarListSparsePublicSchema'),
+            ('/api/v1/cars/{car_id}', 'CarSparsePublicSchema'),
+        ):
+            content = paths[path]['get']['responses']['200']['content']
+            assert {'$ref': f'#/components/schemas/{schema}'} in (
+                content['application/json']['schema']['anyOf']
+            )
+
+    @pytest.mark.asyncio
+    @pytest.mark.query_budget(3)
+    async def test_list_cars_expand_brand(self, client, auth_headers, car):
+        response = client.get(
+            '/api/v1/cars/?fields=model&expand=brand', headers=auth_headers
+        )
+
+        (data,) = response.json()['cars']
+        assert set(data) == {'id', 'model', 'brand'}
+        assert data['brand']['name'] == 'Toyota'
+
+    @pytest.mark.asyncio
+    @pytest.mark.query_budget(3)
+    async def test_list_cars_expand_owner(self, client, auth_headers, car):
+        response = client.get(
+            '/api/v1/cars/?expand=owner', headers=auth_headers
+        )
+
+        (data,) = response.json()['cars']
+        assert 'brand' not in data
+        assert data['owner']['username'] == 'testuser'
+        assert data['fuel_type'] == 'hybrid'
+
+    @pytest.mark.asyncio
+    @pytest.mark.query_budget(4)
+    async def test_full_view_same_body_as_default(
+        self, client, auth_headers, car
+    ):
+        expected = client.get('/api/v1/cars/', headers=auth_headers)
+
+        response = client.get(
+            '/api/v1/cars/?expand=brand,owner', headers=auth_headers
+        )
+
+        assert response.json() == expected.json()
+
+    @pytest.mark.asyncio
+    @pytest.mark.query_budget(3)
+    async def test_list_cars_fields_with_cursor(
+        self, client, auth_headers, car, another_car
+    ):
+        response = client.get(
+            '/api/v1/cars/?fields=model&order_by=price&limit=1',
+            headers=auth_headers,
+        )
+        cursor = response.json()['next_cursor']
+
+        response = client.get(
+            f'/api/v1/cars/?fields=model&order_by=price&limit=1'
+            f'&cursor={cursor}',
+            headers=auth_headers,
+        )
+
+        assert response.json()['cars'] == [{'id': car.id, 'model': 'Corolla'}]
+
+    @pytest.mark.asyncio
+    @pytest.mark.query_budget(3)
+    async def test_get_car_fields(self, client, auth_headers, car):
+        response = client.get(
+            f'/api/v1/cars/{car.id}?fields=color', headers=auth_headers
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {'id': car.id, 'color': 'Silver'}
+
+    @pytest.mark.asyncio
+    @pytest.mark.query_budget(3)
+    async def test_sparse_etag(self, client, auth_headers, car):
+        full = client.get(f'/api/v1/cars/{car.id}', headers=auth_headers)
+        url = f'/api/v1/cars/{car.id}?fields=color'
+        response = client.get(url, headers=auth_headers)
+        etag = response.headers['etag']
+
+        assert etag != full.headers['etag']
+
+        response = client.get(
+            url, headers={**auth_headers, 'If-None-Match': etag}
+        )
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    @pytest.mark.asyncio
+    @pytest.mark.query_budget(1)
+    async def test_invalid_field(self, client, auth_headers):
+        response = client.get(
+            '/api/v1/cars/?fields=model,password', headers=auth_headers
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()['detail'] == 'Campo inválido: password'
+
+    @pytest.mark.asyncio
+    @pytest.mark.query_budget(1)
+    async def test_invalid_expand(self, client, auth_headers, car):
+        response = client.get(
+            f'/api/v1/cars/{car.id}?expand=cars', headers=auth_headers
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()['detail'] == 'Relação inválida: cars'
+
+
+class TestListCarsCounts:
+    @pytest.mark.asyncio
+    @pytest.mark.query_budget(4)
+    async def test_no_counts_by_default(self, client, auth_headers, car):
+        response = client.get('/api/v1/cars/', headers=auth_headers)
+
+        data = response.json()
+        assert 'total' not in data
+        assert 'facets' not in data
+
+    @pytest.mark.asyncio
+    @pytest.mark.query_budget(5)
+    async def test_include_total(self, client, auth_headers, car, another_car):
+        response = client.get(
+            '/api/v1/cars/?include=total&limit=1', headers=auth_headers
+        )
+
+        data = response.json()
+        assert len(data['cars']) == 1
+        assert data['total'] == 2
+        assert data['total_estimated'] is False
+        assert 'facets' not in data
+
+    @pytest.mark.asyncio
+    @pytest.mark.query_budget(5)
+    async def test_include_facets(
+        self, client, auth_headers, car, another_car, brand
+    ):
+        response = client.get(
+            '/api/v1/cars/?include=total,facets', headers=auth_headers
+        )
+
+        data = response.json()
+        assert data['total'] == 2
+        assert data['facets'] == {
+            'fuel_type': {'hybrid': 1, 'gasoline': 1},
+            'transmission': {'automatic': 1, 'manual': 1},
+            'brand_id': {str(brand.id): 2},
+            'is_available': {'true': 2},
+        }
+
+    @pytest.mark.asyncio
+    @pytest.mark.query_budget(4)
+    async def test_counts_follow_filters(
+        self, client, auth_headers, car, another_car
+    ):
+        response = client.get(
+            '/api/v1/cars/?include=total,facets&transmission=manual'
+            '&fields=model',
+            headers=auth_headers,
+        )
+
+        data = response.json()
+        assert data['cars'] == [{'id': another_car.id, 'model': 'Civic'}]
+        assert data['total'] == 1
+        assert data['facets']['fuel_type'] == {'gasoline': 1}
+
+    @pytest.mark.asyncio
+    @pytest.mark.query_budget(5)
+    async def test_counts_are_cached_per_filters(
+        self, client, auth_headers, car, statements
+    ):
+        url = '/api/v1/cars/?include=total'
+        client.get(url, headers=auth_headers)
+        statements.clear()
+
+        response = client.get(f'{url}&limit=50', headers=auth_headers)
+
+        assert response.json()['total'] == 1
+        assert not any('count(' in s for s in statements)
+
+        client.get(f'{url}&is_available=false', headers=auth_headers)
+
+        assert any('count(' in s for s in statements)
+
+    @pytest.mark.asyncio
+    async def test_etag_covers_counts(
+        self, client, auth_headers, session, car, another_car, car_data
+    ):
+        url = '/api/v1/cars/?include=total,facets&limit=1'
+        response = client.get(url, headers=auth_headers)
+        etag = response.headers['etag']
+        assert response.json()['total'] == 2
+
+        # Past the page and the row read to find the next cursor: the rows
+        # behind the tag are the same, the total is not.
+        session.add(Car(**{**car_data, 'plate': 'DEF5678'}))
+        await session.commit()
+        client.app.state.count_cache.clear()
+
+        response = client.get(
+            url, headers={**auth_headers, 'If-None-Match': etag}
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['total'] == 3
+        assert response.headers['etag'] != etag
+
+        etag = response.headers['etag']
+        response = client.get(
+            url, headers={**auth_headers, 'If-None-Match': etag}
+        )
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    @pytest.mark.asyncio
+    @pytest.mark.query_budget(1)
+    async def test_invalid_include(self, client, auth_headers):
+        response = client.get(
+            '/api/v1/cars/?include=everything', headers=auth_headers
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()['detail'] == 'Informação inválida: everything'
+
+
+class TestCarStatistics:
+    @pytest.mark.asyncio
+    @pytest.mark.query_budget(4)
+    async def test_car_stats(
+        self, client, auth_headers, user, car, another_car, another_brand
+    ):
+        response = client.post(
+            '/api/v1/cars/',
+            json={
+                'model': 'Fit',
+                'factory_year': 2023,
+                'model_year': 2024,
+                'color': 'Red',
+                'plate': 'FIT1234',
+                'fuel_type': 'flex',
+                'transmission': 'cvt',
+                'price': 80000.00,
+                'brand_id': another_brand.id,
+                'owner_id': user.id,
+            },
+            headers=auth_headers,
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+
+        response = client.get('/api/v1/cars/stats', headers=auth_headers)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {
+            'count': 3,
+            'average_price': '116666.67',
+            'brands': [
+                {
+                    'brand_id': car.brand_id,
+                    'count': 2,
+                    'average_price': '135000.00',
+                },
+                {
+                    'brand_id': another_brand.id,
+                    'count': 1,
+                    'average_price': '80000.00',
+                },
+            ],
+            'fuel_types': {'flex': 1, 'gasoline': 1, 'hybrid': 1},
+            'model_years': {'2023': 1, '2024': 2},
+        }
+
+    @pytest.mark.asyncio
+    @pytest.mark.query_budget(2)
+    async def test_car_stats_by_brand(
+        self, client, auth_headers, car, another_brand
+    ):
+        response = client.get(
+            f'/api/v1/cars/stats?brand_id={another_brand.id}',
+            headers=auth_headers,
+        )
+
+        assert response.json() == {
+            'count': 0,
+            'average_price': None,
+            'brands': [],
+            'fuel_types': {},
+            'model_years': {},
+        }
+
+    @pytest.mark.asyncio
+    @pytest.mark.query_budget(4)
+    async def test_car_stats_follow_updates_and_deletes(
+        self, client, auth_headers, car, another_car
+    ):
+        client.put(
+            f'/api/v1/cars/{car.id}',
+            json={'price': 100000.00, 'fuel_type': 'gasoline'},
+            headers=auth_headers,
+        )
+        client.delete(f'/api/v1/cars/{another_car.id}', headers=auth_headers)
+
+        response = client.get('/api/v1/cars/stats', headers=auth_headers)
+
+        data = response.json()
+        assert data['count'] == 1
+        assert data['average_price'] == '100000.00'
+        assert data['fuel_types'] == {'gasoline': 1}
+        assert data['model_years'] == {'2024': 1}
+
+    @pytest.mark.asyncio
+    @pytest.mark.query_budget(2)
+    async def test_car_stats_only_own(
+        self, client, auth_headers, session, car_data, another_user
+    ):
+        session.add(Car(**{**car_data, 'owner_id': another_user.id}))
+        await session.commit()
+
+        response = client.get('/api/v1/cars/stats', headers=auth_headers)
+
+        assert response.json()['count'] == 0
+
+    @pytest.mark.asyncio
+    @pytest.mark.query_budget(0)
+    async def test_car_stats_unauthorized(self, client):
+        response = client.get('/api/v1/cars/stats')
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
 class TestUpdateCar:
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(4)
     async def test_update_car_success(
         self,
         client,
@@ -431,6 +1337,7 @@ class TestUpdateCar:
         assert float(data['price']) == 160000.00
 
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(4)
     async def test_update_car_partial(
         self,
         client,
@@ -451,6 +1358,7 @@ class TestUpdateCar:
         assert data['color'] == car.color
 
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(3)
     async def test_update_car_not_found(self, client, auth_headers):
         update_data = {'model': 'Updated'}
 
@@ -464,6 +1372,7 @@ class TestUpdateCar:
         assert 'Carro não encontrado' in response.json()['detail']
 
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(4)
     async def test_update_car_duplicate_plate(
         self,
         client,
@@ -483,6 +1392,7 @@ class TestUpdateCar:
         assert 'Placa já está em uso' in response.json()['detail']
 
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(5)
     async def test_update_car_invalid_brand(
         self,
         client,
@@ -501,6 +1411,44 @@ class TestUpdateCar:
         assert 'Marca não encontrada' in response.json()['detail']
 
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(5)
+    async def test_update_car_brand(
+        self,
+        client,
+        auth_headers,
+        car,
+        another_brand,
+    ):
+        response = client.put(
+            f'/api/v1/cars/{car.id}',
+            json={'brand_id': another_brand.id},
+            headers=auth_headers,
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data['brand_id'] == another_brand.id
+        assert data['brand']['name'] == another_brand.name
+
+    @pytest.mark.asyncio
+    @pytest.mark.query_budget(4)
+    async def test_update_car_invalid_owner(
+        self,
+        client,
+        auth_headers,
+        car,
+    ):
+        response = client.put(
+            f'/api/v1/cars/{car.id}',
+            json={'owner_id': 999},
+            headers=auth_headers,
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'Proprietario não encontrado' in response.json()['detail']
+
+    @pytest.mark.asyncio
+    @pytest.mark.query_budget(0)
     async def test_update_car_unauthorized(self, client, car):
         update_data = {'model': 'Updated'}
 
@@ -511,6 +1459,7 @@ class TestUpdateCar:
 
 class TestDeleteCar:
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(2)
     async def test_delete_car_success(
         self,
         client,
@@ -529,6 +1478,7 @@ class TestDeleteCar:
         assert get_response.status_code == status.HTTP_404_NOT_FOUND
 
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(2)
     async def test_delete_car_not_found(self, client, auth_headers):
         response = client.delete(
             '/api/v1/cars/999',
@@ -539,6 +1489,7 @@ class TestDeleteCar:
         assert 'Carro não encontrado' in response.json()['detail']
 
     @pytest.mark.asyncio
+    @pytest.mark.query_budget(0)
     async def test_delete_car_unauthorized(self, client, car):
         response = client.delete(f'/api/v1/cars/{car.id}')
 
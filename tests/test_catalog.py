@@ -0,0 +1,203 @@
+import json
+
+import pytest
+from fastapi import status
+
+from car_api.core.cache import MemoryCache
+from car_api.core.catalog import VERSION_KEY, BrandCatalog
+from car_api.models.cars import Brand
+
+
+class TestBrandCatalog:
+    @pytest.mark.asyncio
+    async def test_load(self, session, brand, another_brand):
+        catalog = BrandCatalog(MemoryCache('catalog'), max_age=300)
+
+        assert catalog.is_stale()
+        await catalog.load(session)
+
+        assert not catalog.is_stale()
+        assert len(catalog) == 2
+        assert catalog.get(brand.id).name == brand.name
+        assert catalog.id_for('Honda') == another_brand.id
+        assert brand.id in catalog
+        assert [b.id for b in catalog.page(brand.id, 0, 10)] == [
+            another_brand.id
+        ]
+        assert catalog.page(None, 0, 10, is_active=False) == []
+
+    @pytest.mark.asyncio
+    async def test_write_through_keeps_catalog_current(self, session, brand):
+        catalog = BrandCatalog(MemoryCache('catalog'), max_age=300)
+        await catalog.load(session)
+
+        brand.name = 'Renamed'
+        catalog.write_through(brand)
+
+        assert not catalog.is_stale()
+        assert catalog.get(brand.id).name == 'Renamed'
+        assert catalog.id_for('Renamed') == brand.id
+        assert catalog.id_for('Toyota') is None
+
+        catalog.discard(brand.id)
+
+        assert not catalog.is_stale()
+        assert brand.id not in catalog
+
+    @pytest.mark.asyncio
+    async def test_change_from_another_worker_forces_reload(
+        self, session, brand
+    ):
+        signal = MemoryCache('catalog')
+        catalog = BrandCatalog(signal, max_age=300)
+        await catalog.load(session)
+
+        signal.incr(VERSION_KEY)
+        assert catalog.is_stale()
+
+        await catalog.ensure(session)
+        assert not catalog.is_stale()
+
+        # A concurrent bump means the local copy may miss the other change.
+        signal.incr(VERSION_KEY)
+        catalog.write_through(brand)
+        assert catalog.is_stale()
+
+    @pytest.mark.asyncio
+    async def test_replica_load_stays_stale(self, session, brand):
+        session.info['replica'] = True
+        catalog = BrandCatalog(MemoryCache('catalog'), max_age=300)
+
+        await catalog.cover(session, [brand.id])
+
+        assert catalog.get(brand.id).name == brand.name
+        assert catalog.is_stale()
+
+    @pytest.mark.asyncio
+    async def test_max_age(self, session, brand):
+        catalog = BrandCatalog(MemoryCache('catalog'), max_age=0)
+        await catalog.load(session)
+
+        assert catalog.is_stale()
+
+
+class TestBrandCatalogEndpoints:
+    @pytest.mark.asyncio
+    async def test_get_brand_without_sql(
+        self, client, auth_headers, brand, statements
+    ):
+        client.get('/api/v1/brands/', headers=auth_headers)
+        statements.clear()
+
+        response = client.get(
+            f'/api/v1/brands/{brand.id}', headers=auth_headers
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['name'] == brand.name
+        assert statements == []
+
+    @pytest.mark.asyncio
+    async def test_update_brand_is_visible(
+        self, client, auth_headers, brand, car
+    ):
+        client.get(f'/api/v1/brands/{brand.id}', headers=auth_headers)
+
+        client.put(
+            f'/api/v1/brands/{brand.id}',
+            json={'name': 'Lexus'},
+            headers=auth_headers,
+        )
+
+        response = client.get(
+            f'/api/v1/brands/{brand.id}', headers=auth_headers
+        )
+        assert response.json()['name'] == 'Lexus'
+        response = client.get(f'/api/v1/cars/{car.id}', headers=auth_headers)
+        assert response.json()['brand']['name'] == 'Lexus'
+
+    @pytest.mark.asyncio
+    async def test_deleted_brand_is_not_found(
+        self, client, auth_headers, brand
+    ):
+        client.delete(f'/api/v1/brands/{brand.id}', headers=auth_headers)
+
+        response = client.get(
+            f'/api/v1/brands/{brand.id}', headers=auth_headers
+        )
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert brand.id not in client.app.state.brand_catalog
+
+    @pytest.mark.asyncio
+    async def test_unknown_brand_costs_one_query(
+        self, client, auth_headers, car_data, statements
+    ):
+        client.get('/api/v1/brands/', headers=auth_headers)
+        statements.clear()
+
+        response = client.post(
+            '/api/v1/cars/',
+            json={**car_data, 'brand_id': 999},
+            headers=auth_headers,
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()['detail'] == 'Marca não encontrada'
+        # An existence check, not a reload of the catalog.
+        brand_statements = [s for s in statements if Brand.__tablename__ in s]
+        assert len(brand_statements) == 1
+        assert 'EXISTS' in brand_statements[0]
+
+    @pytest.mark.asyncio
+    async def test_brand_inserted_behind_the_catalog(
+        self, client, auth_headers, session, car_data
+    ):
+        client.get('/api/v1/brands/', headers=auth_headers)
+        # As if created by another worker, or straight in the database.
+        hidden = Brand(name='Fiat', description='', is_active=True)
+        session.add(hidden)
+        await session.commit()
+        assert hidden.id not in client.app.state.brand_catalog
+
+        response = client.post(
+            '/api/v1/cars/',
+            json={**car_data, 'brand_id': hidden.id},
+            headers=auth_headers,
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.json()['brand']['name'] == 'Fiat'
+
+    @pytest.mark.asyncio
+    async def test_get_brand_inserted_behind_the_catalog(
+        self, client, auth_headers, session
+    ):
+        client.get('/api/v1/brands/', headers=auth_headers)
+        hidden = Brand(name='Fiat', description='', is_active=True)
+        session.add(hidden)
+        await session.commit()
+
+        response = client.get(
+            f'/api/v1/brands/{hidden.id}', headers=auth_headers
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['name'] == 'Fiat'
+
+    @pytest.mark.asyncio
+    async def test_bulk_import_brand_inserted_behind_the_catalog(
+        self, client, auth_headers, session, car_data
+    ):
+        client.get('/api/v1/brands/', headers=auth_headers)
+        hidden = Brand(name='Fiat', description='', is_active=True)
+        session.add(hidden)
+        await session.commit()
+
+        response = client.post(
+            '/api/v1/cars/bulk',
+            content=json.dumps({**car_data, 'brand_id': hidden.id}),
+            headers={**auth_headers, 'Content-Type': 'application/x-ndjson'},
+        )
+
+        assert response.json()['imported'] == 1
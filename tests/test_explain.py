@@ -0,0 +1,47 @@
+import pytest
+
+from car_api.cli import explain_cars
+from car_api.core.explain import sequential_scans
+
+
+class TestSequentialScans:
+    def test_sqlite_full_scan(self):
+        plan = [
+            (3, 0, 0, 'SCAN cars'),
+            (9, 0, 0, 'USE TEMP B-TREE FOR ORDER BY'),
+        ]
+
+        assert sequential_scans(plan, 'sqlite', 'cars') == ['SCAN cars']
+
+    def test_sqlite_index_search(self):
+        plan = [(3, 0, 0, 'SEARCH cars USING INDEX ix_cars_owner_id_id')]
+
+        assert sequential_scans(plan, 'sqlite', 'cars') == []
+
+    def test_postgresql_nested_seq_scan(self):
+        plan = [
+            {
+                'Plan': {
+                    'Node Type': 'Limit',
+                    'Plans': [
+                        {'Node Type': 'Seq Scan', 'Relation Name': 'cars'},
+                        {'Node Type': 'Seq Scan', 'Relation Name': 'brands'},
+                    ],
+                }
+            }
+        ]
+
+        assert sequential_scans(plan, 'postgresql', 'cars') == [
+            'Seq Scan on cars'
+        ]
+
+
+class TestExplainCars:
+    @pytest.mark.asyncio
+    async def test_list_cars_filters_use_indexes(self, session):
+        conn = await session.connection()
+
+        reports = await explain_cars(conn, owner_id=1)
+
+        assert len(reports) == 128
+        assert [r for r in reports if r['sequential_scans']] == []
@@ -0,0 +1,61 @@
+import pytest
+from sqlalchemy import select
+
+from car_api.core import facets
+from car_api.core.facets import count_facets, count_key, count_rows
+from car_api.models.cars import Car
+
+
+class TestCountFacets:
+    @pytest.mark.asyncio
+    async def test_counts_every_facet_from_one_query(
+        self, session, car, another_car, statements
+    ):
+        total, counts = await count_facets(
+            session, select(Car), (Car.transmission, Car.is_available)
+        )
+
+        assert total == 2
+        assert counts == {
+            'transmission': {'automatic': 1, 'manual': 1},
+            'is_available': {'true': 2},
+        }
+        assert len(statements) == 1
+        assert 'GROUP BY' in statements[0]
+
+    @pytest.mark.asyncio
+    async def test_empty(self, session):
+        total, counts = await count_facets(
+            session, select(Car), (Car.fuel_type,)
+        )
+
+        assert total == 0
+        assert counts == {'fuel_type': {}}
+
+
+class TestCountRows:
+    @pytest.mark.asyncio
+    async def test_exact_count(self, session, car, another_car):
+        query = select(Car).where(Car.model == 'Civic').order_by(Car.id)
+
+        assert await count_rows(session, query, 1000) == (1, False)
+
+    @pytest.mark.asyncio
+    async def test_planner_estimate_for_large_sets(
+        self, session, car, monkeypatch
+    ):
+        async def estimated_rows(conn, statement):
+            return 250_000
+
+        monkeypatch.setattr(facets, 'estimated_rows', estimated_rows)
+
+        assert await count_rows(session, select(Car), 1000) == (250_000, True)
+        assert await count_rows(session, select(Car), 10**6) == (1, False)
+
+
+class TestCountKey:
+    def test_key_ignores_dict_order(self):
+        assert count_key('cars', {'a': 1, 'b': 2}) == count_key(
+            'cars', {'b': 2, 'a': 1}
+        )
+        assert count_key('cars', 1) != count_key('cars', 2)
@@ -0,0 +1,135 @@
+import argparse
+from collections import Counter
+
+import pytest
+from sqlalchemy import delete, func, select
+from sqlalchemy.exc import IntegrityError
+
+from car_api import cli
+from car_api.core import fleet
+from car_api.core.security import verify_password
+from car_api.models.cars import Brand, Car, car_stats
+from car_api.models.users import User
+from car_api.schemas.cars import CarSchema
+
+BRANDS = [(index + 1, fleet.brand_name(index)) for index in range(30)]
+
+
+class TestFleetData:
+    def test_cars_pass_schema_validation(self):
+        cars = list(fleet.cars(2_000, range(1, 101), BRANDS))
+
+        for car in cars:
+            CarSchema(**car)
+        assert len({car['plate'] for car in cars}) == len(cars)
+
+    def test_same_seed_same_cars(self):
+        first = list(fleet.cars(50, range(1, 11), BRANDS, seed=7))
+
+        assert first == list(fleet.cars(50, range(1, 11), BRANDS, seed=7))
+        assert first != list(fleet.cars(50, range(1, 11), BRANDS, seed=8))
+
+    def test_skew(self):
+        skewed = Counter(
+            car['owner_id'] for car in fleet.cars(5_000, range(1, 101), BRANDS)
+        )
+        even = Counter(
+            car['owner_id']
+            for car in fleet.cars(5_000, range(1, 101), BRANDS, owner_skew=0)
+        )
+
+        assert skewed[1] > 10 * skewed[100]
+        assert max(even.values()) < 3 * min(even.values())
+
+    def test_plates_are_unique_across_ranges(self):
+        plates = {fleet.plate(index) for index in range(0, 200_000, 7)}
+
+        assert len(plates) == len(range(0, 200_000, 7))
+        assert all(len(plate) == 7 for plate in plates)
+
+
+class TestSeedFleet:
+    @pytest.mark.asyncio
+    async def test_seeds_empty_database(self, session):
+        async with session.bind.begin() as conn:
+            totals = await fleet.seed_fleet(
+                conn, fleet.FleetSize(users=20, brands=5, cars=500)
+            )
+
+        assert totals == fleet.FleetSize(users=20, brands=5, cars=500)
+        assert await session.scalar(select(func.count(Car.id))) == 500
+        # The summary table triggers ran for the bulk inserted rows.
+        assert (
+            await session.scalar(select(func.sum(car_stats.table.c.row_count)))
+            == 500
+        )
+
+    @pytest.mark.asyncio
+    async def test_users_share_one_password_hash(self, session):
+        async with session.bind.begin() as conn:
+            await fleet.seed_fleet(
+                conn, fleet.FleetSize(users=3, brands=1, cars=0)
+            )
+
+        hashes = set((await session.execute(select(User.password))).scalars())
+        [password_hash] = hashes
+        assert verify_password(fleet.PASSWORD, password_hash)
+
+    @pytest.mark.asyncio
+    async def test_adds_to_existing_rows(self, session, car):
+        async with session.bind.begin() as conn:
+            totals = await fleet.seed_fleet(
+                conn, fleet.FleetSize(users=5, brands=20, cars=100)
+            )
+
+        assert totals == fleet.FleetSize(users=6, brands=21, cars=101)
+        names = (await session.execute(select(Brand.name))).scalars().all()
+        assert len(set(names)) == 21
+        # The fixture's car and owner are left alone.
+        owners = await session.execute(
+            select(Car.owner_id).where(Car.id != car.id)
+        )
+        assert car.owner_id not in set(owners.scalars())
+
+    @pytest.mark.asyncio
+    async def test_cars_need_new_users_and_brands(self, session):
+        async with session.bind.begin() as conn:
+            with pytest.raises(ValueError, match='new users and brands'):
+                await fleet.seed_fleet(
+                    conn, fleet.FleetSize(users=0, brands=0, cars=10)
+                )
+
+    @pytest.mark.asyncio
+    async def test_reseeds_after_deletes(self, session):
+        async with session.bind.begin() as conn:
+            await fleet.seed_fleet(
+                conn, fleet.FleetSize(users=5, brands=2, cars=50)
+            )
+            first_user = await conn.scalar(select(func.min(User.id)))
+            await conn.execute(delete(Car).where(Car.owner_id == first_user))
+            await conn.execute(delete(User).where(User.id == first_user))
+            await conn.execute(delete(Car).where(Car.id <= 10))
+
+        async with session.bind.begin() as conn:
+            totals = await fleet.seed_fleet(
+                conn, fleet.FleetSize(users=3, brands=1, cars=20)
+            )
+
+        assert totals.users == 7
+        usernames = (await session.execute(select(User.username))).scalars()
+        assert len(set(usernames)) == 7
+        plates = (await session.execute(select(Car.plate))).scalars().all()
+        assert len(set(plates)) == len(plates) == totals.cars
+
+
+class TestSeedCommand:
+    def test_collisions_are_reported(self, monkeypatch, capsys):
+        async def collide(args):
+            raise IntegrityError(
+                'INSERT', {}, Exception('UNIQUE constraint failed: cars.plate')
+            )
+
+        monkeypatch.setattr(cli, '_seed', collide)
+
+        assert cli.seed_command(argparse.Namespace()) == 2
+        assert 'cars.plate' in capsys.readouterr().err
@@ -0,0 +1,49 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException, status
+
+from car_api.core.hashing import PasswordHasher
+
+
+class TestPasswordHasher:
+    @pytest.mark.asyncio
+    async def test_hash_and_verify(self):
+        hasher = PasswordHasher(max_workers=1)
+
+        hashed = await hasher.hash('secret123')
+
+        assert hashed != 'secret123'
+        assert await hasher.verify('secret123', hashed)
+        assert not await hasher.verify('wrongpassword', hashed)
+
+        metrics = hasher.metrics()
+        assert metrics['submitted'] == 3
+        assert metrics['completed'] == 3
+        assert metrics['in_flight'] == 0
+        hasher.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_rejects_when_queue_is_full(self):
+        hasher = PasswordHasher(max_workers=1, max_queue=0)
+
+        results = await asyncio.gather(
+            hasher.hash('secret123'),
+            hasher.hash('secret456'),
+            return_exceptions=True,
+        )
+
+        errors = [r for r in results if isinstance(r, HTTPException)]
+        assert len(errors) == 1
+        assert errors[0].status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert hasher.metrics()['rejected'] == 1
+        hasher.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_process_executor(self):
+        hasher = PasswordHasher(executor='process', max_workers=1)
+
+        hashed = await hasher.hash('secret123')
+
+        assert await hasher.verify('secret123', hashed)
+        hasher.shutdown()
@@ -0,0 +1,159 @@
+import re
+
+import pytest
+from fastapi import status
+
+from car_api.core.metrics import (
+    Histogram,
+    MetricsRegistry,
+    RequestTimings,
+    instrument_engine,
+    request_metrics,
+)
+
+
+@pytest.fixture
+def metrics(session):
+    # The app's engine is instrumented at import, the test one is not.
+    instrument_engine(session.bind)
+    request_metrics.clear()
+    yield request_metrics
+    request_metrics.clear()
+
+
+def server_timing(response):
+    return {
+        match[0]: (float(match[1]), match[2])
+        for match in re.findall(
+            r'(\w+);dur=([\d.]+)(?:;desc="([^"]*)")?',
+            response.headers['server-timing'],
+        )
+    }
+
+
+class TestServerTiming:
+    @pytest.mark.asyncio
+    async def test_counts_statements_of_the_request(
+        self, client, auth_headers, car, metrics, statements
+    ):
+        statements.clear()
+
+        response = client.get(f'/api/v1/cars/{car.id}', headers=auth_headers)
+
+        timing = server_timing(response)
+        assert statements
+        assert set(timing) == {'db', 'serialize', 'total'}
+        assert timing['db'][1] == f'{len(statements)} SQL'
+        assert timing['total'][0] >= timing['db'][0]
+
+    @pytest.mark.asyncio
+    async def test_request_without_sql(self, client, metrics):
+        response = client.get('/health_check')
+
+        assert server_timing(response)['db'] == (0.0, '0 SQL')
+
+
+class TestMetricsEndpoint:
+    @pytest.mark.asyncio
+    async def test_per_route_metrics(self, client, auth_headers, car, metrics):
+        client.get(f'/api/v1/cars/{car.id}', headers=auth_headers)
+        client.get('/api/v1/cars/999', headers=auth_headers)
+
+        response = client.get('/metrics')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers['content-type'].startswith('text/plain')
+        labels = 'method="GET",route="/api/v1/cars/{car_id}"'
+        assert (
+            f'car_api_request_duration_seconds_count{{{labels}}} 2'
+            in response.text
+        )
+        assert (
+            f'car_api_requests_total{{{labels},status="200"}} 1'
+            in response.text
+        )
+        assert (
+            f'car_api_requests_total{{{labels},status="404"}} 1'
+            in response.text
+        )
+        assert f'car_api_sql_statements_total{{{labels}}}' in response.text
+
+    @pytest.mark.asyncio
+    async def test_unmatched_paths_share_one_label(self, client, metrics):
+        client.get('/not/a/route/1')
+        client.get('/not/a/route/2')
+
+        response = client.get('/metrics')
+
+        assert (
+            'car_api_requests_total{method="GET",route="unmatched",'
+            'status="404"} 2'
+        ) in response.text
+
+    @pytest.mark.asyncio
+    async def test_password_hasher_metrics(self, client, auth_headers):
+        response = client.get('/metrics')
+
+        completed = re.search(
+            r'car_api_password_hash_jobs_total\{executor="thread",'
+            r'outcome="completed"\} (\d+)',
+            response.text,
+        )
+        assert int(completed[1]) >= 1
+        assert '# TYPE car_api_password_hash_in_flight gauge' in response.text
+
+    @pytest.mark.asyncio
+    async def test_cache_metrics(self, client, auth_headers):
+        client.get('/api/v1/brands/', headers=auth_headers)
+        client.get('/api/v1/brands/', headers=auth_headers)
+        response = client.get('/metrics')
+
+        hits = re.search(
+            r'car_api_cache_hits_total\{namespace="users",'
+            r'backend="MemoryCache"\} (\d+)',
+            response.text,
+        )
+        assert int(hits[1]) >= 1
+        assert response.text.count('# TYPE car_api_cache_hits_total') == 1
+        assert 'car_api_cache_entries{namespace="tokens"' in response.text
+
+
+class TestHistogram:
+    def test_cumulative_buckets(self):
+        histogram = Histogram(buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value)
+
+        assert histogram.cumulative() == [('0.1', 2), ('1.0', 3), ('+Inf', 4)]
+        assert histogram.count == 4
+        assert histogram.sum == pytest.approx(3.65)
+
+
+class TestMetricsRegistry:
+    def test_accumulates_request_timings(self):
+        registry = MetricsRegistry()
+        for statements in (2, 3):
+            timings = RequestTimings()
+            timings.route = '/api/v1/cars/'
+            timings.statements = statements
+            registry.observe('GET', timings, 200)
+
+        metrics = registry.routes['GET', '/api/v1/cars/']
+        assert metrics.statements == 5
+        assert metrics.latency.count == 2
+        assert metrics.responses == {200: 2}
+
+    def test_collectors_share_families(self):
+        registry = MetricsRegistry()
+        for value in (1, 2):
+            sample = f'jobs{{n="{value}"}} {value}'
+            registry.register(
+                lambda sample=sample: [('jobs', 'gauge', 'Jobs.', [sample])]
+            )
+
+        assert registry.render().splitlines()[-4:] == [
+            '# HELP jobs Jobs.',
+            '# TYPE jobs gauge',
+            'jobs{n="1"} 1',
+            'jobs{n="2"} 2',
+        ]
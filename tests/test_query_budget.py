@@ -0,0 +1,46 @@
+from pathlib import Path
+
+pytest_plugins = ['pytester']
+
+CONFTEST = Path(__file__).with_name('conftest.py')
+
+LOGIN = """
+import pytest
+
+
+def login(client):
+    client.post(
+        '/api/v1/auth/token',
+        json={'email': 'nobody@example.com', 'password': 'secret123'},
+    )
+
+
+@pytest.mark.query_budget(0)
+def test_over_budget(client):
+    login(client)
+
+
+@pytest.mark.query_budget(1)
+def test_within_budget(client):
+    login(client)
+"""
+
+
+class TestQueryBudget:
+    def test_over_budget_fails_the_test(self, pytester):
+        pytester.makeconftest(CONFTEST.read_text(encoding='utf-8'))
+        pytester.makeini(
+            '[pytest]\n'
+            'asyncio_default_fixture_loop_scope = function\n'
+            'markers =\n'
+            '    query_budget(n): statements per request\n'
+        )
+        pytester.makepyfile(test_login=LOGIN)
+
+        result = pytester.runpytest()
+
+        result.assert_outcomes(passed=1, failed=1)
+        result.stdout.fnmatch_lines([
+            '*ran 1 statements, over the query budget of 0:*',
+            'FAILED test_login.py::test_over_budget*',
+        ])
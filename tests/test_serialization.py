@@ -0,0 +1,74 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import List, Optional, get_args
+
+from pydantic import BaseModel
+
+from car_api.core.serialization import (
+    FastJSONResponse,
+    MappingSerializer,
+    mapping_type,
+)
+
+
+class Item(BaseModel):
+    id: int
+    price: Decimal
+    created_at: datetime
+
+
+class Page(BaseModel):
+    items: List[Item]
+    first: Optional[Item] = None
+    next_cursor: Optional[str] = None
+
+
+class TestMappingSerializer:
+    def test_mapping_type_mirrors_nested_schemas(self):
+        page = mapping_type(Page)
+
+        assert list(page.__annotations__) == ['items', 'first', 'next_cursor']
+        (item,) = get_args(page.__annotations__['items'])
+        assert list(item.__annotations__) == ['id', 'price', 'created_at']
+        assert get_args(page.__annotations__['first']) == (item, type(None))
+
+    def test_dump_json_matches_schema(self):
+        item = {
+            'id': 1,
+            'price': Decimal('10.50'),
+            'created_at': datetime(2024, 1, 2, 3, 4, 5),
+            'version': 3,
+        }
+        content = {'items': [item], 'next_cursor': None}
+
+        dumped = MappingSerializer(Page).dump_json(content)
+
+        assert (
+            dumped
+            == Page
+            .model_validate(content)
+            .model_dump_json(exclude={'first'})
+            .encode()
+        )
+
+    def test_response(self):
+        response = MappingSerializer(Item).response(
+            {
+                'id': 1,
+                'price': Decimal('1'),
+                'created_at': datetime(2024, 1, 1),
+            },
+            headers={'ETag': '"tag"'},
+        )
+
+        assert response.media_type == 'application/json'
+        assert response.headers['etag'] == '"tag"'
+        assert response.body.startswith(b'{"id":1,')
+
+
+class TestFastJSONResponse:
+    def test_render(self):
+        response = FastJSONResponse({'name': 'Citroën', 'values': [1, 2]})
+
+        assert response.body == '{"name":"Citroën","values":[1,2]}'.encode()
+        assert response.media_type == 'application/json'
@@ -0,0 +1,65 @@
+import pytest
+
+from car_api import server
+from car_api.core.settings import Settings
+
+
+class TestServerOptions:
+    def test_options_from_settings(self):
+        settings = Settings(
+            SERVER_WORKERS=3,
+            SERVER_KEEP_ALIVE_SECONDS=90,
+            SERVER_GRACEFUL_SHUTDOWN_SECONDS=20,
+        )
+
+        options = server.server_options(settings)
+
+        assert options['workers'] == 3
+        assert options['loop'] == 'uvloop'
+        assert options['http'] == 'httptools'
+        assert options['timeout_keep_alive'] == 90
+        assert options['timeout_graceful_shutdown'] == 20
+
+    def test_one_worker_per_cpu_by_default(self, monkeypatch):
+        monkeypatch.setattr(server, 'default_workers', lambda: 6)
+
+        options = server.server_options(Settings(SERVER_WORKERS=0))
+
+        assert options['workers'] == 6
+
+    def test_command_line_overrides_settings(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(
+            server.uvicorn, 'run', lambda app, **options: calls.append(options)
+        )
+
+        server.main(['--workers', '2', '--port', '9000'])
+
+        [options] = calls
+        assert options['workers'] == 2
+        assert options['port'] == 9000
+
+    def test_replicas_need_shared_cache_with_workers(self):
+        replicas = ['sqlite+aiosqlite:///./car_replica.db']
+
+        with pytest.raises(ValueError, match='CACHE_BACKEND=shared'):
+            server.server_options(
+                Settings(SERVER_WORKERS=2, READ_REPLICA_URLS=replicas)
+            )
+
+        shared = Settings(
+            SERVER_WORKERS=2,
+            READ_REPLICA_URLS=replicas,
+            CACHE_BACKEND='shared',
+        )
+        single = Settings(SERVER_WORKERS=1, READ_REPLICA_URLS=replicas)
+        assert server.server_options(shared)['workers'] == 2
+        assert server.server_options(single)['workers'] == 1
+
+    def test_misconfigured_replicas_stop_the_server(self, monkeypatch):
+        monkeypatch.setenv('READ_REPLICA_URLS', 'sqlite+aiosqlite:///./r.db')
+        monkeypatch.setattr(server, 'get_settings', Settings)
+        monkeypatch.setattr(server.uvicorn, 'run', pytest.fail)
+
+        with pytest.raises(SystemExit):
+            server.main(['--workers', '2'])
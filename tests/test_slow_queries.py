@@ -0,0 +1,174 @@
+import json
+import logging
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from car_api.core.cache import make_cache
+from car_api.core.slow_queries import (
+    MAX_PARAMETER_LENGTH,
+    REDACTED,
+    RateLimiter,
+    SlowQueryLog,
+    loggable_parameters,
+)
+from car_api.models.cars import Car
+from car_api.models.users import User
+
+
+def make_log(threshold_ms=1e-9, explain=False, limit=100):
+    return SlowQueryLog(
+        threshold_ms=threshold_ms,
+        explain=explain,
+        limiter=RateLimiter(limit),
+        explained=make_cache('memory', namespace='slow_queries_test', ttl=60),
+    )
+
+
+def logged(caplog):
+    return [
+        json.loads(record.getMessage())
+        for record in caplog.records
+        if record.name == 'car_api.core.slow_queries'
+    ]
+
+
+@pytest.fixture
+def caplog_warnings(caplog):
+    caplog.set_level(logging.WARNING, logger='car_api.core.slow_queries')
+    return caplog
+
+
+@pytest_asyncio.fixture
+async def file_engine(tmp_path):
+    engine = create_async_engine(f'sqlite+aiosqlite:///{tmp_path}/slow.db')
+    async with engine.begin() as conn:
+        await conn.execute(text('CREATE TABLE items (id INTEGER, name TEXT)'))
+    yield engine
+    await engine.dispose()
+
+
+class TestSlowQueryLog:
+    @pytest.mark.asyncio
+    async def test_logs_statement_and_parameters(
+        self, session, caplog_warnings
+    ):
+        make_log().attach(session.bind)
+
+        await session.execute(select(Car).where(Car.model == 'Corolla'))
+
+        [entry] = logged(caplog_warnings)
+        assert entry['event'] == 'slow_query'
+        assert 'FROM cars' in entry['statement']
+        assert entry['parameters'] == ['Corolla']
+        assert entry['route'] is None
+        assert entry['dialect'] == 'sqlite'
+        assert entry['duration_ms'] >= 0
+
+    @pytest.mark.asyncio
+    async def test_password_and_email_are_redacted(
+        self, session, caplog_warnings
+    ):
+        make_log().attach(session.bind)
+
+        session.add(
+            User(username='alice', password='$argon2id$hash', email='a@b.c')
+        )
+        await session.commit()
+        await session.execute(
+            select(User).where(User.email.in_(['a@b.c', 'd@e.f']))
+        )
+
+        [insert, lookup] = [
+            e for e in logged(caplog_warnings) if 'users' in e['statement']
+        ]
+        assert insert['parameters'][:3] == ['alice', REDACTED, REDACTED]
+        assert lookup['parameters'] == [REDACTED, REDACTED]
+        assert '$argon2id$hash' not in caplog_warnings.text
+        assert 'a@b.c' not in caplog_warnings.text
+
+    @pytest.mark.asyncio
+    async def test_fast_statements_are_not_logged(
+        self, session, caplog_warnings
+    ):
+        make_log(threshold_ms=60_000).attach(session.bind)
+
+        await session.execute(select(Car))
+
+        assert logged(caplog_warnings) == []
+
+    @pytest.mark.asyncio
+    async def test_disabled_with_zero_threshold(
+        self, session, caplog_warnings
+    ):
+        make_log(threshold_ms=0).attach(session.bind)
+
+        await session.execute(select(Car))
+
+        assert logged(caplog_warnings) == []
+
+    @pytest.mark.asyncio
+    async def test_rate_limited(self, session, caplog_warnings):
+        slow_log = make_log(limit=1)
+        slow_log.attach(session.bind)
+
+        for _ in range(3):
+            await session.execute(select(Car))
+
+        assert len(logged(caplog_warnings)) == 1
+        assert slow_log.limiter.dropped == 2
+
+    @pytest.mark.asyncio
+    async def test_logs_route_of_the_request(
+        self, client, auth_headers, car, session, caplog_warnings
+    ):
+        make_log().attach(session.bind)
+
+        client.get(f'/api/v1/cars/{car.id}', headers=auth_headers)
+
+        routes = {entry['route'] for entry in logged(caplog_warnings)}
+        assert routes == {'/api/v1/cars/{car_id}'}
+
+    @pytest.mark.asyncio
+    async def test_captures_plan_once_per_statement(
+        self, file_engine, caplog_warnings
+    ):
+        slow_log = make_log(explain=True)
+        slow_log.attach(file_engine)
+
+        async with file_engine.connect() as conn:
+            for name in ('a', 'b'):
+                await conn.execute(
+                    text('SELECT * FROM items WHERE name = :name'),
+                    {'name': name},
+                )
+        await slow_log.drain()
+
+        # The entry with a plan is logged once the plan is captured.
+        [explained] = [e for e in logged(caplog_warnings) if 'plan' in e]
+        assert explained['parameters'] == ['a']
+        assert any('SCAN items' in row[-1] for row in explained['plan'])
+        assert len(logged(caplog_warnings)) == 2
+
+
+class TestLoggableParameters:
+    def test_long_values_are_truncated(self):
+        [value, number, missing] = loggable_parameters(('x' * 1000, 42, None))
+
+        assert value == 'x' * MAX_PARAMETER_LENGTH + '...'
+        assert number == 42
+        assert missing is None
+
+    def test_named_parameters(self):
+        assert loggable_parameters({'name': b'raw'}) == {'name': "b'raw'"}
+
+    def test_sensitive_parameters_are_redacted(self):
+        assert loggable_parameters(
+            ('alice', 'hash', 'a@b.c'), ['username_1', 'password', 'email_1']
+        ) == ['alice', REDACTED, REDACTED]
+        assert loggable_parameters({'email': 'a@b.c', 'name': 'x'}) == {
+            'email': REDACTED,
+            'name': 'x',
+        }
@@ -0,0 +1,101 @@
+import pytest
+from sqlalchemy import func, insert, select
+
+from car_api.models.cars import Car, car_stats
+
+
+async def summary_rows(session):
+    result = await session.execute(select(car_stats.table))
+    return sorted(tuple(row) for row in result)
+
+
+async def recomputed_rows(session):
+    # What the summary table should hold, computed from the cars.
+    result = await session.execute(
+        select(
+            Car.owner_id,
+            Car.brand_id,
+            Car.fuel_type,
+            Car.model_year,
+            func.count(),
+            func.sum(Car.price),
+        ).group_by(Car.owner_id, Car.brand_id, Car.fuel_type, Car.model_year)
+    )
+    return sorted(tuple(row) for row in result)
+
+
+class TestCarStats:
+    @pytest.mark.asyncio
+    async def test_insert_adds_to_the_group(self, session, car, another_car):
+        rows = await summary_rows(session)
+
+        assert [(r[2], r[3], r[4]) for r in rows] == [
+            ('gasoline', 2023, 1),
+            ('hybrid', 2024, 1),
+        ]
+        assert rows == await recomputed_rows(session)
+
+    @pytest.mark.asyncio
+    async def test_same_group_is_summed(self, session, car, car_data):
+        session.add(Car(**{**car_data, 'plate': 'DEF5678', 'price': 50000}))
+        await session.commit()
+
+        rows = await summary_rows(session)
+
+        assert len(rows) == 1
+        assert rows[0][4] == 2
+        assert rows[0][5] == 200000
+        assert rows == await recomputed_rows(session)
+
+    @pytest.mark.asyncio
+    async def test_update_moves_between_groups(
+        self, session, car, another_car, another_brand, another_user
+    ):
+        car.brand_id = another_brand.id
+        car.price = 90000
+        another_car.model_year = 2024
+        another_car.owner_id = another_user.id
+        await session.commit()
+
+        assert await summary_rows(session) == await recomputed_rows(session)
+
+    @pytest.mark.asyncio
+    async def test_update_of_other_columns_keeps_the_group(self, session, car):
+        before = await summary_rows(session)
+
+        car.color = 'Black'
+        await session.commit()
+
+        assert await summary_rows(session) == before
+
+    @pytest.mark.asyncio
+    async def test_delete_removes_empty_groups(
+        self, session, car, another_car
+    ):
+        await session.delete(car)
+        await session.commit()
+
+        rows = await summary_rows(session)
+
+        assert [r[2] for r in rows] == ['gasoline']
+        assert rows == await recomputed_rows(session)
+
+    @pytest.mark.asyncio
+    async def test_bulk_insert(self, session, car_data):
+        await session.execute(
+            insert(Car),
+            [
+                {
+                    **car_data,
+                    'plate': f'BLK{i:04d}',
+                    'model_year': 2020 + i % 3,
+                }
+                for i in range(30)
+            ],
+        )
+        await session.commit()
+
+        rows = await summary_rows(session)
+
+        assert [r[4] for r in rows] == [10, 10, 10]
+        assert rows == await recomputed_rows(session)
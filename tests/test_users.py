@@ -132,6 +132,21 @@ class TestListUsers:
         assert data['offset'] == 0
         assert data['limit'] == 1
 
+    @pytest.mark.asyncio
+    async def test_list_users_with_cursor(self, client, user, another_user):
+        response = client.get('/api/v1/users/?limit=1')
+        first_page = response.json()
+
+        assert [u['id'] for u in first_page['users']] == [user.id]
+
+        response = client.get(
+            f'/api/v1/users/?limit=1&cursor={first_page["next_cursor"]}'
+        )
+        second_page = response.json()
+
+        assert [u['id'] for u in second_page['users']] == [another_user.id]
+        assert second_page['next_cursor'] is None
+
     @pytest.mark.asyncio
     async def test_list_users_search_by_email(self, client, user):
         response = client.get('/api/v1/users/?search=test@example.com')
@@ -161,6 +176,43 @@ class TestGetUser:
         assert 'Usuário não encontrado' in response.json()['detail']
 
 
+class TestConditionalGetUsers:
+    @pytest.mark.asyncio
+    async def test_get_user_modified_after_update(
+        self, client, auth_headers, user
+    ):
+        url = f'/api/v1/users/{user.id}'
+        etag = client.get(url).headers['etag']
+
+        response = client.get(url, headers={'If-None-Match': etag})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        client.put(url, json={'username': 'renamed'}, headers=auth_headers)
+        response = client.get(url, headers={'If-None-Match': etag})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['username'] == 'renamed'
+        assert response.headers['etag'] != etag
+
+    @pytest.mark.asyncio
+    async def test_get_missing_user_is_not_found(self, client):
+        response = client.get(
+            '/api/v1/users/999', headers={'If-None-Match': '*'}
+        )
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    @pytest.mark.asyncio
+    async def test_list_users_not_modified(self, client, user):
+        etag = client.get('/api/v1/users/').headers['etag']
+
+        response = client.get(
+            '/api/v1/users/', headers={'If-None-Match': etag}
+        )
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+
 class TestUpdateUser:
     @pytest.mark.asyncio
     async def test_update_user_success(